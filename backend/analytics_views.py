@@ -0,0 +1,213 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Optional
+
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+
+from employee_keys import attach_team_member_keys
+from query_projections import iter_batches
+
+
+# All views live in one collection, one document per (view, key) holding
+# running counters that write hooks adjust with $inc
+VIEWS_COLLECTION = "analytics_views"
+META_ID = "meta:built"
+# Bumped whenever a view is added or its definition changes, so
+# ensure_views rebuilds older databases
+VIEWS_VERSION = 3
+REBUILD_BATCH_SIZE = 1000
+
+ACTIVE_STATUSES = ("In Progress", "Planning")
+
+
+def success_band(probability: float) -> str:
+    """Bucket a project success probability the way the forecasting view reports it"""
+    if probability >= 0.8:
+        return "high"
+    if probability >= 0.6:
+        return "medium"
+    return "low"
+
+
+def gap_percentage(gap: Dict[str, Any]) -> float:
+    return round((gap['required_proficiency'] - gap['current_proficiency']) * 100, 1)
+
+
+async def apply_counters(db, view: str, counters: Dict[str, Dict[str, float]]):
+    """Add per-key counter deltas to a view in one bulk write"""
+    operations = [
+        UpdateOne(
+            {"_id": f"{view}:{key}"},
+            {"$inc": deltas, "$setOnInsert": {"view": view, "key": key}},
+            upsert=True
+        )
+        for key, deltas in counters.items()
+    ]
+    if operations:
+        await db[VIEWS_COLLECTION].bulk_write(operations, ordered=False)
+
+
+async def apply_employee_delta(db, employees: Iterable[Dict[str, Any]], sign: int = 1):
+    """Update department stats for inserted (sign=1) or removed (sign=-1) employees"""
+    departments = defaultdict(lambda: defaultdict(int))
+    for emp in employees:
+        stats = departments[emp.get('department', 'Unknown')]
+        stats["count"] += sign
+        stats["performance_sum"] += sign * emp.get('performance_score', 0)
+        stats["productivity_sum"] += sign * emp.get('productivity_score', 0)
+    await apply_counters(db, "department", departments)
+
+
+async def apply_project_delta(db, projects: List[Dict[str, Any]], sign: int = 1):
+    """Update status, success-band and department success stats for projects.
+
+    A project is attributed to the department of its team's earliest
+    employee in collection order, i.e. the lowest employee key (keys are
+    handed out in insertion order), resolved with one batched lookup for
+    the whole delta.
+    """
+    team_member_keys = list({key for project in projects for key in project.get('team_member_keys', [])})
+    employee_departments = {}
+    if team_member_keys:
+        async for emp in db.employees.find(
+            {"employee_key": {"$in": team_member_keys}},
+            projection={"_id": 0, "employee_key": 1, "department": 1}
+        ):
+            employee_departments[emp['employee_key']] = emp['department']
+
+    statuses = defaultdict(lambda: defaultdict(int))
+    bands = defaultdict(lambda: defaultdict(int))
+    departments = defaultdict(lambda: defaultdict(int))
+    for project in projects:
+        prob = project.get('success_probability', 0)
+        statuses[project['status']]["count"] += sign
+        statuses[project['status']]["success_sum"] += sign * prob
+        bands[success_band(prob)]["count"] += sign
+
+        lead = min((key for key in project.get('team_member_keys', []) if key in employee_departments), default=None)
+        if lead is not None:
+            dept = employee_departments[lead]
+            departments[dept]["count"] += sign
+            departments[dept]["success_sum"] += sign * prob
+
+    await apply_counters(db, "project_status", statuses)
+    await apply_counters(db, "project_success_band", bands)
+    await apply_counters(db, "project_department", departments)
+
+
+async def reattribute_projects(db, employees: List[Dict[str, Any]]):
+    """Complete the teams of projects that name newly written employees.
+
+    Team member keys are resolved when a project is written, so members
+    written after it are missing from ``team_member_keys`` and the project
+    counts for the wrong department, or none. Affected projects get their
+    keys re-resolved and their stats moved from the old team to the new.
+    """
+    names = list({emp['name'] for emp in employees})
+    if not names:
+        return
+    cursor = db.projects.find(
+        {"team_members": {"$in": names}},
+        projection={"team_members": 1, "team_member_keys": 1, "status": 1, "success_probability": 1}
+    )
+    async for batch in iter_batches(cursor, REBUILD_BATCH_SIZE):
+        previous = [{**project, "team_member_keys": project.get('team_member_keys', [])} for project in batch]
+        await attach_team_member_keys(db, batch)
+        changed = [(old, new) for old, new in zip(previous, batch) if old['team_member_keys'] != new['team_member_keys']]
+        if not changed:
+            continue
+        await db.projects.bulk_write([
+            UpdateOne({"_id": new['_id']}, {"$set": {"team_member_keys": new['team_member_keys']}})
+            for _, new in changed
+        ], ordered=False)
+        await apply_project_delta(db, [old for old, _ in changed], sign=-1)
+        await apply_project_delta(db, [new for _, new in changed])
+
+
+async def apply_skill_gap_delta(db, gaps: Iterable[Dict[str, Any]], sign: int = 1):
+    """Update per-department skill-gap counters and the critical-gap ranking.
+
+    Every critical gap is also kept as its own view document, indexed by
+    gap percentage, so each write updates the ranking in O(log n) and
+    reads walk it in order without sorting.
+    """
+    departments = defaultdict(lambda: defaultdict(int))
+    ranking = []
+    for gap in gaps:
+        percentage = gap_percentage(gap)
+        stats = departments[gap['department']]
+        stats["count"] += sign
+        stats["gap_sum"] += sign * percentage
+        stats["affected_employees"] += sign * gap['affected_employees']
+        if gap['gap_level'] != 'critical':
+            continue
+        stats["critical_count"] += sign
+        # Keyed by the source _id, whose hex order is insertion order
+        entry_id = f"critical_gap:{gap['_id']}"
+        if sign > 0:
+            ranking.append(ReplaceOne({"_id": entry_id}, {
+                "view": "critical_gap",
+                "key": str(gap['_id']),
+                "department": gap['department'],
+                "skill": gap['skill'],
+                "affected_employees": gap['affected_employees'],
+                "gap_percentage": percentage
+            }, upsert=True))
+        else:
+            ranking.append(DeleteOne({"_id": entry_id}))
+    await apply_counters(db, "skill_gap_department", departments)
+    if ranking:
+        await db[VIEWS_COLLECTION].bulk_write(ranking, ordered=True)
+
+
+async def reset_views(db):
+    """Drop every view document, e.g. before the source collections are cleared"""
+    await db[VIEWS_COLLECTION].delete_many({})
+
+
+async def mark_views_built(db):
+    await db[VIEWS_COLLECTION].update_one(
+        {"_id": META_ID},
+        {"$set": {"view": "meta", "version": VIEWS_VERSION, "built_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+
+
+async def rebuild_views(db):
+    """Recompute all views from the source collections in fixed-size batches"""
+    await reset_views(db)
+    sources = [
+        (db.employees, apply_employee_delta),
+        (db.projects, apply_project_delta),
+        (db.skill_gaps, apply_skill_gap_delta),
+    ]
+    for collection, apply_delta in sources:
+        async for batch in iter_batches(collection.find(batch_size=REBUILD_BATCH_SIZE), REBUILD_BATCH_SIZE):
+            await apply_delta(db, batch)
+    await mark_views_built(db)
+
+
+async def ensure_views(db):
+    """Build the views for databases populated before they (or newer views) existed"""
+    meta = await db[VIEWS_COLLECTION].find_one({"_id": META_ID})
+    if meta is None or meta.get("version", 1) < VIEWS_VERSION:
+        await rebuild_views(db)
+
+
+async def read_view(db, view: str) -> Dict[str, Dict[str, Any]]:
+    """Return a view as {key: counters}, skipping keys whose count dropped to zero"""
+    rows = await db[VIEWS_COLLECTION].find({"view": view}).to_list(length=None)
+    return {row['key']: row for row in rows if row.get('count', 0) > 0}
+
+
+async def read_critical_gaps(db, department: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Critical gaps by descending gap percentage, read in index order"""
+    query = {"view": "critical_gap"}
+    if department is not None:
+        query["department"] = department
+    cursor = db[VIEWS_COLLECTION].find(
+        query, projection={"_id": 0, "department": 1, "skill": 1, "affected_employees": 1, "gap_percentage": 1}
+    ).sort([("gap_percentage", -1), ("key", 1)])
+    if limit is not None:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=limit)
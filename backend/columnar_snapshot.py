@@ -0,0 +1,336 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from employee_queries import (
+    EXPERIENCE_BIN_YEARS, PERFORMANCE_BIN, EmployeeFilter, arrow_histogram, experience_histogram
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pc = None
+    ipc = None
+    pq = None
+
+
+SNAPSHOT_FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+SNAPSHOT_BATCH_SIZE = 10000
+MANIFEST_NAME = "current.json"
+
+# Columns exported per collection, as a $project stage plus Arrow types.
+# Projects are flattened to the scalars the aggregations need: team size
+# and the lead's key for department attribution: the team's lowest employee
+# key, i.e. its earliest employee in collection order.
+SNAPSHOT_COLUMNS: Dict[str, Dict[str, Any]] = {
+    "employees": {
+        "project": {
+            "_id": 0, "employee_key": 1, "name": 1, "department": 1, "role": 1, "experience_years": 1,
+            "performance_score": 1, "productivity_score": 1, "collaboration_index": 1
+        },
+        "types": {
+            "employee_key": "int64", "name": "string", "department": "string", "role": "string",
+            "experience_years": "int64",
+            "performance_score": "double", "productivity_score": "double", "collaboration_index": "double"
+        }
+    },
+    "projects": {
+        "project": {
+            "_id": 0, "name": 1, "status": 1, "success_probability": 1,
+            "team_size": {"$size": {"$ifNull": ["$team_members", []]}},
+            "lead_key": {"$min": "$team_member_keys"}
+        },
+        "types": {
+            "name": "string", "status": "string", "success_probability": "double",
+            "team_size": "int64", "lead_key": "int64"
+        }
+    },
+    "collaboration_networks": {
+        "project": {"_id": 0, "employee_a_key": 1, "employee_b_key": 1, "collaboration_strength": 1},
+        "types": {"employee_a_key": "int64", "employee_b_key": "int64", "collaboration_strength": "double"}
+    },
+    "skill_gaps": {
+        "project": {
+            "_id": 0, "department": 1, "skill": 1, "gap_level": 1, "current_proficiency": 1,
+            "required_proficiency": 1, "affected_employees": 1, "training_recommendations": 1
+        },
+        "types": {
+            "department": "string", "skill": "string", "gap_level": "string", "current_proficiency": "double",
+            "required_proficiency": "double", "affected_employees": "int64",
+            "training_recommendations": "list<string>"
+        }
+    },
+}
+
+
+class SnapshotUnavailable(RuntimeError):
+    """No snapshot can be written or read (pyarrow missing or nothing exported yet)"""
+
+
+def _schema(types: Dict[str, str]):
+    def arrow_type(alias: str):
+        if alias.startswith("list<"):
+            return pa.list_(pa.type_for_alias(alias[5:-1]))
+        return pa.type_for_alias(alias)
+    return pa.schema([(column, arrow_type(alias)) for column, alias in types.items()])
+
+
+class ColumnarSnapshot:
+    """One exported snapshot: an Arrow table per collection plus its manifest.
+
+    Tables read from Arrow IPC files stay views of the memory-mapped files;
+    ``frame`` converts (and so copies) only the columns a pandas
+    aggregation asks for, once per snapshot.
+    """
+
+    def __init__(self, version: str, manifest: Dict[str, Any], tables: Dict[str, "pa.Table"]):
+        self.version = version
+        self.manifest = manifest
+        self.tables = tables
+        self._frames: Dict[Any, pd.DataFrame] = {}
+
+    def __getitem__(self, collection: str) -> "pa.Table":
+        return self.tables[collection]
+
+    def frame(self, collection: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        key = (collection, tuple(columns) if columns is not None else None)
+        if key not in self._frames:
+            table = self.tables[collection]
+            self._frames[key] = (table.select(columns) if columns is not None else table).to_pandas()
+        return self._frames[key]
+
+
+class SnapshotStore:
+    """Exports collections to columnar files and serves the latest snapshot.
+
+    Each export is written to a fresh version directory; the manifest that
+    names the current version is replaced atomically once every file is
+    complete, so readers never see a partial snapshot. Arrow IPC files are
+    memory-mapped on read.
+    """
+
+    def __init__(self, directory: str, file_format: str = "arrow", keep_versions: int = 2):
+        if file_format not in SNAPSHOT_FORMATS:
+            raise ValueError(f"Unknown snapshot format {file_format!r}; expected one of {list(SNAPSHOT_FORMATS)}")
+        self.directory = Path(directory)
+        self.file_format = file_format
+        self.keep_versions = keep_versions
+        self._export_lock = asyncio.Lock()
+        self._loaded: Optional[ColumnarSnapshot] = None
+
+    @property
+    def available(self) -> bool:
+        return PYARROW_AVAILABLE
+
+    def _manifest(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.directory / MANIFEST_NAME) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    async def export(self, db) -> Dict[str, Any]:
+        """Stream every snapshot collection from Mongo into a new version"""
+        if not PYARROW_AVAILABLE:
+            raise SnapshotUnavailable("pyarrow is not installed; columnar snapshots are disabled")
+        async with self._export_lock:
+            start = time.perf_counter()
+            version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            version_dir = self.directory / version
+            version_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                rows = {}
+                for collection, spec in SNAPSHOT_COLUMNS.items():
+                    path = version_dir / f"{collection}{SNAPSHOT_FORMATS[self.file_format]}"
+                    rows[collection] = await self._export_collection(db[collection], spec, path)
+            except BaseException:
+                shutil.rmtree(version_dir, ignore_errors=True)
+                raise
+            manifest = {
+                "version": version,
+                "format": self.file_format,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+                "rows": rows,
+                "seconds": round(time.perf_counter() - start, 3)
+            }
+            temporary = self.directory / f"{MANIFEST_NAME}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(manifest, f)
+            os.replace(temporary, self.directory / MANIFEST_NAME)
+            self._prune(version)
+            return manifest
+
+    async def _export_collection(self, collection, spec: Dict[str, Any], path: Path) -> int:
+        schema = _schema(spec["types"])
+        columns = list(spec["types"])
+        writer = (ipc.new_file(str(path), schema) if self.file_format == "arrow"
+                  else pq.ParquetWriter(str(path), schema))
+        rows = 0
+        try:
+            batch = []
+            async for doc in collection.aggregate([{"$project": spec["project"]}], batchSize=SNAPSHOT_BATCH_SIZE):
+                batch.append(doc)
+                if len(batch) >= SNAPSHOT_BATCH_SIZE:
+                    await asyncio.to_thread(self._write_batch, writer, schema, columns, batch)
+                    rows += len(batch)
+                    batch = []
+            if batch:
+                await asyncio.to_thread(self._write_batch, writer, schema, columns, batch)
+                rows += len(batch)
+        finally:
+            writer.close()
+        return rows
+
+    @staticmethod
+    def _write_batch(writer, schema, columns: List[str], batch: List[Dict[str, Any]]):
+        table = pa.Table.from_pydict({column: [doc.get(column) for doc in batch] for column in columns}, schema=schema)
+        writer.write_table(table)
+
+    def _prune(self, current: str):
+        """Remove old version directories, keeping the newest ``keep_versions``"""
+        versions = sorted(p for p in self.directory.iterdir() if p.is_dir())
+        for stale in versions[:-self.keep_versions]:
+            if stale.name != current:
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def _read_tables(self, manifest: Dict[str, Any]) -> Dict[str, "pa.Table"]:
+        version_dir = self.directory / manifest["version"]
+        tables = {}
+        for collection in SNAPSHOT_COLUMNS:
+            path = str(version_dir / f"{collection}{SNAPSHOT_FORMATS[manifest['format']]}")
+            if manifest["format"] == "arrow":
+                tables[collection] = ipc.open_file(pa.memory_map(path)).read_all()
+            else:
+                tables[collection] = pq.read_table(path, memory_map=True)
+        return tables
+
+    def _read(self, manifest: Dict[str, Any]) -> ColumnarSnapshot:
+        return ColumnarSnapshot(manifest["version"], manifest, self._read_tables(manifest))
+
+    async def tables(self, manifest: Dict[str, Any]) -> Dict[str, "pa.Table"]:
+        """Arrow tables of an exported version, e.g. to load into a warehouse"""
+        return await asyncio.to_thread(self._read_tables, manifest)
+
+    async def load(self) -> ColumnarSnapshot:
+        """Return the current snapshot, reading it only when the version changed"""
+        if not PYARROW_AVAILABLE:
+            raise SnapshotUnavailable("pyarrow is not installed; columnar snapshots are disabled")
+        manifest = self._manifest()
+        if manifest is None:
+            raise SnapshotUnavailable("No snapshot has been exported yet")
+        if self._loaded is None or self._loaded.version != manifest["version"]:
+            self._loaded = await asyncio.to_thread(self._read, manifest)
+        return self._loaded
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "available": PYARROW_AVAILABLE,
+            "directory": str(self.directory),
+            "format": self.file_format,
+            "current": self._manifest()
+        }
+
+    async def run_periodically(self, db, interval_seconds: float, on_export=None):
+        """Re-export every ``interval_seconds`` until cancelled, awaiting ``on_export`` after each"""
+        while True:
+            try:
+                manifest = await self.export(db)
+                if on_export is not None:
+                    await on_export(manifest)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logging.exception("Columnar snapshot export failed")
+            await asyncio.sleep(interval_seconds)
+
+
+# Aggregations over snapshot tables and frames. Each returns the data
+# portion of the matching analytics endpoint with plain Python values.
+
+def snapshot_performance_trends(employees: "pa.Table", top: int = 10,
+                                employee_filter: Optional[EmployeeFilter] = None,
+                                experience_bin: float = EXPERIENCE_BIN_YEARS,
+                                performance_bin: float = PERFORMANCE_BIN) -> Dict[str, Any]:
+    # Filtering and top-K run on the Arrow table, so only the matched rows
+    # and the top performers are ever materialized
+    expression = (employee_filter or EmployeeFilter()).arrow_filter()
+    if expression is not None:
+        employees = employees.filter(expression)
+    by_department = employees.group_by("department", use_threads=False).aggregate(
+        [("performance_score", "mean"), ("productivity_score", "mean")]
+    ).to_pylist()
+    # Ties go to the lowest key, i.e. the earliest employee, as in Mongo
+    best = pc.select_k_unstable(
+        employees, min(top, employees.num_rows),
+        [("performance_score", "descending"), ("employee_key", "ascending")]
+    )
+    top_performers = employees.take(best).select(["name", "department", "performance_score", "productivity_score"])
+    return {
+        "department_performance": {row["department"]: round(row["performance_score_mean"], 2)
+                                   for row in by_department},
+        "department_productivity": {row["department"]: round(row["productivity_score_mean"], 2)
+                                    for row in by_department},
+        "top_performers": top_performers.to_pylist(),
+        "experience_correlation": experience_histogram(
+            arrow_histogram(employees, experience_bin, performance_bin), experience_bin, performance_bin
+        )
+    }
+
+
+def snapshot_skill_gap_analysis(skill_gaps: pd.DataFrame) -> Dict[str, Any]:
+    gaps = skill_gaps.assign(
+        gap_percentage=np.round((skill_gaps["required_proficiency"] - skill_gaps["current_proficiency"]) * 100, 1),
+        training_recommendations=skill_gaps["training_recommendations"].map(list)
+    )
+    detail_columns = ["skill", "gap_level", "current_proficiency", "required_proficiency",
+                      "gap_percentage", "affected_employees", "training_recommendations"]
+    by_department = {
+        department: group[detail_columns].to_dict("records")
+        for department, group in gaps.groupby("department", sort=False)
+    }
+    critical = gaps[gaps["gap_level"] == "critical"].sort_values("gap_percentage", ascending=False, kind="stable")
+    return {
+        "by_department": by_department,
+        "critical_gaps": critical[["department", "skill", "affected_employees", "gap_percentage"]].to_dict("records"),
+        "summary": {
+            "total_gaps": len(gaps),
+            "critical_gaps_count": len(critical),
+            "departments_affected": len(by_department)
+        }
+    }
+
+
+def snapshot_project_forecasting(projects: pd.DataFrame, employees: pd.DataFrame) -> Dict[str, Any]:
+    success = projects["success_probability"]
+    bands = np.select([success >= 0.8, success >= 0.6], ["high", "medium"], default="low")
+    band_counts = pd.Series(bands).value_counts()
+
+    # Attribute each project to its lead's department via the integer key
+    departments = pd.Series(employees["department"].to_numpy(), index=employees["employee_key"].to_numpy())
+    departments = departments[~departments.index.duplicated()]
+    lead_departments = projects["lead_key"].map(departments)
+    department_rates = (success.groupby(lead_departments, sort=False).mean() * 100).round(1)
+
+    risk = projects[success < 0.6].sort_values("success_probability", kind="stable")
+    return {
+        "project_count": len(projects),
+        "success_distribution": {band: int(band_counts.get(band, 0)) for band in ("high", "medium", "low")},
+        "status_distribution": projects.groupby("status", sort=False).size().to_dict(),
+        "department_success_rates": department_rates.to_dict(),
+        "risk_projects": risk[["name", "success_probability", "status", "team_size"]].to_dict("records")
+    }
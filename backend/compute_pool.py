@@ -0,0 +1,177 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+# Arrays at least this large go to workers through shared memory instead
+# of being pickled into the task
+SHARED_MEMORY_MIN_BYTES = 1 << 16
+
+
+class SharedArray:
+    """Picklable handle to a numpy array copied into shared memory"""
+
+    def __init__(self, array: np.ndarray):
+        self.shape = array.shape
+        self.dtype = array.dtype.str
+        self.segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=self.segment.buf)[...] = array
+        self.name = self.segment.name
+
+    def __getstate__(self):
+        return {"shape": self.shape, "dtype": self.dtype, "name": self.name}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.segment = None
+
+    def release(self):
+        self.segment.close()
+        self.segment.unlink()
+
+
+def _invoke(function: Callable, args: tuple, kwargs: Dict[str, Any]):
+    """Worker entry point: map shared arrays back to numpy views and call ``function``"""
+    segments = []
+
+    def attach(value):
+        if isinstance(value, SharedArray):
+            segment = shared_memory.SharedMemory(name=value.name)
+            segments.append(segment)
+            return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=segment.buf)
+        return value
+
+    try:
+        return function(*map(attach, args), **{key: attach(value) for key, value in kwargs.items()})
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+class ComputePool:
+    """Runs CPU-bound analytics off the event loop in a process pool.
+
+    Large numpy arguments are shared with workers through shared memory
+    rather than pickled. A semaphore caps how many tasks run at once; with
+    ``max_workers=0`` tasks run in a thread instead. ``function`` and its
+    return value must be picklable, i.e. module-level and importable.
+    """
+
+    def __init__(self, max_workers: int = 2, max_concurrency: Optional[int] = None, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max(max_workers, 1)
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.tasks = 0
+        self.running = 0
+        self.wait_seconds = 0.0
+        self.compute_seconds = 0.0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method)
+            )
+        return self._executor
+
+    async def run(self, function: Callable, *args, **kwargs):
+        queued = time.perf_counter()
+        async with self._semaphore:
+            started = time.perf_counter()
+            self.wait_seconds += started - queued
+            self.tasks += 1
+            self.running += 1
+            try:
+                if self.max_workers == 0:
+                    return await asyncio.to_thread(function, *args, **kwargs)
+                return await self._run_in_process(function, args, kwargs)
+            finally:
+                self.running -= 1
+                self.compute_seconds += time.perf_counter() - started
+
+    async def _run_in_process(self, function: Callable, args: tuple, kwargs: Dict[str, Any]):
+        shared: List[SharedArray] = []
+
+        def share(value):
+            if isinstance(value, np.ndarray) and value.dtype != object and value.nbytes >= SHARED_MEMORY_MIN_BYTES:
+                shared.append(SharedArray(value))
+                return shared[-1]
+            return value
+
+        try:
+            args = tuple(share(value) for value in args)
+            kwargs = {key: share(value) for key, value in kwargs.items()}
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(), _invoke, function, args, kwargs)
+        finally:
+            for array in shared:
+                array.release()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "process" if self.max_workers else "thread",
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "tasks": self.tasks,
+            "running": self.running,
+            "avg_wait_ms": round(self.wait_seconds / self.tasks * 1000, 3) if self.tasks else 0,
+            "avg_compute_ms": round(self.compute_seconds / self.tasks * 1000, 3) if self.tasks else 0
+        }
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag: how late a periodic timer wakes up.
+
+    A blocked loop shows up directly as lag, so comparing these numbers
+    with offloading on and off shows how responsive the worker stays.
+    """
+
+    def __init__(self, interval_seconds: float = 0.05, window: int = 1200):
+        self.interval_seconds = interval_seconds
+        self.samples = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+            self.samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self):
+        self.samples.clear()
+        self.max_lag_ms = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        samples = np.array(self.samples) if self.samples else np.zeros(1)
+        return {
+            "interval_ms": self.interval_seconds * 1000,
+            "samples": len(self.samples),
+            "mean_lag_ms": round(float(samples.mean()), 3),
+            "p99_lag_ms": round(float(np.percentile(samples, 99)), 3),
+            "max_lag_ms": round(self.max_lag_ms, 3)
+        }
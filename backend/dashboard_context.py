@@ -0,0 +1,169 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+from analytics_views import read_view
+from query_projections import ENDPOINT_FIELDS, find_batches
+
+
+# Batches a scan may run ahead of its slowest subscriber
+SCAN_QUEUE_BATCHES = 2
+_END = object()
+
+
+class _SharedScan:
+    """One cursor over a collection, fanned out batch by batch to every subscriber.
+
+    Subscribers join before the scan starts; each gets a bounded queue, so
+    the scan advances at the pace of the slowest one and memory stays at a
+    few batches however large the collection is.
+    """
+
+    def __init__(self, open_batches: Callable[[], AsyncIterator[List[Dict[str, Any]]]]):
+        self.open_batches = open_batches
+        self.queues: List[asyncio.Queue] = []
+        self.task: Optional[asyncio.Future] = None
+        self.started = False
+
+    def subscribe(self) -> Optional["ScanSubscription"]:
+        """A subscription to the collection's batches, or None once the scan is under way"""
+        if self.started:
+            return None
+        queue = asyncio.Queue(maxsize=SCAN_QUEUE_BATCHES)
+        self.queues.append(queue)
+        if self.task is None:
+            self.task = asyncio.ensure_future(self._run())
+        return ScanSubscription(self, queue)
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self.queues:
+            self.queues.remove(queue)
+        # Unblock a scan waiting on the abandoned queue
+        while not queue.empty():
+            queue.get_nowait()
+
+    async def _run(self):
+        self.started = True
+        end = _END
+        try:
+            async for batch in self.open_batches():
+                if not self.queues:
+                    return
+                for queue in list(self.queues):
+                    await queue.put(batch)
+        except Exception as e:
+            end = e
+        for queue in list(self.queues):
+            await queue.put(end)
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+
+
+class ScanSubscription:
+    """Async iterator over a shared scan's batches.
+
+    Use as ``async with`` so a panel that stops early (or never iterates)
+    releases the scan instead of stalling the other subscribers.
+    """
+
+    def __init__(self, scan: _SharedScan, queue: asyncio.Queue):
+        self.scan = scan
+        self.queue: Optional[asyncio.Queue] = queue
+
+    async def __aenter__(self) -> "ScanSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def __aiter__(self) -> "ScanSubscription":
+        return self
+
+    async def __anext__(self) -> List[Dict[str, Any]]:
+        if self.queue is None:
+            raise StopAsyncIteration
+        item = await self.queue.get()
+        if item is _END or isinstance(item, Exception):
+            self.close()
+            if item is _END:
+                raise StopAsyncIteration
+            raise item
+        return item
+
+    def close(self):
+        if self.queue is not None:
+            self.scan.unsubscribe(self.queue)
+            self.queue = None
+
+
+class DataContext:
+    """Per-request data shared by the panels computed for one request.
+
+    Every load runs at most once per context: panels that ask for the same
+    view or snapshot await the same task, and panels that subscribe to a
+    collection's ``batches`` in the same event-loop turn (before their
+    first await) share one cursor; a later subscriber gets a scan of its
+    own. Scans are projected to the union of the fields the context's
+    endpoints declare, so documents must be treated as read-only. Use as
+    ``async with`` so unfinished scans are cancelled.
+    """
+
+    def __init__(self, db, endpoints: Iterable[str]):
+        self.db = db
+        self.endpoints = list(endpoints)
+        self._loads: Dict[Hashable, asyncio.Future] = {}
+        self._scans: Dict[str, _SharedScan] = {}
+        self._log: List[str] = []
+
+    async def __aenter__(self) -> "DataContext":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for scan in self._scans.values():
+            scan.close()
+
+    def shared(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Start ``load`` the first time ``key`` is asked for; later calls get the same task"""
+        if key not in self._loads:
+            self._log.append(":".join(map(str, key)) if isinstance(key, tuple) else str(key))
+            self._loads[key] = asyncio.ensure_future(load())
+        return self._loads[key]
+
+    def batches(self, collection: str) -> ScanSubscription:
+        """Subscribe to ``collection`` in batches with the fields any endpoint of this context reads"""
+        scan = self._scans.get(collection)
+        subscription = scan.subscribe() if scan is not None else None
+        if subscription is None:
+            endpoints = [endpoint for endpoint in self.endpoints if collection in ENDPOINT_FIELDS[endpoint]]
+            scan = self._scans[collection] = _SharedScan(lambda: find_batches(self.db, endpoints, collection))
+            self._log.append(f"scan:{collection}")
+            subscription = scan.subscribe()
+        return subscription
+
+    def documents(self, collection: str) -> asyncio.Future:
+        """All documents of ``collection``, for panels whose output is per document anyway"""
+        async def collect(subscription):
+            async with subscription:
+                return [doc async for batch in subscription for doc in batch]
+        return self.shared(("documents", collection), lambda: collect(self.batches(collection)))
+
+    def view(self, name: str) -> asyncio.Future:
+        return self.shared(("view", name), lambda: read_view(self.db, name))
+
+    def loads(self) -> List[str]:
+        """Loads and scans started so far, in order"""
+        return list(self._log)
+
+
+async def run_panels(panels: Dict[str, Awaitable[Any]]) -> Dict[str, Any]:
+    """Run independent panels concurrently; a failing panel is reported instead of failing the rest"""
+    names = list(panels)
+    results = await asyncio.gather(*(panels[name] for name in names), return_exceptions=True)
+    output = {"panels": {}, "errors": {}}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            output["errors"][name] = getattr(result, "detail", None) or str(result)
+        else:
+            output["panels"][name] = result
+    return output
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Dict, Any, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+
+# Indexes every hot query relies on, declared per collection. Names are
+# explicit so the report can match declared against existing indexes.
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "employees": [
+        IndexModel([("name", ASCENDING)], name="name_1"),
+        IndexModel([("department", ASCENDING)], name="department_1"),
+        IndexModel([("employee_key", ASCENDING)], name="employee_key_1", unique=True,
+                   partialFilterExpression={"employee_key": {"$exists": True}}),
+        # Top-performer queries: equality filter, then score order with _id as tie-break
+        IndexModel([("performance_score", DESCENDING), ("_id", ASCENDING)], name="performance_score_-1__id_1"),
+        IndexModel([("department", ASCENDING), ("performance_score", DESCENDING), ("_id", ASCENDING)],
+                   name="department_1_performance_score_-1__id_1"),
+        IndexModel([("role", ASCENDING), ("performance_score", DESCENDING), ("_id", ASCENDING)],
+                   name="role_1_performance_score_-1__id_1"),
+    ],
+    "projects": [
+        IndexModel([("status", ASCENDING)], name="status_1"),
+        IndexModel([("success_probability", ASCENDING)], name="success_probability_1"),
+        # Projects naming newly ingested employees, whose teams are completed
+        IndexModel([("team_members", ASCENDING)], name="team_members_1"),
+    ],
+    "skill_gaps": [
+        IndexModel([("id", ASCENDING)], name="id_1"),
+        IndexModel([("department", ASCENDING)], name="department_1"),
+        IndexModel([("gap_level", ASCENDING)], name="gap_level_1"),
+    ],
+    "collaboration_networks": [
+        IndexModel([("employee_a", ASCENDING)], name="employee_a_1"),
+        IndexModel([("employee_b", ASCENDING)], name="employee_b_1"),
+        IndexModel([("employee_a_key", ASCENDING)], name="employee_a_key_1"),
+        IndexModel([("employee_b_key", ASCENDING)], name="employee_b_key_1"),
+    ],
+    "analytics_views": [
+        IndexModel([("view", ASCENDING)], name="view_1"),
+        # The critical-gap ranking, overall and per department
+        IndexModel([("view", ASCENDING), ("gap_percentage", DESCENDING), ("key", ASCENDING)],
+                   name="view_1_gap_percentage_-1_key_1"),
+        IndexModel([("view", ASCENDING), ("department", ASCENDING), ("gap_percentage", DESCENDING),
+                    ("key", ASCENDING)], name="view_1_department_1_gap_percentage_-1_key_1"),
+    ],
+}
+
+
+async def ensure_indexes(db):
+    """Create any missing required indexes; existing ones are left untouched"""
+    await asyncio.gather(*(
+        db[collection].create_indexes(indexes)
+        for collection, indexes in REQUIRED_INDEXES.items()
+    ))
+
+
+async def _index_usage(collection) -> Dict[str, int]:
+    """Return {index name: ops since server start}, or {} where $indexStats is unsupported"""
+    try:
+        stats = await collection.aggregate([{"$indexStats": {}}]).to_list(length=None)
+    except (OperationFailure, NotImplementedError):
+        return {}
+    return {stat['name']: stat['accesses']['ops'] for stat in stats}
+
+
+async def index_report(db) -> Dict[str, Any]:
+    """Compare declared indexes with what exists and how often each is used"""
+    report = {}
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        collection = db[collection_name]
+        existing = [index['name'] async for index in collection.list_indexes()]
+        usage = await _index_usage(collection)
+        declared = [index.document['name'] for index in indexes]
+        report[collection_name] = {
+            "missing": [name for name in declared if name not in existing],
+            "unused": [name for name in existing if name != "_id_" and usage.get(name) == 0],
+            "undeclared": [name for name in existing if name != "_id_" and name not in declared],
+            "usage": usage
+        }
+    return report
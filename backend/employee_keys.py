@@ -0,0 +1,135 @@
+from typing import Any, Dict, Iterable, List
+
+from pymongo import ReturnDocument, UpdateOne
+
+
+# Employees carry a dense integer ``employee_key`` next to their UUID. Edges
+# and project teams store these keys so joins compare integers instead of
+# display names. The next free key lives in a counter document.
+COUNTERS_COLLECTION = "counters"
+EMPLOYEE_KEY_COUNTER = "employee_key"
+MIGRATION_BATCH_SIZE = 1000
+
+
+async def reserve_employee_keys(db, count: int) -> int:
+    """Atomically reserve ``count`` consecutive keys and return the first one"""
+    counter = await db[COUNTERS_COLLECTION].find_one_and_update(
+        {"_id": EMPLOYEE_KEY_COUNTER},
+        {"$inc": {"seq": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return counter["seq"] - count
+
+
+async def set_next_employee_key(db, value: int):
+    """Reset the counter, e.g. after the employees collection is replaced"""
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": EMPLOYEE_KEY_COUNTER}, {"$set": {"seq": value}}, upsert=True
+    )
+
+
+async def resolve_employee_keys(db, names: Iterable[str]) -> Dict[str, int]:
+    """Map employee names to keys with one batched lookup.
+
+    A name shared by several employees resolves to the lowest key, the
+    earliest of them, whatever order the scan returns them in.
+    """
+    names = list(set(names))
+    keys = {}
+    if names:
+        async for emp in db.employees.find(
+            {"name": {"$in": names}, "employee_key": {"$exists": True}},
+            projection={"_id": 0, "name": 1, "employee_key": 1}
+        ):
+            keys[emp['name']] = min(keys.get(emp['name'], emp['employee_key']), emp['employee_key'])
+    return keys
+
+
+async def assign_employee_keys(db, employees: List[Dict[str, Any]]):
+    """Give every employee in the chunk a fresh key"""
+    first = await reserve_employee_keys(db, len(employees))
+    for offset, emp in enumerate(employees):
+        emp['employee_key'] = first + offset
+
+
+async def attach_team_member_keys(db, projects: List[Dict[str, Any]]):
+    """Fill ``team_member_keys`` from team member names; unknown names are skipped"""
+    keys = await resolve_employee_keys(db, (name for project in projects for name in project['team_members']))
+    for project in projects:
+        project['team_member_keys'] = [keys[name] for name in project['team_members'] if name in keys]
+
+
+async def attach_edge_keys(db, edges: List[Dict[str, Any]]):
+    """Fill ``employee_a_key``/``employee_b_key``; unknown names get None"""
+    keys = await resolve_employee_keys(db, (name for edge in edges for name in (edge['employee_a'], edge['employee_b'])))
+    for edge in edges:
+        edge['employee_a_key'] = keys.get(edge['employee_a'])
+        edge['employee_b_key'] = keys.get(edge['employee_b'])
+
+
+async def attach_new_employee_edges(db, employees: List[Dict[str, Any]]) -> int:
+    """Fill the keys of edges that name newly written employees.
+
+    Edges written before their employees keep None keys; this runs when an
+    employee chunk lands and returns the number of edges updated.
+    """
+    names = list({emp['name'] for emp in employees})
+    if not names:
+        return 0
+    query = {"$or": [
+        {"employee_a": {"$in": names}, "employee_a_key": None},
+        {"employee_b": {"$in": names}, "employee_b_key": None},
+    ]}
+    return await _backfill(db, "collaboration_networks", query, attach_edge_keys, ["employee_a_key", "employee_b_key"])
+
+
+async def _backfill(db, collection_name: str, missing: Dict[str, Any], attach, fields: List[str]) -> int:
+    """Attach keys to documents matching ``missing`` in batches; returns the count updated.
+
+    Pages by ``_id``, so documents whose keys stay unresolved are visited once.
+    """
+    collection = db[collection_name]
+    updated = 0
+    last_id = None
+    while True:
+        query = missing if last_id is None else {"$and": [missing, {"_id": {"$gt": last_id}}]}
+        batch = await collection.find(query).sort("_id", 1).limit(MIGRATION_BATCH_SIZE).to_list(length=None)
+        if not batch:
+            return updated
+        last_id = batch[-1]['_id']
+        await attach(db, batch)
+        await collection.bulk_write([
+            UpdateOne({"_id": doc['_id']}, {"$set": {field: doc[field] for field in fields}})
+            for doc in batch
+        ], ordered=False)
+        updated += len(batch)
+
+
+async def migrate_employee_keys(db) -> Dict[str, int]:
+    """Backfill integer keys into documents written before keys existed.
+
+    Idempotent: only documents without keys are touched, so it is safe to
+    run on every startup.
+    """
+    # Never hand out a key below one already stored
+    newest = await db.employees.find_one(
+        {"employee_key": {"$exists": True}}, projection={"employee_key": 1}, sort=[("employee_key", -1)]
+    )
+    await db[COUNTERS_COLLECTION].update_one(
+        {"_id": EMPLOYEE_KEY_COUNTER},
+        {"$max": {"seq": newest['employee_key'] + 1 if newest else 0}},
+        upsert=True
+    )
+    return {
+        "employees": await _backfill(db, "employees", {"employee_key": {"$exists": False}},
+                                     assign_employee_keys, ["employee_key"]),
+        "projects": await _backfill(db, "projects", {"team_member_keys": {"$exists": False}},
+                                    attach_team_member_keys, ["team_member_keys"]),
+        # Edges ingested before their employees hold None keys
+        "collaboration_networks": await _backfill(
+            db, "collaboration_networks",
+            {"$or": [{"employee_a_key": {"$in": [None]}}, {"employee_b_key": {"$in": [None]}}]},
+            attach_edge_keys, ["employee_a_key", "employee_b_key"]
+        ),
+    }
@@ -0,0 +1,154 @@
+import functools
+import operator
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+    pc = None
+
+
+# Default cell size of the experience/performance histogram; its size is
+# bounded by the value ranges, not by headcount
+EXPERIENCE_BIN_YEARS = 1.0
+PERFORMANCE_BIN = 0.05
+# Keeps values on a bin edge (0.65 / 0.05 = 12.999...) in the upper bin
+_BIN_EPSILON = 1e-9
+
+
+class EmployeeFilter(BaseModel):
+    """Employee filter shared by the Mongo, snapshot and warehouse paths"""
+    department: Optional[str] = None
+    role: Optional[str] = None
+    min_performance: Optional[float] = None
+    max_performance: Optional[float] = None
+    min_experience: Optional[float] = None
+    max_experience: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return all(value is None for value in self.dict().values())
+
+    def _ranges(self) -> List[Tuple[str, str, float]]:
+        bounds = [
+            ("performance_score", "$gte", self.min_performance),
+            ("performance_score", "$lte", self.max_performance),
+            ("experience_years", "$gte", self.min_experience),
+            ("experience_years", "$lte", self.max_experience),
+        ]
+        return [(field, op, value) for field, op, value in bounds if value is not None]
+
+    def mongo_match(self) -> Dict[str, Any]:
+        match: Dict[str, Any] = {}
+        if self.department is not None:
+            match["department"] = self.department
+        if self.role is not None:
+            match["role"] = self.role
+        for field, op, value in self._ranges():
+            match.setdefault(field, {})[op] = value
+        return match
+
+    def arrow_filter(self):
+        """Expression for ``pyarrow.Table.filter``, or None when nothing is filtered"""
+        conditions = [pc.field(field) == getattr(self, field)
+                      for field in ("department", "role") if getattr(self, field) is not None]
+        for field, op, value in self._ranges():
+            conditions.append(pc.field(field) >= value if op == "$gte" else pc.field(field) <= value)
+        return functools.reduce(operator.and_, conditions) if conditions else None
+
+    def sql_where(self) -> Tuple[str, Dict[str, Any]]:
+        """WHERE clause with @named parameters, or an empty string"""
+        clauses, params = [], {}
+        for field in ("department", "role"):
+            if getattr(self, field) is not None:
+                clauses.append(f"{field} = @{field}")
+                params[field] = getattr(self, field)
+        for i, (field, op, value) in enumerate(self._ranges()):
+            clauses.append(f"{field} {'>=' if op == '$gte' else '<='} @bound_{i}")
+            params[f"bound_{i}"] = value
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def mongo_department_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-department totals of matched employees, shaped like the department view"""
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": "$department",
+            "count": {"$sum": 1},
+            "performance_sum": {"$sum": "$performance_score"},
+            "productivity_sum": {"$sum": "$productivity_score"}
+        }}
+    ]
+
+
+def mongo_histogram_pipeline(match: Dict[str, Any], experience_bin: float,
+                             performance_bin: float) -> List[Dict[str, Any]]:
+    """Aggregation binning matched employees by experience and performance"""
+    def bin_of(field, width):
+        return {"$floor": {"$add": [{"$divide": [f"${field}", width]}, _BIN_EPSILON]}}
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": {"x": bin_of("experience_years", experience_bin), "y": bin_of("performance_score", performance_bin)},
+            "count": {"$sum": 1},
+            "performance": {"$avg": "$performance_score"},
+            "productivity": {"$avg": "$productivity_score"},
+            "collaboration": {"$avg": "$collaboration_index"}
+        }},
+        {"$project": {"_id": 0, "x": "$_id.x", "y": "$_id.y", "count": 1, "performance": 1, "productivity": 1, "collaboration": 1}}
+    ]
+
+
+def arrow_histogram(table, experience_bin: float, performance_bin: float) -> List[Dict[str, Any]]:
+    """The same binning over an Arrow table of employees"""
+    def bin_of(field, width):
+        return pc.floor(pc.add(pc.divide(pc.cast(table[field], pa.float64()), width), _BIN_EPSILON))
+    if table.num_rows == 0:
+        return []
+    grouped = table.append_column("x", bin_of("experience_years", experience_bin)).append_column(
+        "y", bin_of("performance_score", performance_bin)
+    ).group_by(["x", "y"], use_threads=False).aggregate([
+        ("performance_score", "count"), ("performance_score", "mean"),
+        ("productivity_score", "mean"), ("collaboration_index", "mean")
+    ])
+    return grouped.rename_columns({
+        "performance_score_count": "count", "performance_score_mean": "performance",
+        "productivity_score_mean": "productivity", "collaboration_index_mean": "collaboration"
+    }).to_pylist()
+
+
+def sql_histogram(where: str) -> str:
+    """The same binning as SQL over the employees table; takes @experience_bin and @performance_bin"""
+    return f"""
+        SELECT FLOOR(experience_years / @experience_bin + {_BIN_EPSILON!r}) AS x,
+               FLOOR(performance_score / @performance_bin + {_BIN_EPSILON!r}) AS y,
+               COUNT(*) AS count, AVG(performance_score) AS performance,
+               AVG(productivity_score) AS productivity, AVG(collaboration_index) AS collaboration
+        FROM {{employees}} {where} GROUP BY x, y
+    """
+
+
+def experience_histogram(rows: List[Dict[str, Any]], experience_bin: float,
+                         performance_bin: float) -> Dict[str, Any]:
+    """Format binned rows (x, y, count and per-cell means) as the experience histogram"""
+    cells = []
+    for row in sorted(rows, key=lambda row: (row['x'], row['y'])):
+        x, y = int(row['x']), int(row['y'])
+        cells.append({
+            "experience": [round(x * experience_bin, 4), round((x + 1) * experience_bin, 4)],
+            "performance": [round(y * performance_bin, 4), round((y + 1) * performance_bin, 4)],
+            "count": int(row['count']),
+            "avg_performance": round(float(row['performance']), 3),
+            "avg_productivity": round(float(row['productivity']), 3),
+            "avg_collaboration": round(float(row['collaboration']), 3)
+        })
+    return {
+        "experience_bin": experience_bin,
+        "performance_bin": performance_bin,
+        "employees": sum(cell["count"] for cell in cells),
+        "cells": cells
+    }
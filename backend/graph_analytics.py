@@ -0,0 +1,228 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class CollaborationGraph:
+    """Undirected weighted graph in compressed sparse row (CSR) form.
+
+    Nodes are integer ids ``0..n-1`` with display names in ``names``. Each
+    undirected edge is stored in both directions; parallel edges are merged
+    by summing their weights and self-loops are dropped.
+    """
+
+    def __init__(self, names: List[str], sources: np.ndarray, targets: np.ndarray, weights: np.ndarray):
+        self.names = names
+        n = len(names)
+        keep = sources != targets
+        rows = np.concatenate([sources[keep], targets[keep]]).astype(np.int64)
+        cols = np.concatenate([targets[keep], sources[keep]]).astype(np.int64)
+        values = np.concatenate([weights[keep], weights[keep]]).astype(np.float64)
+
+        # Merge parallel edges: sort by (row, col) and sum runs of equal keys
+        keys = rows * n + cols
+        order = np.argsort(keys)
+        keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else keys
+        self.weights = np.add.reduceat(values[order], starts) if len(keys) else values
+        unique_keys = keys[starts]
+        self.indices = unique_keys % n if n else unique_keys
+        rows = unique_keys // n if n else unique_keys
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self.indptr[1:])
+        self._rows = rows
+
+    @classmethod
+    def from_csr(cls, names: List[str], indptr: np.ndarray, indices: np.ndarray,
+                 weights: np.ndarray) -> "CollaborationGraph":
+        """Wrap the CSR arrays of an already built graph without copying them"""
+        graph = cls.__new__(cls)
+        graph.names = names
+        graph.indptr, graph.indices, graph.weights = indptr, indices, weights
+        graph._rows = np.repeat(np.arange(len(names)), np.diff(indptr))
+        return graph
+
+    @property
+    def node_count(self) -> int:
+        return len(self.names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def weighted_degree(self) -> np.ndarray:
+        return np.bincount(self._rows, weights=self.weights, minlength=self.node_count)
+
+    def _neighbors(self, nodes: np.ndarray):
+        """Return (owner, neighbor) arrays for every edge leaving ``nodes``"""
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        owners = np.repeat(nodes, counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return owners, self.indices[np.repeat(starts, counts) + offsets]
+
+    def pagerank(self, damping: float = 0.85, tolerance: float = 1e-8, max_iterations: int = 100) -> np.ndarray:
+        """Weighted PageRank by power iteration; dangling mass is spread uniformly"""
+        n = self.node_count
+        if n == 0:
+            return np.zeros(0)
+        degree = self.weighted_degree()
+        dangling = degree == 0
+        inverse_degree = np.divide(1.0, degree, out=np.zeros(n), where=~dangling)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iterations):
+            share = rank * inverse_degree
+            spread = np.bincount(self.indices, weights=self.weights * share[self._rows], minlength=n)
+            updated = (1 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+            converged = np.abs(updated - rank).sum() < tolerance
+            rank = updated
+            if converged:
+                break
+        return rank
+
+    def betweenness(self, samples: int = 16, seed: Optional[int] = 0) -> np.ndarray:
+        """Approximate (unweighted) betweenness centrality from sampled source nodes.
+
+        Runs Brandes' accumulation from ``samples`` random pivots with
+        level-synchronous BFS over the CSR arrays and scales the result up to
+        an estimate of the exact, normalized centrality.
+        """
+        n = self.node_count
+        centrality = np.zeros(n)
+        if n < 3:
+            return centrality
+        rng = np.random.default_rng(seed)
+        pivots = rng.choice(n, size=min(samples, n), replace=False)
+        for source in pivots:
+            distance = np.full(n, -1, dtype=np.int64)
+            sigma = np.zeros(n)
+            distance[source] = 0
+            sigma[source] = 1
+            levels = []
+            frontier = np.array([source])
+            while len(frontier):
+                owners, neighbors = self._neighbors(frontier)
+                unseen = distance[neighbors] == -1
+                next_frontier = np.unique(neighbors[unseen])
+                distance[next_frontier] = len(levels) + 1
+                # Shortest-path edges go from this level to the next one
+                on_path = distance[neighbors] == len(levels) + 1
+                owners, neighbors = owners[on_path], neighbors[on_path]
+                sigma += np.bincount(neighbors, weights=sigma[owners], minlength=n)
+                levels.append((owners, neighbors))
+                frontier = next_frontier
+            delta = np.zeros(n)
+            for owners, neighbors in reversed(levels):
+                contribution = sigma[owners] / sigma[neighbors] * (1 + delta[neighbors])
+                delta += np.bincount(owners, weights=contribution, minlength=n)
+            delta[source] = 0
+            centrality += delta
+        # Scale the sampled sum to all sources and normalize for undirected graphs
+        return centrality * (n / len(pivots)) / ((n - 1) * (n - 2))
+
+    def connected_components(self) -> np.ndarray:
+        """Label each node with the smallest node id in its component"""
+        labels = np.arange(self.node_count)
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, self._rows, labels[self.indices])
+            # Pointer jumping shortens long chains of labels
+            labels = labels[labels]
+            if np.array_equal(labels, previous):
+                return labels
+
+    def communities(self, max_iterations: int = 20, seed: Optional[int] = 0) -> np.ndarray:
+        """Detect communities by weighted label propagation.
+
+        Each round, a random half of the nodes adopt the label with the
+        largest total edge weight among their neighbors (ties go to the
+        smallest label). Updating only half the nodes per round avoids the
+        oscillation of fully synchronous propagation.
+        """
+        n = self.node_count
+        labels = np.arange(n)
+        if self.edge_count == 0:
+            return labels
+        rng = np.random.default_rng(seed)
+        for _ in range(max_iterations):
+            # Sum edge weight per (node, neighbor label) pair; sorting the
+            # keys groups pairs by node with labels ascending within a node
+            keys = self._rows * n + labels[self.indices]
+            order = np.argsort(keys)
+            keys = keys[order]
+            pair_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            totals = np.add.reduceat(self.weights[order], pair_starts)
+            nodes, candidate_labels = keys[pair_starts] // n, keys[pair_starts] % n
+
+            # Best label per node: largest total, smallest label on ties
+            node_starts = np.flatnonzero(np.r_[True, nodes[1:] != nodes[:-1]])
+            node_max = np.maximum.reduceat(totals, node_starts)
+            is_max = totals >= np.repeat(node_max, np.diff(np.r_[node_starts, len(nodes)]))
+            winners = np.flatnonzero(is_max)
+            first = np.r_[True, nodes[winners][1:] != nodes[winners][:-1]]
+            best = labels.copy()
+            best[nodes[winners[first]]] = candidate_labels[winners[first]]
+
+            update = rng.random(n) < 0.5
+            updated = np.where(update, best, labels)
+            if np.array_equal(updated, labels) and np.array_equal(best, labels):
+                break
+            labels = updated
+        return labels
+
+
+def group_sizes(labels: np.ndarray) -> List[Dict[str, Any]]:
+    """Return [{label, size}] for every group, largest first"""
+    groups, sizes = np.unique(labels, return_counts=True)
+    order = np.argsort(-sizes, kind='stable')
+    return [{"label": int(groups[i]), "size": int(sizes[i])} for i in order]
+
+
+def analyze_graph(graph: CollaborationGraph, top: int = 10, betweenness_samples: int = 16) -> Dict[str, Any]:
+    """Compute centrality rankings, components and communities for a graph"""
+    degree = graph.weighted_degree()
+    pagerank = graph.pagerank()
+    betweenness = graph.betweenness(samples=betweenness_samples)
+    components = graph.connected_components()
+    communities = graph.communities()
+
+    def ranking(scores: np.ndarray) -> List[Dict[str, Any]]:
+        k = min(top, len(scores))
+        if k == 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [{"name": graph.names[i], "score": round(float(scores[i]), 6)} for i in best]
+
+    component_groups = group_sizes(components)
+    community_groups = group_sizes(communities)
+    return {
+        "summary": {
+            "nodes": graph.node_count,
+            "edges": graph.edge_count,
+            "components": len(component_groups),
+            "largest_component": component_groups[0]["size"] if component_groups else 0,
+            "communities": len(community_groups),
+            "betweenness_samples": min(betweenness_samples, graph.node_count)
+        },
+        "top_weighted_degree": ranking(degree),
+        "top_pagerank": ranking(pagerank),
+        "top_betweenness": ranking(betweenness),
+        "largest_communities": [
+            {
+                "size": group["size"],
+                "members": [graph.names[i] for i in np.flatnonzero(communities == group["label"])[:top]]
+            }
+            for group in community_groups[:top]
+        ]
+    }
+
+
+def analyze_csr_graph(names: List[str], indptr: np.ndarray, indices: np.ndarray, weights: np.ndarray,
+                      top: int = 10, betweenness_samples: int = 16) -> Dict[str, Any]:
+    """``analyze_graph`` over a graph's CSR arrays.
+
+    Compute-pool workers receive the arrays through shared memory rather
+    than a pickled graph.
+    """
+    return analyze_graph(CollaborationGraph.from_csr(names, indptr, indices, weights), top, betweenness_samples)
@@ -0,0 +1,157 @@
+import csv
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from pydantic import ValidationError
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# CSV cells holding list fields separate their items with this character
+CSV_LIST_SEPARATOR = ";"
+
+Documents = Union[Iterable[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+ChunkHook = Callable[[Any, List[Dict[str, Any]]], Awaitable[None]]
+
+
+class IngestionError(ValueError):
+    """A record could not be parsed or validated.
+
+    ``ingested`` counts the documents written before the failure.
+    """
+
+    def __init__(self, message: str, ingested: int = 0):
+        super().__init__(message)
+        self.ingested = ingested
+
+
+async def _iterate(documents: Documents) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(documents, "__aiter__"):
+        async for doc in documents:
+            yield doc
+    else:
+        for doc in documents:
+            yield doc
+
+
+async def ingest_documents(
+    db,
+    collection_name: str,
+    documents: Documents,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    prepare_chunk: Optional[ChunkHook] = None,
+    on_chunk: Optional[ChunkHook] = None
+) -> Dict[str, Any]:
+    """Insert documents in fixed-size chunks with unordered bulk writes.
+
+    Only one chunk is held in memory at a time. ``prepare_chunk(db, chunk)``
+    may fill in fields before each chunk is written (e.g. employee keys) and
+    ``on_chunk(db, chunk)`` runs after, e.g. to maintain the analytics views.
+    Returns the document count, elapsed time and throughput.
+    """
+    collection = db[collection_name]
+    start = time.perf_counter()
+    count = 0
+    chunk = []
+
+    async def flush():
+        nonlocal count, chunk
+        if prepare_chunk is not None:
+            await prepare_chunk(db, chunk)
+        await collection.insert_many(chunk, ordered=False)
+        if on_chunk is not None:
+            await on_chunk(db, chunk)
+        count += len(chunk)
+        chunk = []
+
+    try:
+        async for doc in _iterate(documents):
+            chunk.append(doc)
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+    except IngestionError as e:
+        e.ingested = count
+        raise
+
+    seconds = time.perf_counter() - start
+    return {
+        "documents": count,
+        "seconds": round(seconds, 3),
+        "docs_per_sec": round(count / seconds, 1) if seconds > 0 else 0
+    }
+
+
+def _decode_line(line: bytes, line_number: int) -> str:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError as e:
+        raise IngestionError(f"line {line_number}: invalid UTF-8 ({e.reason})")
+
+
+async def iter_lines(byte_chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a streamed request body into decoded lines without buffering it whole"""
+    buffer = b""
+    line_number = 0
+    async for data in byte_chunks:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            yield _decode_line(line, line_number)
+    if buffer:
+        yield _decode_line(buffer, line_number + 1)
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Dict[str, Any]]:
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise IngestionError(f"line {line_number}: invalid JSON ({e.msg})")
+
+
+async def parse_csv(lines: AsyncIterator[str], list_fields: Iterable[str] = ()) -> AsyncIterator[Dict[str, Any]]:
+    """Parse CSV with a header row, one record per line.
+
+    Columns named in ``list_fields`` are split on ``CSV_LIST_SEPARATOR``;
+    other empty cells are dropped so model defaults apply.
+    """
+    list_fields = set(list_fields)
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        row = next(csv.reader([line]))
+        if header is None:
+            header = row
+            continue
+        if len(row) != len(header):
+            raise IngestionError(f"line {line_number}: expected {len(header)} columns, got {len(row)}")
+        record = {}
+        for field, value in zip(header, row):
+            if field in list_fields:
+                record[field] = [item.strip() for item in value.split(CSV_LIST_SEPARATOR) if item.strip()]
+            elif value != "":
+                record[field] = value
+        yield record
+
+
+async def validate_records(records: AsyncIterator[Dict[str, Any]], model) -> AsyncIterator[Dict[str, Any]]:
+    """Validate each record against a Pydantic model and yield its document form"""
+    record_number = 0
+    async for record in records:
+        record_number += 1
+        try:
+            document = model(**record).dict()
+        except (ValidationError, TypeError) as e:
+            raise IngestionError(f"record {record_number}: invalid {model.__name__}: {e}")
+        yield document
@@ -0,0 +1,279 @@
+import cProfile
+import functools
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from fastapi.routing import APIRoute, request_response
+from pymongo import monitoring
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+
+# Request duration buckets (seconds) and Mongo-commands-per-request buckets;
+# a route whose command count grows with the data is an N+1 pattern
+DURATION_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+COMMAND_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 500]
+PROFILE_HEADER = "x-profile"
+
+
+class RequestProfile:
+    """Timing and Mongo command counts collected while serving one request"""
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.started = time.perf_counter()
+        self.endpoint_started: Optional[float] = None
+        self.endpoint_finished: Optional[float] = None
+        self.response_started: Optional[float] = None
+        self.db_seconds = 0.0
+        self.commands: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record_command(self, name: str, seconds: float):
+        # Motor runs commands on executor threads, so updates are locked
+        with self._lock:
+            self.commands[name] += 1
+            self.db_seconds += seconds
+
+    def phases(self) -> Dict[str, float]:
+        """Split the request into DB, compute and serialization seconds.
+
+        DB time is the summed duration of Mongo commands (concurrent
+        commands can overlap); compute is the rest of the endpoint's time;
+        serialization runs from the endpoint returning to the response
+        starting.
+        """
+        if self.endpoint_started is None or self.endpoint_finished is None:
+            return {"db": self.db_seconds, "compute": 0.0, "serialization": 0.0}
+        endpoint_seconds = self.endpoint_finished - self.endpoint_started
+        response_started = self.response_started or self.endpoint_finished
+        return {
+            "db": self.db_seconds,
+            "compute": max(0.0, endpoint_seconds - self.db_seconds),
+            "serialization": max(0.0, response_started - self.endpoint_finished)
+        }
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+class CommandProfiler(monitoring.CommandListener):
+    """pymongo command listener attributing every command to the current request"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.record_command(event.command_name, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+def _profiled_endpoint(endpoint: Callable, path: str) -> Callable:
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return await endpoint(*args, **kwargs)
+        profile.route = path
+        profile.endpoint_started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            profile.endpoint_finished = time.perf_counter()
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute that marks when its endpoint starts and returns, so the
+    middleware can tell compute from serialization time"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        # Wrap the resolved call rather than ``endpoint`` so routes copied by
+        # include_router are not wrapped twice
+        self.dependant.call = _profiled_endpoint(self.dependant.call, self.path)
+        self.app = request_response(self.get_route_handler())
+
+
+class _Histogram:
+    def __init__(self, buckets: List[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+def _labels(**labels) -> str:
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """Per-route request metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.requests: Dict[tuple, int] = defaultdict(int)
+        self.durations: Dict[str, _Histogram] = {}
+        self.phase_seconds: Dict[tuple, float] = defaultdict(float)
+        self.commands: Dict[tuple, int] = defaultdict(int)
+        self.commands_per_request: Dict[str, _Histogram] = {}
+
+    def observe(self, method: str, status: int, profile: RequestProfile, seconds: float):
+        route = profile.route or "unmatched"
+        self.requests[(route, method, status)] += 1
+        self.durations.setdefault(route, _Histogram(DURATION_BUCKETS)).observe(seconds)
+        for phase, value in profile.phases().items():
+            self.phase_seconds[(route, phase)] += value
+        for command, count in profile.commands.items():
+            self.commands[(route, command)] += count
+        self.commands_per_request.setdefault(route, _Histogram(COMMAND_BUCKETS)).observe(
+            sum(profile.commands.values())
+        )
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests served, by route, method and status.",
+            "# TYPE http_requests_total counter"
+        ]
+        for (route, method, status), count in sorted(self.requests.items()):
+            lines.append(f"http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+        self._render_histograms(lines, "http_request_duration_seconds", "Request latency.", self.durations)
+        lines += [
+            "# HELP http_request_phase_seconds_total Time spent per phase (db, compute, serialization).",
+            "# TYPE http_request_phase_seconds_total counter"
+        ]
+        for (route, phase), seconds in sorted(self.phase_seconds.items()):
+            lines.append(f"http_request_phase_seconds_total{_labels(route=route, phase=phase)} {seconds:.6f}")
+        lines += [
+            "# HELP mongo_commands_total Mongo commands issued, by route and command.",
+            "# TYPE mongo_commands_total counter"
+        ]
+        for (route, command), count in sorted(self.commands.items()):
+            lines.append(f"mongo_commands_total{_labels(route=route, command=command)} {count}")
+        self._render_histograms(lines, "mongo_commands_per_request", "Mongo commands per request.",
+                                self.commands_per_request)
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: List[str], name: str, description: str, histograms: Dict[str, _Histogram]):
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+        for route, histogram in sorted(histograms.items()):
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f"{name}_bucket{_labels(route=route, le=bound)} {count}")
+            lines.append(f"{name}_bucket{_labels(route=route, le='+Inf')} {histogram.total}")
+            lines.append(f"{name}_sum{_labels(route=route)} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{_labels(route=route)} {histogram.total}")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware recording a RequestProfile for every HTTP request.
+
+    When ``profile_dir`` is set, a request carrying ``X-Profile: cprofile``
+    (or ``pyinstrument`` if installed) is also profiled and the dump's file
+    name is returned in the ``X-Profile-Dump`` header. Profilers hook the
+    whole thread, so only one profiled request runs at a time; another
+    arriving meanwhile is rejected with 409. Unprofiled requests served
+    concurrently still show up in the dump.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, profile_dir: Optional[str] = None):
+        self.app = app
+        self.registry = registry
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self._profiling = False
+
+    def _profiler(self, scope) -> Optional[str]:
+        if self.profile_dir is None:
+            return None
+        headers = dict(scope.get("headers") or [])
+        requested = headers.get(PROFILE_HEADER.encode(), b"").decode().lower()
+        if requested == "cprofile" or (requested == "pyinstrument" and pyinstrument is not None):
+            return requested
+        return None
+
+    @staticmethod
+    async def _reject_busy(send):
+        body = b'{"detail":"Another profiled request is running; retry when it finishes"}'
+        await send({"type": "http.response.start", "status": 409,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        kind = self._profiler(scope)
+        if kind is not None:
+            # A second profiler would replace the running one's hook and
+            # both dumps would be wrong
+            if self._profiling:
+                await self._reject_busy(send)
+                return
+            self._profiling = True
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        status = 500
+        dump_name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.{'prof' if kind == 'cprofile' else 'html'}"
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                profile.response_started = time.perf_counter()
+                status = message["status"]
+                if kind is not None:
+                    message = {**message, "headers": [*message.get("headers", []),
+                                                      (b"x-profile-dump", dump_name.encode())]}
+            await send(message)
+
+        profiler = None
+        try:
+            if kind == "cprofile":
+                profiler = cProfile.Profile()
+                profiler.enable()
+            elif kind == "pyinstrument":
+                profiler = pyinstrument.Profiler(async_mode="enabled")
+                profiler.start()
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if kind is not None:
+                # Released before the dump, which never awaits, so no other
+                # profile starts until this profiler is stopped
+                self._profiling = False
+            if profiler is not None:
+                self._dump(kind, profiler, dump_name)
+            self.registry.observe(scope["method"], status, profile, time.perf_counter() - profile.started)
+            current_profile.reset(token)
+
+    def _dump(self, kind: str, profiler, dump_name: str):
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / dump_name
+        if kind == "cprofile":
+            profiler.disable()
+            profiler.dump_stats(str(path))
+        else:
+            profiler.stop()
+            path.write_text(profiler.output_html())
+
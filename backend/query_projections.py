@@ -0,0 +1,175 @@
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Union
+
+
+# Fields each endpoint reads, per collection. Queries go through ``find``,
+# which turns these into Motor projections, so a handler only ever receives
+# the fields declared here. ``_id`` is fetched only when listed. A load shared
+# by several endpoints fetches the union of their fields.
+ENDPOINT_FIELDS: Dict[str, Dict[str, List[str]]] = {
+    "collaboration_network": {
+        "employees": ["name", "department", "role", "performance_score", "collaboration_index"],
+        "collaboration_networks": ["employee_a", "employee_b", "collaboration_strength",
+                                   "interaction_frequency", "projects_shared"],
+    },
+    "collaboration_network_page": {
+        "employees": ["_id", "name", "department", "role", "performance_score", "collaboration_index"],
+        "collaboration_networks": ["_id", "employee_a", "employee_b", "collaboration_strength",
+                                   "interaction_frequency", "projects_shared"],
+    },
+    "collaboration_graph": {
+        "employees": ["employee_key", "name"],
+        "collaboration_networks": ["employee_a_key", "employee_b_key", "collaboration_strength"],
+    },
+    "skill_gaps": {
+        "skill_gaps": ["department", "skill", "gap_level", "current_proficiency", "required_proficiency",
+                       "affected_employees", "training_recommendations"],
+    },
+    "project_forecasting": {
+        "projects": ["name", "success_probability", "status", "team_members"],
+    },
+    "performance_trends": {
+        "employees": ["name", "department", "performance_score", "productivity_score"],
+    },
+    "semantic_matching": {
+        "employees": ["name", "department", "skills", "performance_score"],
+        "projects": ["name", "required_skills", "team_members"],
+    },
+    "team_assignment": {
+        "employees": ["name", "department", "skills", "performance_score"],
+        "projects": ["name", "required_skills"],
+    },
+    "skill_index": {
+        "employees": ["_id", "employee_key", "name", "skills"],
+    },
+}
+
+# Cursor batch sizes sized to each collection's projected document width
+BATCH_SIZES = {
+    "employees": 5000,
+    "projects": 2000,
+    "collaboration_networks": 10000,
+    "skill_gaps": 1000,
+}
+
+
+Endpoints = Union[str, Sequence[str]]
+
+
+def endpoint_names(endpoints: Endpoints) -> List[str]:
+    return [endpoints] if isinstance(endpoints, str) else list(endpoints)
+
+
+def declared_fields(endpoints: Endpoints, collection: str) -> List[str]:
+    """Fields ``endpoints`` declare for ``collection``, in declaration order"""
+    fields = {}
+    for endpoint in endpoint_names(endpoints):
+        for field in ENDPOINT_FIELDS[endpoint][collection]:
+            fields.setdefault(field)
+    return list(fields)
+
+
+def projection(endpoints: Endpoints, collection: str) -> Dict[str, int]:
+    spec = {field: 1 for field in declared_fields(endpoints, collection)}
+    if "_id" not in spec:
+        spec["_id"] = 0
+    return spec
+
+
+class TrackedDocument(dict):
+    """Document that records which fields the handler reads"""
+
+    def __init__(self, document: Dict[str, Any], accessed: Set[str]):
+        super().__init__(document)
+        self._accessed = accessed
+
+    def __getitem__(self, key):
+        self._accessed.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self._accessed.add(key)
+        return super().get(key, default)
+
+
+class ProjectionAudit:
+    """Records fetched versus read fields per endpoint when enabled.
+
+    A declared field no handler reads is over-fetched; ``report`` lists
+    them so the declarations can be tightened.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.documents: Dict[tuple, int] = defaultdict(int)
+        self.accessed: Dict[tuple, Set[str]] = defaultdict(set)
+
+    def track(self, endpoint: str, collection: str, document: Dict[str, Any]) -> TrackedDocument:
+        self.documents[(endpoint, collection)] += 1
+        return TrackedDocument(document, self.accessed[(endpoint, collection)])
+
+    def report(self) -> Dict[str, Any]:
+        report = {}
+        for (endpoint, collection), count in sorted(self.documents.items()):
+            declared = declared_fields(endpoint.split("+"), collection)
+            report.setdefault(endpoint, {})[collection] = {
+                "documents": count,
+                "declared": declared,
+                "unused": [field for field in declared if field not in self.accessed[(endpoint, collection)]]
+            }
+        return report
+
+
+projection_audit = ProjectionAudit()
+
+
+class _AuditedCursor:
+    """Wraps a Motor cursor so every document it yields is tracked"""
+
+    def __init__(self, cursor, endpoint: str, collection: str):
+        self.cursor = cursor
+        self.endpoint = endpoint
+        self.collection = collection
+
+    def sort(self, *args, **kwargs):
+        self.cursor = self.cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, limit: int):
+        self.cursor = self.cursor.limit(limit)
+        return self
+
+    async def to_list(self, length: Optional[int]):
+        documents = await self.cursor.to_list(length=length)
+        return [projection_audit.track(self.endpoint, self.collection, doc) for doc in documents]
+
+    async def __aiter__(self):
+        async for doc in self.cursor:
+            yield projection_audit.track(self.endpoint, self.collection, doc)
+
+
+def find(db, endpoints: Endpoints, collection: str, query: Optional[Dict[str, Any]] = None):
+    """``db[collection].find`` restricted to the fields ``endpoints`` declare"""
+    cursor = db[collection].find(query or {}, projection=projection(endpoints, collection),
+                                 batch_size=BATCH_SIZES[collection])
+    if projection_audit.enabled:
+        # Fields read from a shared load are audited against the union
+        return _AuditedCursor(cursor, "+".join(endpoint_names(endpoints)), collection)
+    return cursor
+
+
+async def iter_batches(cursor, size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Group a cursor's documents into lists of at most ``size``, so callers hold one batch at a time"""
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def find_batches(db, endpoints: Endpoints, collection: str, query: Optional[Dict[str, Any]] = None):
+    """``find`` in batches of the collection's ``BATCH_SIZES``"""
+    return iter_batches(find(db, endpoints, collection, query), BATCH_SIZES[collection])
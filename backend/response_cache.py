@@ -0,0 +1,124 @@
+import asyncio
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class ResponseCache:
+    """Bounded LRU cache with per-entry TTL and request coalescing.
+
+    Concurrent misses for the same key share one computation: the first
+    caller computes while the others await its result. ``invalidate`` bumps
+    a generation counter so computations that started before a write never
+    store their (stale) result.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Any]):
+        found, value = self._lookup(key)
+        if found:
+            self.hits += 1
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await compute()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if generation == self._generation:
+                self._store(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self):
+        """Drop every entry; called by all write paths"""
+        self._entries.clear()
+        self._inflight.clear()
+        self._generation += 1
+        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0
+        }
+
+
+def cached_response(cache: ResponseCache, bypass: Optional[Callable[..., bool]] = None):
+    """Cache an async route handler's result keyed by route and query params.
+
+    ``bypass`` receives the handler's keyword arguments and returns True for
+    calls that must not be cached (e.g. streaming responses).
+    """
+    def decorator(handler):
+        signature = inspect.signature(handler)
+
+        @functools.wraps(handler)
+        async def wrapper(**kwargs):
+            # Fill in defaults so direct calls and HTTP calls share cache keys
+            bound = signature.bind(**kwargs)
+            bound.apply_defaults()
+            kwargs = bound.arguments
+            if bypass is not None and bypass(**kwargs):
+                return await handler(**kwargs)
+            key = (handler.__name__, tuple(sorted(kwargs.items())))
+            return await cache.get_or_compute(key, lambda: handler(**kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,229 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+DEPARTMENTS = ["Engineering", "Marketing", "Sales", "HR", "Finance", "Operations"]
+ROLES = ["Manager", "Senior", "Junior", "Lead", "Specialist", "Analyst"]
+SKILLS_POOL = ["Python", "JavaScript", "Data Analysis", "Project Management", "Communication",
+               "Leadership", "Machine Learning", "Cloud Computing", "Agile", "Marketing Strategy",
+               "Sales Management", "Financial Analysis", "HR Operations", "Team Leadership"]
+PROJECT_NAMES = ["AI Platform Development", "Customer Analytics Dashboard", "Mobile App Redesign",
+                 "Cloud Migration", "Marketing Automation", "Sales CRM Enhancement",
+                 "Financial Reporting System", "HR Digital Transformation"]
+PROJECT_STATUSES = ["Planning", "In Progress", "Testing", "Completed", "On Hold"]
+GAP_SKILLS = ["Python", "Machine Learning", "Cloud Computing", "Data Analysis", "Digital Marketing",
+              "Sales Analytics", "Financial Modeling", "HR Technology", "Project Management"]
+GAP_LEVELS = ["critical", "moderate", "low"]
+
+DEFAULT_BATCH_SIZE = 10000
+
+Batch = List[Dict[str, Any]]
+
+
+def employee_name(index: int) -> str:
+    return f"Employee {index + 1}"
+
+
+def iter_documents(batches: Iterator[Batch]) -> Iterator[Dict[str, Any]]:
+    """Flatten generator batches into a stream of documents"""
+    for batch in batches:
+        yield from batch
+
+
+def _uuids(rng: np.random.Generator, n: int) -> List[str]:
+    """Draw reproducible version-4 UUID strings from the generator's stream"""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    digits = raw.tobytes().hex()
+    return [
+        f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+        for h in (digits[32 * i:32 * (i + 1)] for i in range(n))
+    ]
+
+
+def _pick(values: List[str], indices: np.ndarray) -> List[str]:
+    return np.asarray(values, dtype=object)[indices].tolist()
+
+
+def _subsets(rng: np.random.Generator, pool_size: int, sizes: np.ndarray) -> List[List[int]]:
+    """Draw one subset per row without replacement, of the given sizes, from a small pool"""
+    permutations = np.argsort(rng.random((len(sizes), pool_size)), axis=1).tolist()
+    return [row[:size] for row, size in zip(permutations, sizes.tolist())]
+
+
+def _distinct_rows(rng: np.random.Generator, population: int, rows: int, width: int) -> np.ndarray:
+    """Draw ``rows`` x ``width`` indices with no repeats within a row by redrawing collisions"""
+    draws = rng.integers(0, population, size=(rows, width))
+    while True:
+        ordered = np.sort(draws, axis=1)
+        collisions = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+        if len(collisions) == 0:
+            return draws
+        draws[collisions] = rng.integers(0, population, size=(len(collisions), width))
+
+
+class WorkforceGenerator:
+    """Seeded, vectorized generator of synthetic workforce documents.
+
+    Every column of a batch is drawn with one numpy call and each collection
+    has its own random stream spawned from ``seed``, so any collection can be
+    regenerated on its own with identical output. Methods yield lists of at
+    most ``batch_size`` documents shaped like the Pydantic models. Employee
+    ``i`` is named "Employee i+1" and gets employee key ``i``, which project
+    teams and edges reference.
+    """
+
+    def __init__(
+        self,
+        employees: int = 50,
+        projects: int = 8,
+        collaborations: int = 100,
+        skill_gaps_per_department: int = 3,
+        seed: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        self.employee_count = employees
+        self.project_count = projects
+        self.collaboration_count = collaborations
+        self.skill_gaps_per_department = min(skill_gaps_per_department, len(GAP_SKILLS))
+        self.batch_size = batch_size
+        self.streams = np.random.SeedSequence(seed).spawn(4)
+
+    def _rng(self, stream: int) -> np.random.Generator:
+        return np.random.Generator(np.random.PCG64(self.streams[stream]))
+
+    def _batches(self, total: int) -> Iterator[int]:
+        for start in range(0, total, self.batch_size):
+            yield min(self.batch_size, total - start)
+
+    def employees(self) -> Iterator[Batch]:
+        rng = self._rng(0)
+        index = 0
+        for n in self._batches(self.employee_count):
+            skills = _subsets(rng, len(SKILLS_POOL), rng.integers(3, 7, size=n))
+            departments = _pick(DEPARTMENTS, rng.integers(0, len(DEPARTMENTS), size=n))
+            roles = _pick(ROLES, rng.integers(0, len(ROLES), size=n))
+            experience = rng.integers(1, 15, size=n).tolist()
+            performance = np.round(rng.uniform(0.6, 1.0, size=n), 2).tolist()
+            collaboration = np.round(rng.uniform(0.3, 1.0, size=n), 2).tolist()
+            productivity = np.round(rng.uniform(0.5, 1.0, size=n), 2).tolist()
+            ids = _uuids(rng, n)
+            now = datetime.now(timezone.utc)
+            yield [
+                {
+                    "id": ids[i],
+                    "employee_key": index + i,
+                    "name": employee_name(index + i),
+                    "department": departments[i],
+                    "role": roles[i],
+                    "skills": [SKILLS_POOL[s] for s in skills[i]],
+                    "experience_years": experience[i],
+                    "performance_score": performance[i],
+                    "collaboration_index": collaboration[i],
+                    "productivity_score": productivity[i],
+                    "timestamp": now
+                }
+                for i in range(n)
+            ]
+            index += n
+
+    def projects(self) -> Iterator[Batch]:
+        rng = self._rng(1)
+        max_team = min(7, self.employee_count)
+        index = 0
+        for n in self._batches(self.project_count):
+            team_sizes = np.minimum(rng.integers(3, 8, size=n), max_team).tolist()
+            teams = _distinct_rows(rng, self.employee_count, n, max_team).tolist() if max_team else [[]] * n
+            required = _subsets(rng, len(SKILLS_POOL), rng.integers(2, 5, size=n))
+            statuses = _pick(PROJECT_STATUSES, rng.integers(0, len(PROJECT_STATUSES), size=n))
+            success = np.round(rng.uniform(0.4, 0.95, size=n), 2).tolist()
+            ids = _uuids(rng, n)
+            now = datetime.now(timezone.utc)
+            batch = []
+            for i in range(n):
+                number = index + i
+                name = PROJECT_NAMES[number % len(PROJECT_NAMES)]
+                if number >= len(PROJECT_NAMES):
+                    name = f"{name} {number // len(PROJECT_NAMES) + 1}"
+                batch.append({
+                    "id": ids[i],
+                    "name": name,
+                    "description": f"Description for {name}",
+                    "status": statuses[i],
+                    "success_probability": success[i],
+                    "team_members": [employee_name(e) for e in teams[i][:team_sizes[i]]],
+                    "team_member_keys": teams[i][:team_sizes[i]],
+                    "required_skills": [SKILLS_POOL[s] for s in required[i]],
+                    "start_date": now,
+                    "estimated_completion": now,
+                    "actual_completion": None,
+                    "timestamp": now
+                })
+            yield batch
+            index += n
+
+    def collaborations(self) -> Iterator[Batch]:
+        rng = self._rng(2)
+        if self.employee_count < 2:
+            return
+        for n in self._batches(self.collaboration_count):
+            employee_a = rng.integers(0, self.employee_count, size=n)
+            employee_b = rng.integers(0, self.employee_count - 1, size=n)
+            employee_b += employee_b >= employee_a
+            employee_a, employee_b = employee_a.tolist(), employee_b.tolist()
+            frequency = np.round(rng.uniform(0.1, 1.0, size=n), 2).tolist()
+            strength = np.round(rng.uniform(0.2, 1.0, size=n), 2).tolist()
+            shared = rng.integers(0, 5, size=n).tolist()
+            ids = _uuids(rng, n)
+            now = datetime.now(timezone.utc)
+            yield [
+                {
+                    "id": ids[i],
+                    "employee_a": employee_name(employee_a[i]),
+                    "employee_b": employee_name(employee_b[i]),
+                    "employee_a_key": employee_a[i],
+                    "employee_b_key": employee_b[i],
+                    "interaction_frequency": frequency[i],
+                    "collaboration_strength": strength[i],
+                    "projects_shared": shared[i],
+                    "timestamp": now
+                }
+                for i in range(n)
+            ]
+
+    def skill_gaps(self) -> Iterator[Batch]:
+        rng = self._rng(3)
+        per_department = self.skill_gaps_per_department
+        n = len(DEPARTMENTS) * per_department
+        skills = _subsets(rng, len(GAP_SKILLS), np.full(len(DEPARTMENTS), per_department))
+        levels = _pick(GAP_LEVELS, rng.integers(0, len(GAP_LEVELS), size=n))
+        current = np.round(rng.uniform(0.3, 0.7, size=n), 2).tolist()
+        required = np.round(rng.uniform(0.7, 1.0, size=n), 2).tolist()
+        affected = rng.integers(5, 20, size=n).tolist()
+        ids = _uuids(rng, n)
+        now = datetime.now(timezone.utc)
+        gaps = []
+        for d, dept in enumerate(DEPARTMENTS):
+            for j, s in enumerate(skills[d]):
+                i = d * per_department + j
+                skill = GAP_SKILLS[s]
+                gaps.append({
+                    "id": ids[i],
+                    "department": dept,
+                    "skill": skill,
+                    "gap_level": levels[i],
+                    "current_proficiency": current[i],
+                    "required_proficiency": required[i],
+                    "affected_employees": affected[i],
+                    "training_recommendations": [
+                        f"Online {skill} certification",
+                        f"Hands-on {skill} workshop",
+                        f"Mentorship program for {skill}"
+                    ],
+                    "timestamp": now
+                })
+        for start in range(0, len(gaps), self.batch_size):
+            yield gaps[start:start + self.batch_size]
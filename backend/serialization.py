@@ -0,0 +1,79 @@
+import datetime
+import functools
+import json
+from typing import Any, Callable
+
+from bson import ObjectId
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, request_response
+from pydantic import BaseModel
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+def json_default(value: Any):
+    """Encode the Mongo and Pydantic types orjson does not handle itself"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _stdlib_default(value: Any):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return json_default(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes; datetimes, numpy values and ObjectIds are handled natively"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=json_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_stdlib_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when installed (stdlib json otherwise)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class PrerenderedRoute(APIRoute):
+    """APIRoute that renders plain dict/list results with the route's
+    response class directly, skipping FastAPI's jsonable_encoder pass.
+
+    Routes with a response model still go through FastAPI's validation
+    and encoding.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        # Wrap the resolved call rather than ``endpoint`` so routes copied by
+        # include_router start again from the original endpoint
+        self.dependant.call = self._prerendered(self.dependant.call)
+        self.app = request_response(self.get_route_handler())
+
+    def _prerendered(self, endpoint: Callable) -> Callable:
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            if self.response_field is not None or not isinstance(result, (dict, list)):
+                return result
+            response_class = self.response_class
+            if isinstance(response_class, DefaultPlaceholder):
+                response_class = response_class.value
+            return response_class(result, status_code=self.status_code or 200)
+        return wrapper
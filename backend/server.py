@@ -1,5 +1,5 @@
-from fastapi import FastAPI, APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -9,10 +9,11 @@ import json
 import asyncio
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Annotated
 import uuid
 from datetime import datetime, timezone
 from contextlib import asynccontextmanager
+from bson import ObjectId
 try:
     from google.cloud import bigquery
     from google.oauth2 import service_account
@@ -25,6 +26,43 @@ except ImportError:
 import numpy as np
 import pandas as pd
 
+from analytics_views import (
+    ACTIVE_STATUSES, apply_employee_delta, apply_project_delta, apply_skill_gap_delta, ensure_views,
+    gap_percentage, mark_views_built, read_critical_gaps, reattribute_projects, reset_views
+)
+from columnar_snapshot import (
+    SnapshotStore, SnapshotUnavailable, snapshot_performance_trends, snapshot_project_forecasting,
+    snapshot_skill_gap_analysis
+)
+from compute_pool import ComputePool, LoopLagMonitor
+from dashboard_context import DataContext, run_panels
+from db_indexes import ensure_indexes, index_report
+from employee_keys import (
+    assign_employee_keys, attach_edge_keys, attach_new_employee_edges, attach_team_member_keys,
+    migrate_employee_keys, set_next_employee_key
+)
+from employee_queries import (
+    EXPERIENCE_BIN_YEARS, PERFORMANCE_BIN, EmployeeFilter, experience_histogram,
+    mongo_department_pipeline, mongo_histogram_pipeline
+)
+from graph_analytics import CollaborationGraph, analyze_csr_graph
+from ingestion import (
+    DEFAULT_CHUNK_SIZE, IngestionError, ingest_documents, iter_lines, parse_csv, parse_ndjson,
+    validate_records
+)
+from profiling import CommandProfiler, MetricsRegistry, ProfiledRoute, ProfilingMiddleware
+from query_projections import find, find_batches, projection_audit
+from response_cache import ResponseCache, cached_response
+from sample_data import WorkforceGenerator, iter_documents
+from serialization import FastJSONResponse, PrerenderedRoute, dumps
+from skill_matching import TopMatchReducer, merge_top_matches, prepare_projects
+from skill_similarity import SkillSimilarityIndex
+from team_assignment import AssignmentInput, build_teams, solve_assignment
+from warehouse import (
+    BigQuerySource, DuckDBSource, warehouse_performance_trends, warehouse_project_forecasting,
+    warehouse_skill_gap_analysis
+)
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -46,25 +84,129 @@ else:
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# The command profiler attributes every Mongo command to the request that issued it
+client = AsyncIOMotorClient(mongo_url, event_listeners=[CommandProfiler()])
 db = client[os.environ['DB_NAME']]
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: nothing additional needed as connections are already established
+    # Startup: back every hot query with an index, backfill integer employee
+    # keys, then build the analytics views if this database predates them
+    await ensure_indexes(db)
+    await migrate_employee_keys(db)
+    await ensure_views(db)
+    await asyncio.to_thread(skill_index.load)
+    if isinstance(warehouse_source, DuckDBSource):
+        # Fill the DuckDB warehouse from a fresh snapshot before serving
+        await snapshot_exported(await snapshot_store.export(db))
+    loop_lag_monitor.start()
+    snapshot_task = None
+    if SNAPSHOT_INTERVAL_SECONDS > 0 and snapshot_store.available:
+        snapshot_task = asyncio.create_task(
+            snapshot_store.run_periodically(db, SNAPSHOT_INTERVAL_SECONDS, on_export=snapshot_exported)
+        )
     yield
-    # Shutdown: close the MongoDB client
+    # Shutdown: stop snapshot exports and close the MongoDB client
+    if snapshot_task is not None:
+        snapshot_task.cancel()
+    loop_lag_monitor.stop()
+    compute_pool.shutdown()
     client.close()
 
+# In-process cache for the read-only analytics routes
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256)),
+    ttl_seconds=float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 60))
+)
+
+# CPU-heavy analytics run in worker processes so the event loop stays
+# responsive; COMPUTE_POOL_WORKERS=0 runs them in a thread instead
+compute_pool = ComputePool(
+    max_workers=int(os.environ.get('COMPUTE_POOL_WORKERS', 2)),
+    max_concurrency=int(os.environ.get('COMPUTE_POOL_MAX_CONCURRENCY', 0)) or None
+)
+loop_lag_monitor = LoopLagMonitor()
+
+# PROJECTION_AUDIT=1 tracks which projected fields handlers actually read
+projection_audit.enabled = os.environ.get('PROJECTION_AUDIT') == '1'
+
+# Columnar snapshots: with ANALYTICS_SOURCE=snapshot the heavy aggregations
+# run over periodically exported Arrow/Parquet files instead of Mongo
+ANALYTICS_SOURCE = os.environ.get('ANALYTICS_SOURCE', 'mongo')
+SNAPSHOT_INTERVAL_SECONDS = float(os.environ.get('SNAPSHOT_INTERVAL_SECONDS', 0))
+snapshot_store = SnapshotStore(
+    os.environ.get('SNAPSHOT_DIR', str(ROOT_DIR / 'snapshots')),
+    file_format=os.environ.get('SNAPSHOT_FORMAT', 'arrow')
+)
+if ANALYTICS_SOURCE == 'snapshot' and not snapshot_store.available:
+    logging.warning("pyarrow not available, analytics will read from MongoDB")
+
+# MinHash/LSH index of employee skill sets behind skill clusters and
+# similar-employee lookups; synced incrementally and saved between restarts
+skill_index = SkillSimilarityIndex(os.environ.get('SKILL_INDEX_PATH', str(ROOT_DIR / 'snapshots' / 'skill_index.npz')))
+SKILL_CLUSTER_THRESHOLD = float(os.environ.get('SKILL_CLUSTER_THRESHOLD', 0.6))
+
+async def snapshot_exported(manifest: Dict[str, Any]):
+    # The DuckDB stand-in holds no data of its own; reload its tables from
+    # every export so warehouse queries see the same rows as the snapshot
+    if isinstance(warehouse_source, DuckDBSource):
+        for name, table in (await snapshot_store.tables(manifest)).items():
+            await asyncio.to_thread(warehouse_source.load_table, name, table)
+    # Cached responses were computed from the previous snapshot
+    if ANALYTICS_SOURCE in ('snapshot', 'warehouse'):
+        response_cache.invalidate()
+
+# Warehouse data source: with ANALYTICS_SOURCE=warehouse the same analytics
+# are pushed down as SQL to BigQuery, or to DuckDB as a local stand-in
+def create_warehouse_source():
+    if ANALYTICS_SOURCE != 'warehouse':
+        return None
+    options = dict(
+        max_concurrency=int(os.environ.get('WAREHOUSE_MAX_CONCURRENCY', 4)),
+        cache=ResponseCache(
+            max_entries=int(os.environ.get('WAREHOUSE_CACHE_MAX_ENTRIES', 128)),
+            ttl_seconds=float(os.environ.get('WAREHOUSE_CACHE_TTL_SECONDS', 300))
+        )
+    )
+    try:
+        if os.environ.get('WAREHOUSE_BACKEND', 'bigquery') == 'duckdb':
+            return DuckDBSource(os.environ.get('DUCKDB_PATH', ':memory:'), **options)
+        if bq_client is None:
+            logging.warning("BigQuery client unavailable, analytics will not use the warehouse")
+            return None
+        return BigQuerySource(bq_client, os.environ.get('BIGQUERY_DATASET', 'workforce_analytics'), **options)
+    except RuntimeError as e:
+        logging.warning(f"Warehouse source unavailable: {e}")
+        return None
+
+warehouse_source = create_warehouse_source()
+
+async def analytics_snapshot():
+    """Return the current snapshot in snapshot mode, or None to read from Mongo"""
+    if ANALYTICS_SOURCE != 'snapshot':
+        return None
+    try:
+        return await snapshot_store.load()
+    except SnapshotUnavailable:
+        return None
+
 # Create the main app without a prefix
-app = FastAPI(title="Workforce Productivity Analytics API", lifespan=lifespan)
+# Responses are rendered with orjson by default
+app = FastAPI(title="Workforce Productivity Analytics API", lifespan=lifespan,
+              default_response_class=FastJSONResponse)
+
+class ApiRoute(PrerenderedRoute, ProfiledRoute):
+    """Routes report endpoint timing to the profiling middleware, then render
+    plain results straight to bytes (timed as serialization)"""
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=ApiRoute)
+metrics_registry = MetricsRegistry()
 
 # Pydantic Models
 class Employee(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    employee_key: Optional[int] = None  # Interned integer id used by joins
     name: str
     department: str
     role: str
@@ -82,6 +224,7 @@ class Project(BaseModel):
     status: str
     success_probability: float
     team_members: List[str]
+    team_member_keys: List[int] = Field(default_factory=list)
     required_skills: List[str]
     start_date: datetime
     estimated_completion: datetime
@@ -92,6 +235,8 @@ class CollaborationNetwork(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     employee_a: str
     employee_b: str
+    employee_a_key: Optional[int] = None
+    employee_b_key: Optional[int] = None
     interaction_frequency: float
     collaboration_strength: float
     projects_shared: int
@@ -114,451 +259,833 @@ class AnalyticsResult(BaseModel):
     insights: List[str]
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
-# Sample data generator
-def generate_sample_employees():
-    departments = ["Engineering", "Marketing", "Sales", "HR", "Finance", "Operations"]
-    roles = ["Manager", "Senior", "Junior", "Lead", "Specialist", "Analyst"]
-    skills_pool = ["Python", "JavaScript", "Data Analysis", "Project Management", "Communication", 
-                   "Leadership", "Machine Learning", "Cloud Computing", "Agile", "Marketing Strategy",
-                   "Sales Management", "Financial Analysis", "HR Operations", "Team Leadership"]
-    
-    employees = []
-    for i in range(50):
-        employee_skills = np.random.choice(skills_pool, size=np.random.randint(3, 7), replace=False).tolist()
-        employee = Employee(
-            name=f"Employee {i+1}",
-            department=np.random.choice(departments),
-            role=np.random.choice(roles),
-            skills=employee_skills,
-            experience_years=np.random.randint(1, 15),
-            performance_score=round(np.random.uniform(0.6, 1.0), 2),
-            collaboration_index=round(np.random.uniform(0.3, 1.0), 2),
-            productivity_score=round(np.random.uniform(0.5, 1.0), 2)
-        )
-        employees.append(employee)
-    return employees
-
-def generate_sample_projects(employees):
-    project_names = ["AI Platform Development", "Customer Analytics Dashboard", "Mobile App Redesign",
-                     "Cloud Migration", "Marketing Automation", "Sales CRM Enhancement",
-                     "Financial Reporting System", "HR Digital Transformation"]
-    
-    projects = []
-    for i, name in enumerate(project_names):
-        team_size = np.random.randint(3, 8)
-        team_members = np.random.choice([emp.name for emp in employees], size=team_size, replace=False).tolist()
-        
-        project = Project(
-            name=name,
-            description=f"Description for {name}",
-            status=np.random.choice(["Planning", "In Progress", "Testing", "Completed", "On Hold"]),
-            success_probability=round(np.random.uniform(0.4, 0.95), 2),
-            team_members=team_members,
-            required_skills=np.random.choice(employees[0].skills + ["Leadership", "Communication"], 
-                                           size=np.random.randint(2, 5), replace=False).tolist(),
-            start_date=datetime.now(timezone.utc),
-            estimated_completion=datetime.now(timezone.utc)
-        )
-        projects.append(project)
-    return projects
-
-def generate_collaboration_network(employees):
-    networks = []
-    for i in range(100):
-        emp_a, emp_b = np.random.choice(employees, size=2, replace=False)
-        collaboration = CollaborationNetwork(
-            employee_a=emp_a.name,
-            employee_b=emp_b.name,
-            interaction_frequency=round(np.random.uniform(0.1, 1.0), 2),
-            collaboration_strength=round(np.random.uniform(0.2, 1.0), 2),
-            projects_shared=np.random.randint(0, 5)
-        )
-        networks.append(collaboration)
-    return networks
-
-def generate_skill_gaps():
-    departments = ["Engineering", "Marketing", "Sales", "HR", "Finance", "Operations"]
-    skills = ["Python", "Machine Learning", "Cloud Computing", "Data Analysis", "Digital Marketing",
-              "Sales Analytics", "Financial Modeling", "HR Technology", "Project Management"]
-    
-    gaps = []
-    for dept in departments:
-        for skill in np.random.choice(skills, size=3, replace=False):
-            gap = SkillGap(
-                department=dept,
-                skill=skill,
-                gap_level=np.random.choice(["critical", "moderate", "low"]),
-                current_proficiency=round(np.random.uniform(0.3, 0.7), 2),
-                required_proficiency=round(np.random.uniform(0.7, 1.0), 2),
-                affected_employees=np.random.randint(5, 20),
-                training_recommendations=[
-                    f"Online {skill} certification",
-                    f"Hands-on {skill} workshop",
-                    f"Mentorship program for {skill}"
-                ]
-            )
-            gaps.append(gap)
-    return gaps
-
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "Workforce Productivity Analytics API"}
 
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Get response cache counters for sizing the cache"""
+    return response_cache.stats()
+
+@api_router.get("/snapshots")
+async def get_snapshot_status():
+    """Report the current columnar snapshot and analytics source"""
+    return {"analytics_source": ANALYTICS_SOURCE, **snapshot_store.status()}
+
+@api_router.post("/snapshots")
+async def export_snapshot():
+    """Export employees, projects, edges and skill gaps to a new columnar snapshot"""
+    try:
+        manifest = await snapshot_store.export(db)
+        await snapshot_exported(manifest)
+        return manifest
+    except SnapshotUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/warehouse")
+async def get_warehouse_stats():
+    """Report the warehouse source, its concurrency limit and query cache"""
+    if warehouse_source is None:
+        return {"analytics_source": ANALYTICS_SOURCE, "source": None}
+    return {"analytics_source": ANALYTICS_SOURCE, **warehouse_source.stats()}
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Per-route latency, DB/compute/serialization time and Mongo command counts in Prometheus format"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@api_router.get("/compute/metrics")
+async def get_compute_metrics():
+    """Report compute pool usage and event-loop lag"""
+    return {"pool": compute_pool.stats(), "event_loop": loop_lag_monitor.stats()}
+
+@api_router.get("/projections")
+async def get_projection_report():
+    """Report declared projections and, with PROJECTION_AUDIT=1, fields fetched but never read"""
+    return {"audit_enabled": projection_audit.enabled, "endpoints": projection_audit.report()}
+
+@api_router.get("/indexes")
+async def get_index_report():
+    """Report missing, unused and undeclared collection indexes"""
+    try:
+        return await index_report(db)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.post("/initialize-data")
-async def initialize_sample_data():
+async def initialize_sample_data(
+    employees: Annotated[int, Query(ge=1, le=10_000_000)] = 50,
+    projects: Annotated[int, Query(ge=0, le=1_000_000)] = 8,
+    collaborations: Annotated[int, Query(ge=0, le=100_000_000)] = 100,
+    seed: Optional[int] = None,
+    chunk_size: Annotated[int, Query(ge=1, le=100000)] = DEFAULT_CHUNK_SIZE
+):
     """Initialize the database with sample workforce data"""
     try:
         # Clear existing data
-        await db.employees.delete_many({})
-        await db.projects.delete_many({})
-        await db.collaboration_networks.delete_many({})
-        await db.skill_gaps.delete_many({})
+        await asyncio.gather(
+            db.employees.delete_many({}),
+            db.projects.delete_many({}),
+            db.collaboration_networks.delete_many({}),
+            db.skill_gaps.delete_many({}),
+            reset_views(db)
+        )
+        # Generated employees carry keys 0..employees-1; later ingests continue after them
+        await set_next_employee_key(db, employees)
         
-        # Generate sample data
-        employees = generate_sample_employees()
-        projects = generate_sample_projects(employees)
-        collaborations = generate_collaboration_network(employees)
-        skill_gaps = generate_skill_gaps()
+        # Generate sample data lazily, batch by batch, from a seeded generator
+        generator = WorkforceGenerator(employees=employees, projects=projects,
+                                       collaborations=collaborations, seed=seed, batch_size=chunk_size)
         
-        # Insert data
-        await db.employees.insert_many([emp.dict() for emp in employees])
-        await db.projects.insert_many([proj.dict() for proj in projects])
-        await db.collaboration_networks.insert_many([collab.dict() for collab in collaborations])
-        await db.skill_gaps.insert_many([gap.dict() for gap in skill_gaps])
+        # Insert all four collections concurrently in chunks, maintaining the
+        # analytics views per chunk. Project stats resolve team departments,
+        # so they wait until every employee is written.
+        employees_loaded = asyncio.Event()
+        
+        async def ingest_employees():
+            try:
+                return await ingest_documents(db, "employees", iter_documents(generator.employees()),
+                                              chunk_size, on_chunk=apply_employee_delta)
+            finally:
+                employees_loaded.set()
+        
+        async def apply_project_chunk(db, chunk):
+            await employees_loaded.wait()
+            await apply_project_delta(db, chunk)
+        
+        ingestion = dict(zip(
+            ["employees", "projects", "collaborations", "skill_gaps"],
+            await asyncio.gather(
+                ingest_employees(),
+                ingest_documents(db, "projects", iter_documents(generator.projects()),
+                                 chunk_size, on_chunk=apply_project_chunk),
+                ingest_documents(db, "collaboration_networks", iter_documents(generator.collaborations()),
+                                 chunk_size),
+                ingest_documents(db, "skill_gaps", iter_documents(generator.skill_gaps()),
+                                 chunk_size, on_chunk=apply_skill_gap_delta)
+            )
+        ))
+        await mark_views_built(db)
         
         return {
             "message": "Sample data initialized successfully",
-            "counts": {
-                "employees": len(employees),
-                "projects": len(projects),
-                "collaborations": len(collaborations),
-                "skill_gaps": len(skill_gaps)
-            }
+            "counts": {name: report["documents"] for name, report in ingestion.items()},
+            "ingestion": ingestion
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Any write, successful or not, makes cached analytics stale
+        response_cache.invalidate()
+
+async def apply_employee_chunk(db, chunk):
+    # Employees may arrive after projects and edges naming them; those
+    # projects' teams and department attribution, and the edges' keys, are
+    # completed now
+    await apply_employee_delta(db, chunk)
+    await reattribute_projects(db, chunk)
+    await attach_new_employee_edges(db, chunk)
+
+# Streaming ingestion: collection -> (model, list-valued CSV columns, key hook, view hook)
+INGEST_TARGETS = {
+    "employees": (Employee, ["skills"], assign_employee_keys, apply_employee_chunk),
+    "projects": (Project, ["team_members", "required_skills"], attach_team_member_keys, apply_project_delta),
+    "collaboration_networks": (CollaborationNetwork, [], attach_edge_keys, None),
+    "skill_gaps": (SkillGap, ["training_recommendations"], None, apply_skill_gap_delta),
+}
+
+@api_router.post("/ingest/{collection}")
+async def ingest_records(
+    collection: str,
+    request: Request,
+    format: Annotated[str, Query(pattern="^(csv|ndjson)$")] = "ndjson",
+    chunk_size: Annotated[int, Query(ge=1, le=100000)] = DEFAULT_CHUNK_SIZE
+):
+    """Append records streamed as NDJSON or CSV to a collection.
+    
+    The body is parsed line by line and written in ``chunk_size`` batches, so
+    uploads of any size are never held in memory whole. CSV list columns
+    separate their items with ";".
+    """
+    if collection not in INGEST_TARGETS:
+        raise HTTPException(status_code=404, detail=f"Unknown collection: {collection}")
+    model, list_fields, prepare_chunk, on_chunk = INGEST_TARGETS[collection]
+    
+    lines = iter_lines(request.stream())
+    records = parse_csv(lines, list_fields) if format == "csv" else parse_ndjson(lines)
+    try:
+        report = await ingest_documents(db, collection, validate_records(records, model), chunk_size,
+                                        prepare_chunk=prepare_chunk, on_chunk=on_chunk)
+        await mark_views_built(db)
+        return {"collection": collection, **report}
+    except IngestionError as e:
+        raise HTTPException(status_code=422, detail={"error": str(e), "ingested": e.ingested})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        response_cache.invalidate()
+
+async def overview_panel(ctx: DataContext):
+    # Served from the materialized views maintained on every write
+    departments, statuses = await asyncio.gather(ctx.view("department"), ctx.view("project_status"))
+    
+    employee_count = sum(stats['count'] for stats in departments.values())
+    project_count = sum(stats['count'] for stats in statuses.values())
+    active_projects = sum(statuses[status]['count'] for status in ACTIVE_STATUSES if status in statuses)
+    avg_performance = sum(stats['performance_sum'] for stats in departments.values()) / employee_count if employee_count else 0
+    avg_productivity = sum(stats['productivity_sum'] for stats in departments.values()) / employee_count if employee_count else 0
+    avg_success_prob = sum(stats['success_sum'] for stats in statuses.values()) / project_count if project_count else 0
+    
+    # Department distribution
+    dept_distribution = {dept: stats['count'] for dept, stats in departments.items()}
+    
+    return {
+        "metrics": {
+            "total_employees": employee_count,
+            "total_projects": project_count,
+            "active_projects": active_projects,
+            "avg_performance_score": round(avg_performance, 2),
+            "avg_productivity_score": round(avg_productivity, 2),
+            "avg_project_success_rate": round(avg_success_prob * 100, 1)
+        },
+        "department_distribution": dept_distribution,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
 
 @api_router.get("/dashboard/overview")
+@cached_response(response_cache)
 async def get_dashboard_overview():
     """Get comprehensive dashboard overview with key metrics"""
     try:
-        # Get counts
-        employee_count = await db.employees.count_documents({})
-        project_count = await db.projects.count_documents({})
-        active_projects = await db.projects.count_documents({"status": {"$in": ["In Progress", "Planning"]}})
-        
-        # Get performance metrics
-        employees = await db.employees.find().to_list(length=None)
-        avg_performance = sum(emp.get('performance_score', 0) for emp in employees) / len(employees) if employees else 0
-        avg_productivity = sum(emp.get('productivity_score', 0) for emp in employees) / len(employees) if employees else 0
-        
-        # Project success rate
-        projects = await db.projects.find().to_list(length=None)
-        avg_success_prob = sum(proj.get('success_probability', 0) for proj in projects) / len(projects) if projects else 0
-        
-        # Department distribution
-        dept_distribution = {}
-        for emp in employees:
-            dept = emp.get('department', 'Unknown')
-            dept_distribution[dept] = dept_distribution.get(dept, 0) + 1
-        
-        return {
-            "metrics": {
-                "total_employees": employee_count,
-                "total_projects": project_count,
-                "active_projects": active_projects,
-                "avg_performance_score": round(avg_performance, 2),
-                "avg_productivity_score": round(avg_productivity, 2),
-                "avg_project_success_rate": round(avg_success_prob * 100, 1)
-            },
-            "department_distribution": dept_distribution,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+        async with DataContext(db, []) as ctx:
+            return await overview_panel(ctx)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Collaboration network helpers
+
+def network_node(emp):
+    return {
+        "id": emp['name'],
+        "name": emp['name'],
+        "department": emp['department'],
+        "role": emp['role'],
+        "performance_score": emp['performance_score'],
+        "collaboration_index": emp['collaboration_index']
+    }
+
+def network_edge(network):
+    return {
+        "source": network['employee_a'],
+        "target": network['employee_b'],
+        "strength": network['collaboration_strength'],
+        "frequency": network['interaction_frequency'],
+        "projects_shared": network['projects_shared']
+    }
+
+def parse_network_cursor(cursor):
+    """Split a "nodes:<id>" / "edges:<id>" page cursor into (section, ObjectId)"""
+    if not cursor:
+        return "nodes", None
+    section, _, last_id = cursor.partition(":")
+    if section not in ("nodes", "edges") or not ObjectId.is_valid(last_id):
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+    return section, ObjectId(last_id)
+
+async def get_collaboration_network_page(limit, cursor):
+    """Return up to ``limit`` nodes-then-edges after ``cursor``, ordered by _id"""
+    section, last_id = parse_network_cursor(cursor)
+    nodes = []
+    if section == "nodes":
+        query = {"_id": {"$gt": last_id}} if last_id else {}
+        employees = await find(db, "collaboration_network_page", "employees", query) \
+            .sort("_id", 1).limit(limit).to_list(length=limit)
+        nodes = [network_node(emp) for emp in employees]
+        if len(employees) == limit:
+            return {"nodes": nodes, "edges": [], "next_cursor": f"nodes:{employees[-1]['_id']}"}
+        last_id = None
+    
+    remaining = limit - len(nodes)
+    query = {"_id": {"$gt": last_id}} if last_id else {}
+    networks = await find(db, "collaboration_network_page", "collaboration_networks", query) \
+        .sort("_id", 1).limit(remaining).to_list(length=remaining)
+    return {
+        "nodes": nodes,
+        "edges": [network_edge(network) for network in networks],
+        "next_cursor": f"edges:{networks[-1]['_id']}" if len(networks) == remaining else None
+    }
+
+async def stream_collaboration_network():
+    """Yield the network as NDJSON, one node or edge per line, in cursor batches"""
+    async for emp in find(db, "collaboration_network", "employees"):
+        yield dumps({"type": "node", **network_node(emp)}) + b"\n"
+    async for network in find(db, "collaboration_network", "collaboration_networks"):
+        yield dumps({"type": "edge", **network_edge(network)}) + b"\n"
+
+async def collaboration_network_panel(ctx: DataContext):
+    # Documents are turned into nodes and edges batch by batch
+    async with ctx.batches("employees") as employee_batches, \
+            ctx.batches("collaboration_networks") as network_batches:
+        nodes = [network_node(emp) async for batch in employee_batches for emp in batch]
+        edges = [network_edge(network) async for batch in network_batches for network in batch]
+    return {"nodes": nodes, "edges": edges}
+
 @api_router.get("/analytics/collaboration-network")
-async def get_collaboration_network():
-    """Get collaboration network data for visualization"""
+@cached_response(response_cache, bypass=lambda format, **params: format == "ndjson")
+async def get_collaboration_network(
+    format: Annotated[str, Query(pattern="^(json|ndjson)$")] = "json",
+    limit: Annotated[Optional[int], Query(ge=1, le=10000)] = None,
+    cursor: Optional[str] = None
+):
+    """Get collaboration network data for visualization.
+    
+    ``format=ndjson`` streams nodes and edges line by line. ``limit`` returns
+    one page of nodes followed by edges plus a ``next_cursor`` to resume from.
+    """
     try:
-        networks = await db.collaboration_networks.find().to_list(length=None)
-        employees = await db.employees.find().to_list(length=None)
-        
-        # Create nodes (employees)
-        nodes = []
-        for emp in employees:
-            nodes.append({
-                "id": emp['name'],
-                "name": emp['name'],
-                "department": emp['department'],
-                "role": emp['role'],
-                "performance_score": emp['performance_score'],
-                "collaboration_index": emp['collaboration_index']
-            })
-        
-        # Create edges (collaborations)
-        edges = []
-        for network in networks:
-            edges.append({
-                "source": network['employee_a'],
-                "target": network['employee_b'],
-                "strength": network['collaboration_strength'],
-                "frequency": network['interaction_frequency'],
-                "projects_shared": network['projects_shared']
-            })
-        
-        return {
-            "nodes": nodes,
-            "edges": edges
-        }
+        if format == "ndjson":
+            return StreamingResponse(stream_collaboration_network(), media_type="application/x-ndjson")
+        if limit is not None:
+            return await get_collaboration_network_page(limit, cursor)
+        async with DataContext(db, ["collaboration_network"]) as ctx:
+            return await collaboration_network_panel(ctx)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/analytics/skill-gaps")
-async def get_skill_gap_analysis():
-    """Get skill gap analysis and training recommendations"""
+# Collaboration graph analytics, cached until the employees or edges change
+graph_cache = {"fingerprint": None, "graph": None, "results": {}}
+graph_cache_lock = asyncio.Lock()
+
+async def collaboration_graph_fingerprint():
+    """Cheap change marker: document counts plus the newest _id of each collection"""
+    async def marker(collection):
+        count, newest = await asyncio.gather(
+            collection.estimated_document_count(),
+            collection.find_one({}, projection={"_id": 1}, sort=[("_id", -1)])
+        )
+        return count, newest['_id'] if newest else None
+    return await asyncio.gather(marker(db.employees), marker(db.collaboration_networks))
+
+def batch_column(batch, field, dtype):
+    return np.fromiter((doc[field] for doc in batch), dtype=dtype, count=len(batch))
+
+def concatenate_chunks(chunks, dtype):
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+async def load_collaboration_graph():
+    """Stream employees and edges into a CSR graph keyed by integer node ids"""
+    key_chunks, names = [], []
+    async for batch in find_batches(db, "collaboration_graph", "employees", {"employee_key": {"$exists": True}}):
+        key_chunks.append(batch_column(batch, 'employee_key', np.int64))
+        names.extend(emp['name'] for emp in batch)
+    source_chunks, target_chunks, weight_chunks = [], [], []
+    async for batch in find_batches(db, "collaboration_graph", "collaboration_networks",
+                                    {"employee_a_key": {"$ne": None}, "employee_b_key": {"$ne": None}}):
+        source_chunks.append(batch_column(batch, 'employee_a_key', np.int64))
+        target_chunks.append(batch_column(batch, 'employee_b_key', np.int64))
+        weight_chunks.append(batch_column(batch, 'collaboration_strength', np.float64))
+    # Building the CSR form sorts every edge, so it runs off the event loop
+    return await asyncio.to_thread(
+        build_collaboration_graph, names, concatenate_chunks(key_chunks, np.int64),
+        concatenate_chunks(source_chunks, np.int64), concatenate_chunks(target_chunks, np.int64),
+        concatenate_chunks(weight_chunks, np.float64)
+    )
+
+def build_collaboration_graph(names, employee_keys, sources, targets, weights):
+    # Employee keys may have gaps; map them onto dense node ids 0..n-1 and
+    # drop edges whose endpoints are no longer employees
+    order = np.argsort(employee_keys)
+    sorted_keys = employee_keys[order]
+    endpoints = np.concatenate([sources, targets])
+    positions = np.minimum(np.searchsorted(sorted_keys, endpoints), max(len(sorted_keys) - 1, 0))
+    known = sorted_keys[positions] == endpoints if len(sorted_keys) else np.zeros(len(endpoints), dtype=bool)
+    nodes = order[positions] if len(sorted_keys) else positions
+    valid = known[:len(sources)] & known[len(sources):]
+    return CollaborationGraph(names, nodes[:len(sources)][valid], nodes[len(sources):][valid], weights[valid])
+
+@api_router.get("/analytics/collaboration-graph")
+async def get_collaboration_graph_analytics(
+    top: Annotated[int, Query(ge=1, le=1000)] = 10,
+    betweenness_samples: Annotated[int, Query(ge=1, le=1024)] = 16
+):
+    """Get centrality rankings, components and communities of the collaboration network"""
     try:
-        skill_gaps = await db.skill_gaps.find().to_list(length=None)
-        
-        # Organize by department
-        by_department = {}
-        critical_gaps = []
-        
-        for gap in skill_gaps:
-            dept = gap['department']
-            if dept not in by_department:
-                by_department[dept] = []
-            
-            by_department[dept].append({
+        async with graph_cache_lock:
+            fingerprint = await collaboration_graph_fingerprint()
+            if fingerprint != graph_cache["fingerprint"]:
+                graph_cache.update(fingerprint=fingerprint, graph=await load_collaboration_graph(), results={})
+            # The analysis runs in the compute pool outside the lock; requests
+            # for the same parameters share one task
+            results = graph_cache["results"]
+            key = (top, betweenness_samples)
+            if key not in results:
+                graph = graph_cache["graph"]
+                results[key] = asyncio.ensure_future(compute_pool.run(
+                    analyze_csr_graph, graph.names, graph.indptr, graph.indices, graph.weights,
+                    top, betweenness_samples
+                ))
+            analysis = results[key]
+        try:
+            return await asyncio.shield(analysis)
+        except Exception:
+            if results.get(key) is analysis:
+                del results[key]
+            raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def skill_gap_rollup(count: int, critical_count: int, gap_sum: float, affected_employees: int) -> Dict[str, Any]:
+    return {
+        "gap_count": count,
+        "critical_count": critical_count,
+        "avg_gap_percentage": round(gap_sum / count, 1),
+        "affected_employees": affected_employees
+    }
+
+def restrict_skill_gaps(analysis: Dict[str, Any], department: Optional[str], critical_limit: Optional[int],
+                        include_details: bool) -> Dict[str, Any]:
+    """Apply the rollup-path options to an analysis computed in full (snapshot/warehouse)"""
+    by_department = analysis["by_department"]
+    if department is not None:
+        by_department = {dept: gaps for dept, gaps in by_department.items() if dept == department}
+    critical_gaps = [gap for gap in analysis["critical_gaps"] if department is None or gap['department'] == department]
+    department_rollups = {
+        dept: skill_gap_rollup(
+            len(gaps), sum(gap['gap_level'] == 'critical' for gap in gaps),
+            sum(gap['gap_percentage'] for gap in gaps), sum(gap['affected_employees'] for gap in gaps)
+        )
+        for dept, gaps in by_department.items()
+    }
+    return {
+        "by_department": by_department if include_details else {},
+        "critical_gaps": critical_gaps[:critical_limit],
+        "department_rollups": department_rollups,
+        "summary": {
+            "total_gaps": sum(rollup["gap_count"] for rollup in department_rollups.values()),
+            "critical_gaps_count": len(critical_gaps),
+            "departments_affected": len(department_rollups)
+        }
+    }
+
+async def skill_gaps_panel(ctx: DataContext, department: Optional[str] = None,
+                           critical_limit: Optional[int] = None, include_details: bool = True):
+    if warehouse_source is not None:
+        analysis = await warehouse_skill_gap_analysis(warehouse_source)
+        return restrict_skill_gaps(analysis, department, critical_limit, include_details)
+    snapshot = await ctx.shared("snapshot", analytics_snapshot)
+    if snapshot is not None:
+        analysis = await asyncio.to_thread(lambda: snapshot_skill_gap_analysis(snapshot.frame("skill_gaps")))
+        return restrict_skill_gaps(analysis, department, critical_limit, include_details)
+    
+    departments, critical_gaps = await asyncio.gather(
+        ctx.view("skill_gap_department"),
+        read_critical_gaps(db, department, critical_limit)
+    )
+    if department is not None:
+        departments = {dept: stats for dept, stats in departments.items() if dept == department}
+    
+    # Organize by department
+    by_department = {}
+    if include_details:
+        query = {"department": department} if department is not None else None
+        async for gap in find(db, "skill_gaps", "skill_gaps", query):
+            by_department.setdefault(gap['department'], []).append({
                 "skill": gap['skill'],
                 "gap_level": gap['gap_level'],
                 "current_proficiency": gap['current_proficiency'],
                 "required_proficiency": gap['required_proficiency'],
-                "gap_percentage": round((gap['required_proficiency'] - gap['current_proficiency']) * 100, 1),
+                "gap_percentage": gap_percentage(gap),
                 "affected_employees": gap['affected_employees'],
                 "training_recommendations": gap['training_recommendations']
             })
-            
-            if gap['gap_level'] == 'critical':
-                critical_gaps.append({
-                    "department": dept,
-                    "skill": gap['skill'],
-                    "affected_employees": gap['affected_employees'],
-                    "gap_percentage": round((gap['required_proficiency'] - gap['current_proficiency']) * 100, 1)
-                })
-        
-        return {
-            "by_department": by_department,
-            "critical_gaps": sorted(critical_gaps, key=lambda x: x['gap_percentage'], reverse=True),
-            "summary": {
-                "total_gaps": len(skill_gaps),
-                "critical_gaps_count": len(critical_gaps),
-                "departments_affected": len(by_department.keys())
-            }
+    
+    department_rollups = {
+        dept: skill_gap_rollup(stats['count'], stats.get('critical_count', 0),
+                               stats['gap_sum'], stats['affected_employees'])
+        for dept, stats in departments.items()
+    }
+    return {
+        "by_department": by_department,
+        "critical_gaps": critical_gaps,
+        "department_rollups": department_rollups,
+        "summary": {
+            "total_gaps": sum(stats['count'] for stats in departments.values()),
+            "critical_gaps_count": sum(stats.get('critical_count', 0) for stats in departments.values()),
+            "departments_affected": len(departments)
         }
+    }
+
+@api_router.get("/analytics/skill-gaps")
+@cached_response(response_cache)
+async def get_skill_gap_analysis(
+    department: Optional[str] = None,
+    critical_limit: Annotated[Optional[int], Query(ge=1)] = None,
+    include_details: bool = True
+):
+    """Get skill gap analysis and training recommendations.
+    
+    Summary, per-department rollups and the critical-gap ranking are read
+    from views maintained on write; only ``include_details`` reads the
+    individual gaps.
+    """
+    try:
+        async with DataContext(db, []) as ctx:
+            return await skill_gaps_panel(ctx, department, critical_limit, include_details)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.put("/skill-gaps/{gap_id}")
+async def update_skill_gap(gap_id: str, gap: SkillGap):
+    """Replace a skill gap, moving its contribution in the rollups from the old values to the new"""
+    try:
+        document = {**gap.dict(), "id": gap_id}
+        previous = await db.skill_gaps.find_one_and_replace({"id": gap_id}, document)
+        if previous is None:
+            raise HTTPException(status_code=404, detail=f"Unknown skill gap: {gap_id}")
+        await apply_skill_gap_delta(db, [previous], sign=-1)
+        await apply_skill_gap_delta(db, [{**document, "_id": previous['_id']}])
+        return {"id": gap_id, "gap_percentage": gap_percentage(document)}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        response_cache.invalidate()
+
+def forecasting_insights(project_count, success_distribution, risk_projects, dept_avg_success) -> List[str]:
+    return [
+        f"Total of {project_count} projects tracked",
+        f"{success_distribution['high']} projects have high success probability (≥80%)",
+        f"{len(risk_projects)} projects are at risk (success rate <60%)",
+        f"Engineering has the highest project success rate" if "Engineering" in dept_avg_success else "Department performance varies"
+    ]
+
+async def project_forecasting_panel(ctx: DataContext):
+    if warehouse_source is not None:
+        forecast = await warehouse_project_forecasting(warehouse_source)
+    else:
+        snapshot = await ctx.shared("snapshot", analytics_snapshot)
+        # Converting snapshot columns to pandas copies them, so it runs in
+        # the thread as well
+        forecast = None if snapshot is None else await asyncio.to_thread(lambda: snapshot_project_forecasting(
+            snapshot.frame("projects"), snapshot.frame("employees", ["employee_key", "department"])
+        ))
+    if forecast is not None:
+        project_count = forecast.pop("project_count")
+        return {**forecast, "forecasting_insights": forecasting_insights(
+            project_count, forecast["success_distribution"], forecast["risk_projects"], forecast["department_success_rates"]
+        )}
+    
+    # Distributions come from the materialized views; only the at-risk
+    # projects are read from the collection
+    bands, statuses, departments = await asyncio.gather(
+        ctx.view("project_success_band"),
+        ctx.view("project_status"),
+        ctx.view("project_department")
+    )
+    # Success probability distribution
+    success_distribution = {band: bands[band]['count'] if band in bands else 0 for band in ("high", "medium", "low")}
+    status_distribution = {status: stats['count'] for status, stats in statuses.items()}
+    project_count = sum(status_distribution.values())
+    
+    # Calculate average success rate by department
+    # (each project is attributed to its earliest team member's department)
+    dept_avg_success = {}
+    for dept, data in departments.items():
+        dept_avg_success[dept] = round((data["success_sum"] / data["count"]) * 100, 1)
+    
+    # Risk projects (low success probability)
+    risk_projects = []
+    async for proj in find(db, "project_forecasting", "projects", {"success_probability": {"$lt": 0.6}}) \
+            .sort([("success_probability", 1), ("_id", 1)]):
+        risk_projects.append({
+            "name": proj['name'],
+            "success_probability": proj['success_probability'],
+            "status": proj['status'],
+            "team_size": len(proj['team_members'])
+        })
+    
+    return {
+        "success_distribution": success_distribution,
+        "status_distribution": status_distribution,
+        "department_success_rates": dept_avg_success,
+        "risk_projects": risk_projects,
+        "forecasting_insights": forecasting_insights(project_count, success_distribution, risk_projects, dept_avg_success)
+    }
 
 @api_router.get("/analytics/project-forecasting")
+@cached_response(response_cache)
 async def get_project_forecasting():
     """Get project success forecasting and trends"""
     try:
-        projects = await db.projects.find().to_list(length=None)
-        
-        # Success probability distribution
-        success_distribution = {"high": 0, "medium": 0, "low": 0}
-        status_distribution = {}
-        department_success = {}
-        
-        for project in projects:
-            # Success probability categorization
-            prob = project['success_probability']
-            if prob >= 0.8:
-                success_distribution["high"] += 1
-            elif prob >= 0.6:
-                success_distribution["medium"] += 1
-            else:
-                success_distribution["low"] += 1
-            
-            # Status distribution
-            status = project['status']
-            status_distribution[status] = status_distribution.get(status, 0) + 1
-            
-            # Department success (using team member departments)
-            # For simplicity, we'll use the first team member's department
-            employees = await db.employees.find({"name": {"$in": project['team_members']}}).to_list(length=None)
-            if employees:
-                dept = employees[0]['department']
-                if dept not in department_success:
-                    department_success[dept] = {"total": 0, "success_sum": 0}
-                department_success[dept]["total"] += 1
-                department_success[dept]["success_sum"] += prob
-        
-        # Calculate average success rate by department
-        dept_avg_success = {}
-        for dept, data in department_success.items():
-            dept_avg_success[dept] = round((data["success_sum"] / data["total"]) * 100, 1)
-        
-        # Risk projects (low success probability)
-        risk_projects = [
-            {
-                "name": proj['name'],
-                "success_probability": proj['success_probability'],
-                "status": proj['status'],
-                "team_size": len(proj['team_members'])
-            }
-            for proj in projects
-            if proj['success_probability'] < 0.6
-        ]
-        
-        return {
-            "success_distribution": success_distribution,
-            "status_distribution": status_distribution,
-            "department_success_rates": dept_avg_success,
-            "risk_projects": sorted(risk_projects, key=lambda x: x['success_probability']),
-            "forecasting_insights": [
-                f"Total of {len(projects)} projects tracked",
-                f"{success_distribution['high']} projects have high success probability (≥80%)",
-                f"{len(risk_projects)} projects are at risk (success rate <60%)",
-                f"Engineering has the highest project success rate" if "Engineering" in dept_avg_success else "Department performance varies"
-            ]
-        }
+        async with DataContext(db, []) as ctx:
+            return await project_forecasting_panel(ctx)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+PERFORMANCE_INSIGHTS = [
+    "Performance strongly correlates with experience in most departments",
+    "Top performers show high collaboration indices",
+    "Engineering department shows highest average productivity",
+    "Consider cross-department knowledge sharing initiatives"
+]
+
+async def aggregate_departments(match: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Department totals of the employees matching ``match``, shaped like the department view"""
+    rows = await db.employees.aggregate(mongo_department_pipeline(match)).to_list(length=None)
+    return {row['_id']: row for row in rows}
+
+async def performance_trends_panel(ctx: DataContext, employee_filter: Optional[EmployeeFilter] = None,
+                                   limit: int = 10, experience_bin: float = EXPERIENCE_BIN_YEARS,
+                                   performance_bin: float = PERFORMANCE_BIN):
+    employee_filter = employee_filter or EmployeeFilter()
+    if warehouse_source is not None:
+        trends = await warehouse_performance_trends(warehouse_source, limit, employee_filter,
+                                                    experience_bin, performance_bin)
+        return {**trends, "insights": PERFORMANCE_INSIGHTS}
+    snapshot = await ctx.shared("snapshot", analytics_snapshot)
+    if snapshot is not None:
+        trends = await asyncio.to_thread(snapshot_performance_trends, snapshot["employees"], limit,
+                                         employee_filter, experience_bin, performance_bin)
+        return {**trends, "insights": PERFORMANCE_INSIGHTS}
+    
+    # Department averages come from the materialized department view
+    # unless the request filters employees
+    match = employee_filter.mongo_match()
+    if employee_filter.is_empty():
+        department_totals = ctx.view("department")
+    else:
+        department_totals = aggregate_departments(match)
+    top_performers, cells, departments = await asyncio.gather(
+        find(db, "performance_trends", "employees", match)
+            .sort([("performance_score", -1), ("_id", 1)]).limit(limit).to_list(length=limit),
+        db.employees.aggregate(mongo_histogram_pipeline(match, experience_bin, performance_bin))
+            .to_list(length=None),
+        department_totals
+    )
+    
+    dept_avg_performance = {}
+    dept_avg_productivity = {}
+    
+    for dept, stats in departments.items():
+        dept_avg_performance[dept] = round(stats['performance_sum'] / stats['count'], 2)
+        dept_avg_productivity[dept] = round(stats['productivity_sum'] / stats['count'], 2)
+    
+    return {
+        "department_performance": dept_avg_performance,
+        "department_productivity": dept_avg_productivity,
+        "top_performers": [
+            {
+                "name": emp['name'],
+                "department": emp['department'],
+                "performance_score": emp['performance_score'],
+                "productivity_score": emp['productivity_score']
+            }
+            for emp in top_performers
+        ],
+        "experience_correlation": experience_histogram(cells, experience_bin, performance_bin),
+        "insights": PERFORMANCE_INSIGHTS
+    }
+
 @api_router.get("/analytics/performance-trends")
-async def get_performance_trends():
-    """Get performance trends and productivity insights"""
+@cached_response(response_cache)
+async def get_performance_trends(
+    department: Optional[str] = None,
+    role: Optional[str] = None,
+    min_performance: Annotated[Optional[float], Query(ge=0, le=1)] = None,
+    max_performance: Annotated[Optional[float], Query(ge=0, le=1)] = None,
+    min_experience: Annotated[Optional[float], Query(ge=0)] = None,
+    max_experience: Annotated[Optional[float], Query(ge=0)] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 10,
+    experience_bin: Annotated[float, Query(ge=0.5, le=50)] = EXPERIENCE_BIN_YEARS,
+    performance_bin: Annotated[float, Query(ge=0.01, le=1)] = PERFORMANCE_BIN
+):
+    """Get performance trends and productivity insights.
+    
+    Filters and the top-performer limit run in the database, and the
+    experience correlation is a 2D histogram of experience against
+    performance, so the response size does not grow with headcount.
+    """
     try:
-        employees = await db.employees.find().to_list(length=None)
-        
-        # Performance by department
-        dept_performance = {}
-        dept_productivity = {}
-        
-        for emp in employees:
-            dept = emp['department']
-            
-            if dept not in dept_performance:
-                dept_performance[dept] = []
-                dept_productivity[dept] = []
-            
-            dept_performance[dept].append(emp['performance_score'])
-            dept_productivity[dept].append(emp['productivity_score'])
-        
-        # Calculate averages
-        dept_avg_performance = {}
-        dept_avg_productivity = {}
-        
-        for dept in dept_performance:
-            dept_avg_performance[dept] = round(sum(dept_performance[dept]) / len(dept_performance[dept]), 2)
-            dept_avg_productivity[dept] = round(sum(dept_productivity[dept]) / len(dept_productivity[dept]), 2)
-        
-        # Top performers
-        top_performers = sorted(employees, key=lambda x: x['performance_score'], reverse=True)[:10]
-        
-        # Performance correlation with experience
-        experience_performance = []
-        for emp in employees:
-            experience_performance.append({
-                "experience": emp['experience_years'],
-                "performance": emp['performance_score'],
-                "productivity": emp['productivity_score'],
-                "collaboration": emp['collaboration_index']
-            })
-        
-        return {
-            "department_performance": dept_avg_performance,
-            "department_productivity": dept_avg_productivity,
-            "top_performers": [
-                {
-                    "name": emp['name'],
-                    "department": emp['department'],
-                    "performance_score": emp['performance_score'],
-                    "productivity_score": emp['productivity_score']
-                }
-                for emp in top_performers
-            ],
-            "experience_correlation": experience_performance,
-            "insights": [
-                "Performance strongly correlates with experience in most departments",
-                "Top performers show high collaboration indices",
-                "Engineering department shows highest average productivity",
-                "Consider cross-department knowledge sharing initiatives"
-            ]
-        }
+        employee_filter = EmployeeFilter(
+            department=department, role=role,
+            min_performance=min_performance, max_performance=max_performance,
+            min_experience=min_experience, max_experience=max_experience
+        )
+        async with DataContext(db, []) as ctx:
+            return await performance_trends_panel(ctx, employee_filter, limit, experience_bin, performance_bin)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def semantic_matching_panel(ctx: DataContext):
+    async with ctx.batches("employees") as employee_batches:
+        projects = await ctx.documents("projects")
+        
+        # Skill similarity analysis: each batch of employees is scored against
+        # every required skill set as one matrix product in the compute pool,
+        # and merged into running top-5 lists
+        prepared = prepare_projects(projects)
+        recommendations = [[] for _ in projects]
+        if prepared is not None:
+            reducer = TopMatchReducer(prepared, 5)
+            async for batch in employee_batches:
+                reducer.update(await compute_pool.run(merge_top_matches, *reducer.merge_args(batch)))
+            recommendations = reducer.recommendations()
+    skill_matches = [
+        {
+            "project": project['name'],
+            "required_skills": project['required_skills'],
+            "current_team": project['team_members'],
+            "recommended_employees": recommended  # Top 5 matches
+        }
+        for project, recommended in zip(projects, recommendations)
+    ]
+    
+    # Skill clustering (employees with similar skills): near-duplicate
+    # skill sets are grouped through the MinHash/LSH index
+    await skill_index.sync(db)
+    meaningful_clusters = skill_index.clusters(SKILL_CLUSTER_THRESHOLD)
+    
+    return {
+        "project_skill_matching": skill_matches,
+        "skill_clusters": meaningful_clusters,
+        "recommendations": [
+            "Cross-train employees in complementary skills",
+            "Form skill-based project teams",
+            "Identify skill gaps in critical projects",
+            "Develop mentorship programs within skill clusters"
+        ]
+    }
+
 @api_router.get("/analytics/semantic-matching")
+@cached_response(response_cache)
 async def get_semantic_skill_matching():
     """Get semantic skill matching for team optimization"""
     try:
-        employees = await db.employees.find().to_list(length=None)
-        projects = await db.projects.find().to_list(length=None)
-        
-        # Skill similarity analysis (simplified)
-        skill_matches = []
-        
-        for project in projects:
-            required_skills = set(project['required_skills'])
-            
-            # Find best matching employees
-            employee_matches = []
-            for emp in employees:
-                emp_skills = set(emp['skills'])
-                skill_overlap = len(required_skills.intersection(emp_skills))
-                match_percentage = (skill_overlap / len(required_skills)) * 100 if required_skills else 0
-                
-                if match_percentage > 0:
-                    employee_matches.append({
-                        "name": emp['name'],
-                        "department": emp['department'],
-                        "matching_skills": list(required_skills.intersection(emp_skills)),
-                        "match_percentage": round(match_percentage, 1),
-                        "performance_score": emp['performance_score']
-                    })
-            
-            # Sort by match percentage and performance
-            employee_matches.sort(key=lambda x: (x['match_percentage'], x['performance_score']), reverse=True)
-            
-            skill_matches.append({
-                "project": project['name'],
-                "required_skills": project['required_skills'],
-                "current_team": project['team_members'],
-                "recommended_employees": employee_matches[:5]  # Top 5 matches
-            })
-        
-        # Skill clustering (employees with similar skills)
-        skill_clusters = {}
-        for emp in employees:
-            skill_signature = tuple(sorted(emp['skills']))
-            if skill_signature not in skill_clusters:
-                skill_clusters[skill_signature] = []
-            skill_clusters[skill_signature].append(emp['name'])
-        
-        # Filter clusters with multiple employees
-        meaningful_clusters = [
-            {
-                "skills": list(skills),
-                "employees": names,
-                "cluster_size": len(names)
-            }
-            for skills, names in skill_clusters.items()
-            if len(names) > 1
-        ]
-        
+        async with DataContext(db, ["semantic_matching"]) as ctx:
+            return await semantic_matching_panel(ctx)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def team_assignment_panel(ctx: DataContext, staff_per_skill: int = 1, time_budget: float = 10.0):
+    # The assignment is global, so every employee is kept, but as compact
+    # columns built batch by batch rather than as documents
+    async with ctx.batches("employees") as employee_batches:
+        assignment = AssignmentInput(await ctx.documents("projects"), staff_per_skill)
+        async for batch in employee_batches:
+            assignment.add(batch)
+    projects = assignment.projects
+    prepared = assignment.prepared()
+    if prepared is None:
+        return {"teams": [], "summary": {"projects": len(projects), "slots": 0, "slots_filled": 0,
+                                         "unassigned_employees": len(assignment.names), "fully_staffed_projects": 0},
+                "solver": None}
+    owner, solver = await compute_pool.run(
+        solve_assignment, prepared["employee_matrix"], prepared["performance"], prepared["project_matrix"],
+        prepared["class_project"], prepared["class_skill"], prepared["capacity"], time_budget
+    )
+    teams = build_teams(projects, prepared, owner)
+    assigned = int((owner >= 0).sum())
+    return {
+        "teams": teams,
+        "summary": {
+            "projects": len(projects),
+            "slots": int(prepared["capacity"].sum()),
+            "slots_filled": assigned,
+            "unassigned_employees": len(assignment.names) - assigned,
+            "fully_staffed_projects": sum(1 for team in teams if not team["uncovered_skills"])
+        },
+        "solver": solver
+    }
+
+@api_router.get("/analytics/team-assignment")
+@cached_response(response_cache)
+async def get_team_assignment(
+    staff_per_skill: Annotated[int, Query(ge=1, le=20)] = 1,
+    time_budget: Annotated[float, Query(gt=0, le=60)] = 10.0
+):
+    """Form project teams by assigning employees globally.
+    
+    Unlike semantic matching, which ranks employees per project, each
+    employee joins at most one project. Every required skill of a project
+    gets ``staff_per_skill`` slots, filled by employees holding the skill so
+    that total skill overlap and performance are maximized. The solver
+    returns the best assignment found within ``time_budget`` seconds; 10,000
+    employees over 1,000 projects with one slot per skill finish in about
+    2 s, while three slots per skill at that scale use the whole default
+    budget and report a looser ``optimality_gap_bound``.
+    """
+    try:
+        async with DataContext(db, ["team_assignment"]) as ctx:
+            return await team_assignment_panel(ctx, staff_per_skill, time_budget)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/analytics/similar-employees")
+async def get_similar_employees(
+    name: Optional[str] = None,
+    skills: Annotated[Optional[List[str]], Query()] = None,
+    threshold: Annotated[float, Query(ge=0, le=1)] = 0.5,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 20
+):
+    """Find employees whose skills resemble an employee's or a given skill list.
+    
+    Similarity is the Jaccard index of the skill sets as estimated by the
+    MinHash/LSH skill index.
+    """
+    if name is None and not skills:
+        raise HTTPException(status_code=422, detail="Provide an employee name or skills")
+    try:
+        await skill_index.sync(db)
+        matches = skill_index.similar_employees(skills=skills, name=name, threshold=threshold, limit=limit)
         return {
-            "project_skill_matching": skill_matches,
-            "skill_clusters": meaningful_clusters,
-            "recommendations": [
-                "Cross-train employees in complementary skills",
-                "Form skill-based project teams",
-                "Identify skill gaps in critical projects",
-                "Develop mentorship programs within skill clusters"
-            ]
+            "query": {"name": name, "skills": skills, "threshold": threshold},
+            "matches": matches,
+            "index": skill_index.stats()
         }
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown employee: {name}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Panels of the composite dashboard endpoint: name -> (panel, endpoints
+# whose declared fields the panel reads from shared collection loads)
+DASHBOARD_PANELS = {
+    "overview": (overview_panel, []),
+    "collaboration_network": (collaboration_network_panel, ["collaboration_network"]),
+    "skill_gaps": (skill_gaps_panel, []),
+    "project_forecasting": (project_forecasting_panel, []),
+    "performance_trends": (performance_trends_panel, []),
+    "semantic_matching": (semantic_matching_panel, ["semantic_matching"]),
+    "team_assignment": (team_assignment_panel, ["team_assignment"])
+}
+DEFAULT_DASHBOARD_PANELS = "overview,collaboration_network,skill_gaps,project_forecasting,performance_trends,semantic_matching"
+
+@api_router.get("/dashboard")
+@cached_response(response_cache)
+async def get_dashboard(panels: str = DEFAULT_DASHBOARD_PANELS):
+    """Compute several dashboard panels in one round-trip.
+    
+    ``panels`` is a comma-separated list of DASHBOARD_PANELS, each computed
+    with its endpoint's default parameters. The panels run concurrently over
+    one DataContext, so each collection is scanned and each view read at
+    most once per request. A failing panel is listed under ``errors``.
+    """
+    names = list(dict.fromkeys(name.strip() for name in panels.split(",") if name.strip()))
+    unknown = [name for name in names if name not in DASHBOARD_PANELS]
+    if unknown or not names:
+        raise HTTPException(status_code=422, detail=f"Unknown panels: {', '.join(unknown)}" if unknown
+                            else "Request at least one panel")
+    try:
+        async with DataContext(db, [endpoint for name in names for endpoint in DASHBOARD_PANELS[name][1]]) as ctx:
+            result = await run_panels({name: DASHBOARD_PANELS[name][0](ctx) for name in names})
+        return {**result, "loads": ctx.loads()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -573,6 +1100,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost middleware: times every request; PROFILE_DIR enables per-request
+# cProfile/pyinstrument dumps via the X-Profile header
+app.add_middleware(ProfilingMiddleware, registry=metrics_registry, profile_dir=os.environ.get('PROFILE_DIR'))
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
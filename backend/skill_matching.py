@@ -0,0 +1,188 @@
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+# Upper bound on the number of (project, employee) cells scored at once
+MATCH_CHUNK_CELLS = 1 << 22
+
+
+def encode_skills(skill_lists: List[List[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """Encode skill lists as a boolean row-per-entity matrix over ``vocabulary``.
+
+    Skills outside the vocabulary are ignored, so encoding employees against
+    the projects' required skills keeps the matrix only as wide as needed.
+    """
+    rows = []
+    cols = []
+    for row, skills in enumerate(skill_lists):
+        for skill in skills:
+            col = vocabulary.get(skill)
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    matrix = np.zeros((len(skill_lists), len(vocabulary)), dtype=bool)
+    matrix[rows, cols] = True
+    return matrix
+
+
+def prepare_projects(projects: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Encode the projects' required skills; None when no project requires any"""
+    required_sets = [set(project['required_skills']) for project in projects]
+    vocabulary = {}
+    for required in required_sets:
+        for skill in required:
+            vocabulary.setdefault(skill, len(vocabulary))
+    if not vocabulary:
+        return None
+
+    project_matrix = encode_skills([list(required) for required in required_sets], vocabulary)
+    # Projects that require the same skill set share one ranking
+    unique_matrix, inverse = np.unique(project_matrix, axis=0, return_inverse=True)
+    return {
+        "vocabulary": vocabulary,
+        "skill_names": np.array(list(vocabulary), dtype=object),
+        "unique_matrix": unique_matrix,
+        "inverse": inverse.reshape(-1),
+        "required_counts": project_matrix.sum(axis=1).tolist()
+    }
+
+
+def merge_top_matches(top: np.ndarray, top_overlap: np.ndarray, top_performance: np.ndarray,
+                      employee_matrix: np.ndarray, performance: np.ndarray, offset: int,
+                      unique_matrix: np.ndarray, top_k: int = 5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merge a batch of employees into running top lists per unique skill set.
+
+    ``top`` holds employee positions per skill set with their overlaps and
+    performance; the batch's employees are positions ``offset`` onwards.
+    Employees rank by overlap, then performance, then position (the order
+    a stable sort over every employee seen so far would keep). Pure numpy
+    over array inputs, so it can run in a worker process.
+    """
+    n_sets, n_batch = len(unique_matrix), len(performance)
+    positions = np.arange(offset, offset + n_batch, dtype=np.int64)
+    # Rank the candidate pool (kept employees plus the batch) by performance,
+    # ties by position, so overlap * pool size + tiebreak is a unique key
+    pool, first = np.unique(np.concatenate([top.ravel(), positions]), return_index=True)
+    pool_performance = np.concatenate([top_performance.ravel(), performance])[first]
+    tiebreak = np.empty(len(pool), dtype=np.int64)
+    tiebreak[np.lexsort((pool, -pool_performance))] = np.arange(len(pool) - 1, -1, -1, dtype=np.int64)
+
+    key_dtype = np.int32 if (unique_matrix.shape[1] + 1) * len(pool) < np.iinfo(np.int32).max else np.int64
+    tiebreak = tiebreak.astype(key_dtype)
+    # Batch positions come after every kept one, so they close the pool
+    top_tiebreak = tiebreak[np.searchsorted(pool, top)]
+    batch_tiebreak = tiebreak[len(pool) - n_batch:]
+
+    employee_matrix = employee_matrix.astype(np.float32)
+    kept = top.shape[1]
+    k = min(top_k, kept + n_batch)
+    chunk = max(1, MATCH_CHUNK_CELLS // (kept + n_batch))
+    merged = np.empty((n_sets, k), dtype=np.int64)
+    merged_overlap = np.empty((n_sets, k), dtype=np.int64)
+    merged_performance = np.empty((n_sets, k), dtype=np.float64)
+    for start in range(0, n_sets, chunk):
+        rows = slice(start, start + chunk)
+        block_overlap = (unique_matrix[rows].astype(np.float32) @ employee_matrix.T).astype(key_dtype)
+        keys = np.concatenate([top_overlap[rows].astype(key_dtype) * key_dtype(len(pool)) + top_tiebreak[rows],
+                               block_overlap * key_dtype(len(pool)) + batch_tiebreak], axis=1)
+        best = np.argpartition(keys, keys.shape[1] - k, axis=1)[:, keys.shape[1] - k:]
+        best = np.take_along_axis(best, np.argsort(-np.take_along_axis(keys, best, axis=1), axis=1), axis=1)
+        # Columns below ``kept`` are kept employees, the rest batch employees
+        from_top = best < kept
+        in_top = np.minimum(best, max(kept - 1, 0))
+        in_batch = np.maximum(best - kept, 0)
+        if kept:
+            merged[rows] = np.where(from_top, np.take_along_axis(top[rows], in_top, axis=1), positions[in_batch])
+            merged_overlap[rows] = np.where(from_top, np.take_along_axis(top_overlap[rows], in_top, axis=1),
+                                            np.take_along_axis(block_overlap, in_batch, axis=1))
+            merged_performance[rows] = np.where(from_top, np.take_along_axis(top_performance[rows], in_top, axis=1),
+                                                performance[in_batch])
+        else:
+            merged[rows] = positions[in_batch]
+            merged_overlap[rows] = np.take_along_axis(block_overlap, in_batch, axis=1)
+            merged_performance[rows] = performance[in_batch]
+    return merged, merged_overlap, merged_performance
+
+
+class TopMatchReducer:
+    """Top matches per project over employees streamed in batches.
+
+    Keeps only the ``top_k`` best employees per unique skill set, plus the
+    documents and skill rows of those employees, so memory does not grow
+    with headcount. Feed each batch through ``merge_args`` and
+    ``merge_top_matches`` into ``update``.
+    """
+
+    def __init__(self, prepared: Dict[str, Any], top_k: int = 5):
+        self.prepared = prepared
+        self.top_k = top_k
+        n_sets = len(prepared["unique_matrix"])
+        self.top = np.empty((n_sets, 0), dtype=np.int64)
+        self.top_overlap = np.empty((n_sets, 0), dtype=np.int64)
+        self.top_performance = np.empty((n_sets, 0), dtype=np.float64)
+        self.seen = 0
+        # Documents and skill rows of the ranked employees, by position
+        self.employees: Dict[int, Dict[str, Any]] = {}
+        self.skill_rows: Dict[int, np.ndarray] = {}
+        self._pending: Tuple[List[Dict[str, Any]], Optional[np.ndarray]] = ([], None)
+
+    def merge_args(self, batch: List[Dict[str, Any]]) -> tuple:
+        """Encode ``batch`` as the arguments of ``merge_top_matches``"""
+        matrix = encode_skills([emp['skills'] for emp in batch], self.prepared["vocabulary"])
+        performance = np.array([emp['performance_score'] for emp in batch], dtype=np.float64)
+        self._pending = (batch, matrix)
+        return (self.top, self.top_overlap, self.top_performance, matrix, performance, self.seen,
+                self.prepared["unique_matrix"], self.top_k)
+
+    def update(self, merged: Tuple[np.ndarray, np.ndarray, np.ndarray]):
+        self.top, self.top_overlap, self.top_performance = merged
+        batch, matrix = self._pending
+        ranked = set(self.top.ravel().tolist())
+        for position in ranked.difference(self.employees):
+            self.employees[position] = batch[position - self.seen]
+            self.skill_rows[position] = matrix[position - self.seen]
+        for position in set(self.employees).difference(ranked):
+            del self.employees[position], self.skill_rows[position]
+        self.seen += len(batch)
+        self._pending = ([], None)
+
+    def recommendations(self) -> List[List[Dict[str, Any]]]:
+        return build_recommendations(self.employees, {**self.prepared, "employee_matrix": self.skill_rows},
+                                     self.top, self.top_overlap)
+
+
+def build_recommendations(
+    employees: List[Dict[str, Any]],
+    prepared: Dict[str, Any],
+    top: np.ndarray,
+    top_overlap: np.ndarray
+) -> List[List[Dict[str, Any]]]:
+    """Turn ranked top lists into per-project recommendation lists.
+
+    ``employees`` and ``prepared["employee_matrix"]`` are indexed by employee
+    position; mappings holding only the ranked employees work as well.
+    """
+    unique_matrix = prepared["unique_matrix"]
+    employee_matrix = prepared["employee_matrix"]
+    required_counts = prepared["required_counts"]
+    ranked = list(zip(top.tolist(), top_overlap.tolist()))
+    results = []
+    for project_index, unique_index in enumerate(prepared["inverse"]):
+        required_mask = unique_matrix[unique_index]
+        matches = []
+        for emp_index, skill_overlap in zip(*ranked[unique_index]):
+            if skill_overlap == 0:
+                break
+            emp = employees[emp_index]
+            shared = required_mask & employee_matrix[emp_index]
+            matches.append({
+                "name": emp['name'],
+                "department": emp['department'],
+                "matching_skills": prepared["skill_names"][shared].tolist(),
+                "match_percentage": round((skill_overlap / required_counts[project_index]) * 100, 1),
+                "performance_score": emp['performance_score']
+            })
+        results.append(matches)
+    return results
+
@@ -0,0 +1,343 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from bson import ObjectId
+
+from query_projections import BATCH_SIZES, find, iter_batches
+
+
+MERSENNE_PRIME = (1 << 31) - 1
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+
+# Odd 64-bit multiplier used to fold a band's rows into one bucket key
+_BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+@functools.lru_cache(maxsize=65536)
+def _skill_hash(skill: str) -> int:
+    return int.from_bytes(hashlib.blake2b(skill.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class SkillSimilarityIndex:
+    """MinHash/LSH index over employee skill sets.
+
+    Employees with the same skill set share one MinHash signature, so the
+    index works on distinct skill sets (thousands) rather than employees
+    (millions). Each signature is split into ``bands`` bands; sets that
+    agree on every row of any band land in the same bucket and become
+    candidates, whose Jaccard similarity is then estimated as the fraction
+    of agreeing signature rows. With the defaults (16 bands of 4 rows) sets
+    above roughly 0.5 Jaccard are very likely to collide.
+
+    Employees are added incrementally; ``sync`` pulls employees written
+    since the last sync, and the index is persisted to ``path``.
+    Membership is tracked by ``employee_key``, so employees committed out
+    of ``_id`` order by concurrent writers are still picked up.
+    """
+
+    def __init__(self, path: Optional[str] = None, num_perm: int = DEFAULT_NUM_PERM,
+                 bands: int = DEFAULT_BANDS, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = Path(path) if path else None
+        self.num_perm = num_perm
+        self.bands = bands
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._lock = asyncio.Lock()
+        self.reset()
+
+    def reset(self):
+        self.set_skills: List[List[str]] = []
+        self._set_ids: Dict[frozenset, int] = {}
+        self.signatures = np.zeros((0, self.num_perm), dtype=np.uint32)
+        self.set_members: List[List[int]] = []
+        self.member_keys: List[Optional[int]] = []
+        self._known_keys: Set[Optional[int]] = set()
+        self.member_names: List[str] = []
+        self.member_sets: List[int] = []
+        self._name_rows: Dict[str, int] = {}
+        self.first_id: Optional[ObjectId] = None
+        self.watermark: Optional[ObjectId] = None
+        self._buckets = None
+        self._clusters: Dict[float, List[Dict[str, Any]]] = {}
+
+    # Signatures and buckets
+
+    def signature(self, skill_lists: List[Iterable[str]]) -> np.ndarray:
+        """MinHash signatures (one row per skill list) under this index's permutations"""
+        skill_lists = [sorted(set(skills)) for skills in skill_lists]
+        sizes = np.array([len(skills) for skills in skill_lists], dtype=np.int64)
+        signatures = np.full((len(skill_lists), self.num_perm), MERSENNE_PRIME, dtype=np.uint32)
+        if sizes.sum() == 0:
+            return signatures
+        hashes = np.array([_skill_hash(skill) for skills in skill_lists for skill in skills], dtype=np.uint64)
+        values = (hashes[:, None] % np.uint64(MERSENNE_PRIME) * self._a + self._b) % np.uint64(MERSENNE_PRIME)
+        filled = np.flatnonzero(sizes)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])[filled]
+        signatures[filled] = np.minimum.reduceat(values, starts, axis=0)
+        return signatures
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """Fold each band's rows into one uint64 key; shape (sets, bands)"""
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        keys = np.zeros(rows.shape[:2], dtype=np.uint64)
+        for row in range(rows.shape[2]):
+            keys = keys * _BAND_MULTIPLIER + rows[:, :, row]
+        return keys
+
+    def _bucket_index(self):
+        # Per band: bucket keys sorted, with the set id for each; rebuilt
+        # lazily after new skill sets arrive
+        if self._buckets is None:
+            keys = self._band_keys(self.signatures)
+            order = np.argsort(keys, axis=0, kind="stable")
+            self._buckets = (np.take_along_axis(keys, order, axis=0), order)
+        return self._buckets
+
+    def _candidates(self, signature: np.ndarray) -> np.ndarray:
+        sorted_keys, set_ids = self._bucket_index()
+        query_keys = self._band_keys(signature[None, :])[0]
+        found = []
+        for band in range(self.bands):
+            column = sorted_keys[:, band]
+            lo = np.searchsorted(column, query_keys[band], side="left")
+            hi = np.searchsorted(column, query_keys[band], side="right")
+            if hi > lo:
+                found.append(set_ids[lo:hi, band])
+        return np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+
+    def _similar_sets(self, signature: np.ndarray, threshold: float):
+        """Candidate set ids with estimated Jaccard >= threshold, most similar first"""
+        candidates = self._candidates(signature)
+        if len(candidates) == 0:
+            return candidates, np.zeros(0)
+        estimates = (self.signatures[candidates] == signature).mean(axis=1)
+        keep = estimates >= threshold
+        candidates, estimates = candidates[keep], estimates[keep]
+        order = np.lexsort((candidates, -estimates))
+        return candidates[order], estimates[order]
+
+    # Incremental updates
+
+    def new_skill_sets(self, employees: List[Dict[str, Any]]) -> List[List[str]]:
+        """Skill sets of ``employees`` not yet in the index, in the order ``add_employees`` adds them"""
+        new_sets = {}
+        for emp in employees:
+            skills = frozenset(emp.get('skills') or [])
+            if skills not in self._set_ids:
+                new_sets.setdefault(skills, sorted(skills))
+        return list(new_sets.values())
+
+    def add_employees(self, employees: List[Dict[str, Any]], signatures: Optional[np.ndarray] = None):
+        """Add employees (name, skills and optionally employee_key/_id) to the index.
+
+        ``signatures`` may hold precomputed signatures of ``new_skill_sets(employees)``.
+        """
+        new_sets = []
+        for emp in employees:
+            skills = frozenset(emp.get('skills') or [])
+            set_id = self._set_ids.get(skills)
+            if set_id is None:
+                set_id = self._set_ids[skills] = len(self.set_skills)
+                self.set_skills.append(sorted(skills))
+                self.set_members.append([])
+                new_sets.append(sorted(skills))
+            row = len(self.member_names)
+            self.member_keys.append(emp.get('employee_key'))
+            self._known_keys.add(emp.get('employee_key'))
+            self.member_names.append(emp['name'])
+            self.member_sets.append(set_id)
+            self.set_members[set_id].append(row)
+            self._name_rows.setdefault(emp['name'], row)
+            if '_id' in emp:
+                if self.first_id is None or emp['_id'] < self.first_id:
+                    self.first_id = emp['_id']
+                if self.watermark is None or emp['_id'] > self.watermark:
+                    self.watermark = emp['_id']
+        if new_sets:
+            if signatures is None:
+                signatures = self.signature(new_sets)
+            self.signatures = np.concatenate([self.signatures, signatures])
+            self._buckets = None
+        if employees:
+            self._clusters = {}
+
+    async def _add_batches(self, cursor) -> int:
+        added = 0
+        async for batch in iter_batches(cursor, BATCH_SIZES["employees"]):
+            # Hashing new skill sets is the costly part; it runs in a thread
+            # and the index itself is only changed on the event loop
+            signatures = await asyncio.to_thread(self.signature, self.new_skill_sets(batch))
+            self.add_employees(batch, signatures)
+            added += len(batch)
+        return added
+
+    async def _missing_keys(self, db) -> List[int]:
+        missing = []
+        async for emp in db.employees.find({"employee_key": {"$exists": True}},
+                                           projection={"_id": 0, "employee_key": 1},
+                                           batch_size=BATCH_SIZES["employees"]):
+            if emp['employee_key'] not in self._known_keys:
+                missing.append(emp['employee_key'])
+        return missing
+
+    async def sync(self, db) -> int:
+        """Add employees written since the last sync; rebuild if the collection was replaced.
+
+        New employees are first found by ``_id`` above the watermark. When
+        concurrent writers commit out of ``_id`` order, some land below it;
+        the collection then holds more employees than the index, and the
+        keys are scanned for the missing ones. A collection that shrank or
+        whose oldest employee changed was reloaded, so the index starts
+        over. Returns the number of employees added.
+        """
+        async with self._lock:
+            count, oldest = await asyncio.gather(
+                db.employees.estimated_document_count(),
+                db.employees.find_one({}, projection={"_id": 1}, sort=[("_id", 1)])
+            )
+            if count < len(self.member_names) or (oldest and oldest["_id"]) != self.first_id:
+                self.reset()
+            query = {"_id": {"$gt": self.watermark}} if self.watermark else {}
+            added = await self._add_batches(find(db, "skill_index", "employees", query).sort("_id", 1))
+            if len(self.member_names) < count:
+                missing = await self._missing_keys(db)
+                for start in range(0, len(missing), BATCH_SIZES["employees"]):
+                    keys = missing[start:start + BATCH_SIZES["employees"]]
+                    cursor = find(db, "skill_index", "employees", {"employee_key": {"$in": keys}})
+                    added += await self._add_batches(cursor)
+            if added and self.path is not None:
+                await asyncio.to_thread(self.save)
+            return added
+
+    # Queries
+
+    def similar_employees(self, skills: Optional[Iterable[str]] = None, name: Optional[str] = None,
+                          threshold: float = 0.5, limit: int = 20) -> List[Dict[str, Any]]:
+        """Employees whose skills are similar to ``skills`` or to employee ``name``'s skills"""
+        exclude = None
+        if name is not None:
+            row = self._name_rows.get(name)
+            if row is None:
+                raise KeyError(name)
+            exclude = row
+            skills = self.set_skills[self.member_sets[row]]
+        signature = self.signature([list(skills or [])])[0]
+        results = []
+        for set_id, estimate in zip(*self._similar_sets(signature, threshold)):
+            for row in self.set_members[set_id]:
+                if row == exclude:
+                    continue
+                results.append({
+                    "name": self.member_names[row],
+                    "employee_key": self.member_keys[row],
+                    "skills": self.set_skills[set_id],
+                    "similarity": round(float(estimate), 3)
+                })
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def clusters(self, threshold: float = 0.6, min_size: int = 2) -> List[Dict[str, Any]]:
+        """Group employees whose skill sets are near-duplicates.
+
+        Leader clustering over skill sets: the most common unassigned set
+        leads a cluster and absorbs every unassigned set within
+        ``threshold`` estimated Jaccard of it. Cached until the index changes.
+        """
+        if threshold not in self._clusters:
+            assigned = np.full(len(self.set_skills), -1, dtype=np.int64)
+            sizes = np.array([len(members) for members in self.set_members], dtype=np.int64)
+            clusters = []
+            for leader in np.argsort(-sizes, kind="stable"):
+                if assigned[leader] >= 0 or not self.set_skills[leader]:
+                    continue
+                similar, _ = self._similar_sets(self.signatures[leader], threshold)
+                similar = similar[assigned[similar] < 0]
+                assigned[similar] = leader
+                assigned[leader] = leader
+                members = [self.member_names[row] for set_id in np.r_[leader, similar[similar != leader]]
+                           for row in self.set_members[set_id]]
+                clusters.append({
+                    "skills": self.set_skills[leader],
+                    "employees": members,
+                    "cluster_size": len(members),
+                    "skill_variants": 1 + int((similar != leader).sum())
+                })
+            clusters.sort(key=lambda cluster: cluster["cluster_size"], reverse=True)
+            self._clusters[threshold] = clusters
+        return [cluster for cluster in self._clusters[threshold] if cluster["cluster_size"] >= min_size]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "employees": len(self.member_names),
+            "skill_sets": len(self.set_skills),
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "watermark": str(self.watermark) if self.watermark else None,
+            "path": str(self.path) if self.path else None
+        }
+
+    # Persistence
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # A uniquely named file in the same directory, so concurrent saves
+        # never write into each other and the final rename is atomic
+        with tempfile.NamedTemporaryFile(dir=self.path.parent, prefix=self.path.name, suffix=".tmp",
+                                         delete=False) as temporary:
+            try:
+                self._write(temporary)
+            except BaseException:
+                temporary.close()
+                os.unlink(temporary.name)
+                raise
+        os.replace(temporary.name, self.path)
+
+    def _write(self, file):
+        np.savez(
+            file,
+            params=np.array([self.num_perm, self.bands, self.seed], dtype=np.int64),
+            signatures=self.signatures,
+            set_skills=np.array(json.dumps(self.set_skills)),
+            member_names=np.array(json.dumps(self.member_names)),
+            member_keys=np.array([-1 if key is None else key for key in self.member_keys], dtype=np.int64),
+            member_sets=np.array(self.member_sets, dtype=np.int64),
+            first_id=np.array(str(self.first_id) if self.first_id else ""),
+            watermark=np.array(str(self.watermark) if self.watermark else "")
+        )
+
+    def load(self) -> bool:
+        """Restore a saved index; returns False if none exists or it was built with other parameters"""
+        if self.path is None or not self.path.exists():
+            return False
+        with np.load(self.path) as saved:
+            if saved["params"].tolist() != [self.num_perm, self.bands, self.seed]:
+                return False
+            self.reset()
+            self.signatures = saved["signatures"]
+            self.set_skills = json.loads(str(saved["set_skills"]))
+            self.member_names = json.loads(str(saved["member_names"]))
+            self.member_keys = [None if key < 0 else key for key in saved["member_keys"].tolist()]
+            self.member_sets = saved["member_sets"].tolist()
+            self._known_keys = set(self.member_keys)
+            first_id, watermark = str(saved["first_id"]), str(saved["watermark"])
+            self.first_id = ObjectId(first_id) if first_id else None
+            self.watermark = ObjectId(watermark) if watermark else None
+        self._set_ids = {frozenset(skills): set_id for set_id, skills in enumerate(self.set_skills)}
+        self.set_members = [[] for _ in self.set_skills]
+        for row, set_id in enumerate(self.member_sets):
+            self.set_members[set_id].append(row)
+            self._name_rows.setdefault(self.member_names[row], row)
+        return True
@@ -0,0 +1,291 @@
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from employee_queries import (
+    EXPERIENCE_BIN_YEARS, PERFORMANCE_BIN, EmployeeFilter, experience_histogram, sql_histogram
+)
+from response_cache import ResponseCache
+
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+    duckdb = None
+
+try:
+    from google.cloud import bigquery
+except ImportError:
+    bigquery = None
+
+try:
+    from google.cloud import bigquery_storage
+except ImportError:
+    bigquery_storage = None
+
+
+# Warehouse tables follow the columnar snapshot layout (SNAPSHOT_COLUMNS):
+# employees, projects (with team_size and lead_key), collaboration_networks
+# and skill_gaps. SQL is written once in BigQuery standard SQL with @name
+# parameters and {table} placeholders that each source qualifies.
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_ROWS_PER_BATCH = 10000
+WAREHOUSE_TABLES = ("employees", "projects", "collaboration_networks", "skill_gaps")
+
+_PARAMETER = re.compile(r"@(\w+)")
+
+
+def query_hash(source: str, sql: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable hash of a query, its parameters and the source it runs on"""
+    normalized = " ".join(sql.split())
+    payload = json.dumps({"source": source, "sql": normalized, "params": params or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class WarehouseSource:
+    """Runs analytics SQL on a warehouse and streams results as Arrow batches.
+
+    Subclasses implement ``table`` and ``_open``, a blocking call returning
+    an iterator of record batches. Every query holds a semaphore slot for
+    its whole lifetime so at most ``max_concurrency`` run at once, and
+    ``query`` caches complete results by query hash.
+    """
+
+    name = "warehouse"
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, cache: Optional[ResponseCache] = None):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow is required for warehouse data sources")
+        self.max_concurrency = max_concurrency
+        self.cache = cache or ResponseCache(max_entries=128, ttl_seconds=300)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.queries_run = 0
+        self.rows_streamed = 0
+
+    def table(self, name: str) -> str:
+        raise NotImplementedError
+
+    def _open(self, sql: str, params: Dict[str, Any]) -> Iterator["pa.RecordBatch"]:
+        raise NotImplementedError
+
+    def render(self, sql: str) -> str:
+        return sql.format(**{name: self.table(name) for name in WAREHOUSE_TABLES})
+
+    async def stream(self, sql: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator["pa.RecordBatch"]:
+        """Yield result batches as the warehouse produces them (uncached)"""
+        async with self._semaphore:
+            self.queries_run += 1
+            batches = await asyncio.to_thread(self._open, self.render(sql), params or {})
+            while True:
+                batch = await asyncio.to_thread(next, batches, None)
+                if batch is None:
+                    return
+                self.rows_streamed += batch.num_rows
+                yield batch
+
+    async def query(self, sql: str, params: Optional[Dict[str, Any]] = None) -> "pa.Table":
+        """Run a query and return the whole result, cached by query hash"""
+        async def collect():
+            batches = [batch async for batch in self.stream(sql, params)]
+            return pa.Table.from_batches(batches) if batches else pa.table({})
+        return await self.cache.get_or_compute(query_hash(self.name, self.render(sql), params), collect)
+
+    async def rows(self, sql: str, params: Optional[Dict[str, Any]] = None):
+        return (await self.query(sql, params)).to_pylist()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "source": self.name,
+            "max_concurrency": self.max_concurrency,
+            "queries_run": self.queries_run,
+            "rows_streamed": self.rows_streamed,
+            "result_cache": self.cache.stats()
+        }
+
+
+class BigQuerySource(WarehouseSource):
+    """BigQuery source; results stream through the Storage Read API when
+    google-cloud-bigquery-storage is installed, otherwise through paged
+    REST reads"""
+
+    name = "bigquery"
+
+    def __init__(self, client, dataset: str, bqstorage_client=None,
+                 rows_per_batch: int = DEFAULT_ROWS_PER_BATCH, **kwargs):
+        super().__init__(**kwargs)
+        self.client = client
+        self.dataset = dataset if "." in dataset else f"{client.project}.{dataset}"
+        if bqstorage_client is None and bigquery_storage is not None:
+            bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=client._credentials)
+        self.bqstorage_client = bqstorage_client
+        self.rows_per_batch = rows_per_batch
+
+    def table(self, name: str) -> str:
+        return f"`{self.dataset}.{name}`"
+
+    @staticmethod
+    def _parameter(name: str, value: Any):
+        if isinstance(value, bool):
+            kind = "BOOL"
+        elif isinstance(value, int):
+            kind = "INT64"
+        elif isinstance(value, float):
+            kind = "FLOAT64"
+        else:
+            kind = "STRING"
+        return bigquery.ScalarQueryParameter(name, kind, value)
+
+    def _open(self, sql: str, params: Dict[str, Any]):
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[self._parameter(name, value) for name, value in params.items()]
+        )
+        result = self.client.query(sql, job_config=job_config).result(page_size=self.rows_per_batch)
+        return iter(result.to_arrow_iterable(bqstorage_client=self.bqstorage_client))
+
+
+class DuckDBSource(WarehouseSource):
+    """Local stand-in for BigQuery backed by DuckDB.
+
+    Accepts the same SQL: @name parameters are rewritten to DuckDB's $name
+    form. Each query runs on its own cursor so queries can overlap.
+    """
+
+    name = "duckdb"
+
+    def __init__(self, database: str = ":memory:", rows_per_batch: int = DEFAULT_ROWS_PER_BATCH, **kwargs):
+        if not DUCKDB_AVAILABLE:
+            raise RuntimeError("duckdb is not installed")
+        super().__init__(**kwargs)
+        self.connection = duckdb.connect(database)
+        self.rows_per_batch = rows_per_batch
+
+    def table(self, name: str) -> str:
+        return name
+
+    def load_table(self, name: str, table: "pa.Table"):
+        """Replace a warehouse table with the contents of an Arrow table"""
+        self.connection.register("_incoming", table)
+        try:
+            self.connection.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM _incoming")
+        finally:
+            self.connection.unregister("_incoming")
+        self.cache.invalidate()
+
+    def _open(self, sql: str, params: Dict[str, Any]):
+        cursor = self.connection.cursor()
+        reader = cursor.execute(_PARAMETER.sub(r"$\1", sql), params).fetch_record_batch(self.rows_per_batch)
+
+        def batches():
+            try:
+                yield from reader
+            finally:
+                cursor.close()
+        return batches()
+
+
+# Analytics pushed down to the warehouse. Each returns the data portion of
+# the matching endpoint, shaped like the Mongo and snapshot paths.
+
+async def warehouse_performance_trends(source: WarehouseSource, top: int = 10,
+                                       employee_filter: Optional[EmployeeFilter] = None,
+                                       experience_bin: float = EXPERIENCE_BIN_YEARS,
+                                       performance_bin: float = PERFORMANCE_BIN) -> Dict[str, Any]:
+    where, params = (employee_filter or EmployeeFilter()).sql_where()
+    departments, top_performers, cells = await asyncio.gather(
+        source.rows(f"""
+            SELECT department, AVG(performance_score) AS performance, AVG(productivity_score) AS productivity
+            FROM {{employees}} {where} GROUP BY department
+        """, params),
+        source.rows(f"""
+            SELECT name, department, performance_score, productivity_score
+            FROM {{employees}} {where} ORDER BY performance_score DESC, employee_key LIMIT @top
+        """, {**params, "top": top}),
+        # Binned server-side, so the scatter is bounded whatever the headcount
+        source.rows(sql_histogram(where),
+                    {**params, "experience_bin": float(experience_bin), "performance_bin": float(performance_bin)})
+    )
+    return {
+        "department_performance": {row['department']: round(row['performance'], 2) for row in departments},
+        "department_productivity": {row['department']: round(row['productivity'], 2) for row in departments},
+        "top_performers": top_performers,
+        "experience_correlation": experience_histogram(cells, experience_bin, performance_bin)
+    }
+
+
+async def warehouse_skill_gap_analysis(source: WarehouseSource) -> Dict[str, Any]:
+    gaps = await source.rows("""
+        SELECT department, skill, gap_level, current_proficiency, required_proficiency,
+               affected_employees, training_recommendations
+        FROM {skill_gaps} ORDER BY department, skill
+    """)
+    by_department = {}
+    critical_gaps = []
+    for gap in gaps:
+        gap_percentage = round((gap['required_proficiency'] - gap['current_proficiency']) * 100, 1)
+        by_department.setdefault(gap['department'], []).append({
+            "skill": gap['skill'],
+            "gap_level": gap['gap_level'],
+            "current_proficiency": gap['current_proficiency'],
+            "required_proficiency": gap['required_proficiency'],
+            "gap_percentage": gap_percentage,
+            "affected_employees": gap['affected_employees'],
+            "training_recommendations": gap['training_recommendations']
+        })
+        if gap['gap_level'] == 'critical':
+            critical_gaps.append({
+                "department": gap['department'],
+                "skill": gap['skill'],
+                "affected_employees": gap['affected_employees'],
+                "gap_percentage": gap_percentage
+            })
+    return {
+        "by_department": by_department,
+        "critical_gaps": sorted(critical_gaps, key=lambda x: x['gap_percentage'], reverse=True),
+        "summary": {
+            "total_gaps": len(gaps),
+            "critical_gaps_count": len(critical_gaps),
+            "departments_affected": len(by_department)
+        }
+    }
+
+
+async def warehouse_project_forecasting(source: WarehouseSource, risk_threshold: float = 0.6) -> Dict[str, Any]:
+    bands, statuses, departments, risk_projects = await asyncio.gather(
+        source.rows("""
+            SELECT CASE WHEN success_probability >= 0.8 THEN 'high'
+                        WHEN success_probability >= 0.6 THEN 'medium'
+                        ELSE 'low' END AS band,
+                   COUNT(*) AS count
+            FROM {projects} GROUP BY band
+        """),
+        source.rows("SELECT status, COUNT(*) AS count FROM {projects} GROUP BY status"),
+        source.rows("""
+            SELECT e.department, AVG(p.success_probability) AS success
+            FROM {projects} AS p JOIN {employees} AS e ON p.lead_key = e.employee_key
+            GROUP BY e.department
+        """),
+        source.rows("""
+            SELECT name, success_probability, status, team_size
+            FROM {projects} WHERE success_probability < @threshold
+            ORDER BY success_probability, name
+        """, {"threshold": risk_threshold})
+    )
+    band_counts = {row['band']: row['count'] for row in bands}
+    status_distribution = {row['status']: row['count'] for row in statuses}
+    return {
+        "project_count": sum(status_distribution.values()),
+        "success_distribution": {band: band_counts.get(band, 0) for band in ("high", "medium", "low")},
+        "status_distribution": status_distribution,
+        "department_success_rates": {row['department']: round(row['success'] * 100, 1) for row in departments},
+        "risk_projects": risk_projects
+    }
@@ -0,0 +1,332 @@
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+import server  # noqa: E402
+from compute_pool import ComputePool, LoopLagMonitor  # noqa: E402
+from sample_data import WorkforceGenerator, iter_documents  # noqa: E402
+from serialization import FastJSONResponse  # noqa: E402
+from query_projections import BATCH_SIZES  # noqa: E402
+from skill_matching import TopMatchReducer, merge_top_matches, prepare_projects  # noqa: E402
+
+# Read-only routes timed by the route benchmark, with representative query
+# parameters for the routes that take them
+BENCHMARK_ROUTES = [
+    "/api/",
+    "/api/dashboard/overview",
+    "/api/dashboard",
+    "/api/analytics/collaboration-network",
+    "/api/analytics/collaboration-network?limit=1000",
+    "/api/analytics/collaboration-network?format=ndjson",
+    "/api/analytics/collaboration-graph?top=10&betweenness_samples=16",
+    "/api/analytics/skill-gaps",
+    "/api/analytics/project-forecasting",
+    "/api/analytics/performance-trends",
+    "/api/analytics/semantic-matching",
+    "/api/analytics/team-assignment?staff_per_skill=2&time_budget=2",
+    "/api/analytics/similar-employees?name=Employee%200&threshold=0.5&limit=20",
+    "/api/analytics/similar-employees?skills=Python&skills=Communication&threshold=0.3",
+]
+
+# Default seeding scales as EMPLOYEES:PROJECTS:COLLABORATIONS
+DEFAULT_SCALES = ["50:8:100", "2000:100:10000", "20000:500:100000"]
+
+
+def use_database(mongo_url=None, db_name="workforce_analytics_benchmark"):
+    """Point the server module at a benchmark database.
+
+    Uses a real mongod when ``mongo_url`` is given, otherwise an in-process
+    mongomock-motor stand-in so the benchmark runs without any services.
+    """
+    if mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        bench_client = AsyncIOMotorClient(mongo_url)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        bench_client = AsyncMongoMockClient()
+    server.db = bench_client[db_name]
+    return server.db
+
+
+async def seed_database(employee_count, project_count, collaboration_count=0, seed=42):
+    """Reset the benchmark database through /api/initialize-data with a seeded generator"""
+    await server.initialize_sample_data(employees=employee_count, projects=project_count,
+                                        collaborations=collaboration_count, seed=seed)
+
+
+async def time_handler(handler, repeat):
+    """Run an API handler ``repeat`` times and return per-call latencies in ms.
+
+    The response cache is cleared before each call so every call is a miss.
+    """
+    latencies = []
+    for _ in range(repeat):
+        server.response_cache.invalidate()
+        start = time.perf_counter()
+        await handler()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def benchmark_project_forecasting(project_counts, repeat):
+    """Latency of /api/analytics/project-forecasting as the project count grows"""
+    print("\n🔮 Project Forecasting latency vs. project count")
+    print(f"   {'projects':>10} {'median ms':>12} {'min ms':>10}")
+    for count in project_counts:
+        await seed_database(500, count)
+        latencies = await time_handler(server.get_project_forecasting, repeat)
+        print(f"   {count:>10} {np.median(latencies):>12.1f} {min(latencies):>10.1f}")
+
+
+def employee_batches(employee_count, project_count, seed=42):
+    """Synthetic employees in the batches the semantic-matching panel reads, plus the projects"""
+    generator = WorkforceGenerator(employees=employee_count, projects=project_count, seed=seed)
+    employees = list(iter_documents(generator.employees()))
+    size = BATCH_SIZES["employees"]
+    return [employees[start:start + size] for start in range(0, len(employees), size)], \
+        list(iter_documents(generator.projects()))
+
+
+def match_inline(batches, projects, top_k=5):
+    """The semantic-matching panel's streaming reduction, run on the calling thread"""
+    reducer = TopMatchReducer(prepare_projects(projects), top_k)
+    for batch in batches:
+        reducer.update(merge_top_matches(*reducer.merge_args(batch)))
+    return reducer.recommendations()
+
+
+async def match_in_pool(pool, batches, projects, top_k=5):
+    """The same reduction with every merge sent to the compute pool, as the panel does"""
+    reducer = TopMatchReducer(prepare_projects(projects), top_k)
+    for batch in batches:
+        reducer.update(await pool.run(merge_top_matches, *reducer.merge_args(batch)))
+    return reducer.recommendations()
+
+
+def benchmark_semantic_matching(employee_count, project_count, repeat, seed=42):
+    """Time the streaming skill-matching reduction on synthetic in-memory data"""
+    print(f"\n🧠 Semantic skill matching: {employee_count} employees x {project_count} projects")
+    batches, projects = employee_batches(employee_count, project_count, seed)
+
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        match_inline(batches, projects)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"   {len(batches)} batches of up to {BATCH_SIZES['employees']} employees")
+    print(f"   median {np.median(latencies):.1f} ms, min {min(latencies):.1f} ms")
+
+
+async def benchmark_loop_lag(employee_count, project_count, concurrency, workers, seed=42):
+    """Event-loop lag while ranking skill matches inline on the loop vs. in the compute pool"""
+    print(f"\n⏱️  Event-loop lag: {concurrency} concurrent matchings of "
+          f"{employee_count} employees x {project_count} projects")
+    batches, projects = employee_batches(employee_count, project_count, seed)
+
+    async def inline():
+        return match_inline(batches, projects)
+
+    pool = ComputePool(max_workers=workers)
+    await match_in_pool(pool, batches[:1], projects)  # start the workers before measuring
+    monitor = LoopLagMonitor(interval_seconds=0.01)
+    monitor.start()
+    print(f"   {'mode':>8} {'wall ms':>10} {'mean lag ms':>12} {'p99 lag ms':>11} {'max lag ms':>11}")
+    try:
+        for mode, task in (("inline", inline), ("pool", lambda: match_in_pool(pool, batches, projects))):
+            await asyncio.sleep(0.05)
+            monitor.reset()
+            start = time.perf_counter()
+            await asyncio.gather(*(task() for _ in range(concurrency)))
+            await asyncio.sleep(0.05)
+            stats = monitor.stats()
+            print(f"   {mode:>8} {(time.perf_counter() - start) * 1000:>10.1f} {stats['mean_lag_ms']:>12.2f} "
+                  f"{stats['p99_lag_ms']:>11.2f} {stats['max_lag_ms']:>11.2f}")
+    finally:
+        monitor.stop()
+        pool.shutdown()
+
+
+def benchmark_serialization(node_count, edge_count, repeat, seed=42):
+    """Render cost of the collaboration-network payload: jsonable_encoder + stdlib json vs. orjson"""
+    print(f"\n📦 Serialization: collaboration network with {node_count} nodes, {edge_count} edges")
+    generator = WorkforceGenerator(employees=node_count, collaborations=edge_count, seed=seed)
+    payload = {
+        "nodes": [server.network_node(emp) for emp in iter_documents(generator.employees())],
+        "edges": [server.network_edge(edge) for edge in iter_documents(generator.collaborations())]
+    }
+    renderers = {
+        "jsonable_encoder + json": lambda: JSONResponse(jsonable_encoder(payload)).body,
+        "orjson": lambda: FastJSONResponse(payload).body,
+    }
+    print(f"   {'renderer':>24} {'median ms':>10} {'min ms':>10} {'MB':>8}")
+    for name, render in renderers.items():
+        latencies = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = render()
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"   {name:>24} {np.median(latencies):>10.1f} {min(latencies):>10.1f} {len(body) / 1e6:>8.1f}")
+
+
+def peak_rss_mb():
+    """High-water mark of this process's resident set size, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies, elapsed):
+    """Latency percentiles in ms and throughput for one route"""
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "mean_ms": round(float(np.mean(latencies)), 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0
+    }
+
+
+async def benchmark_routes(scales, requests_per_route, warm_cache=False):
+    """Seed at each scale, then time every read-only /api route through the ASGI app"""
+    results = []
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as http:
+        for scale in scales:
+            employee_count, project_count, collaboration_count = (int(part) for part in scale.split(":"))
+            print(f"\n🚀 Routes at {employee_count} employees / {project_count} projects / "
+                  f"{collaboration_count} collaborations")
+
+            start = time.perf_counter()
+            response = await http.post("/api/initialize-data", params={
+                "employees": employee_count, "projects": project_count,
+                "collaborations": collaboration_count, "seed": 42
+            })
+            response.raise_for_status()
+            results.append({
+                "scale": scale, "route": "POST /api/initialize-data",
+                **summarize([(time.perf_counter() - start) * 1000], time.perf_counter() - start),
+                "errors": 0, "peak_rss_mb": peak_rss_mb()
+            })
+
+            print(f"   {'route':<75} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'RSS MB':>8}")
+            for route in BENCHMARK_ROUTES:
+                latencies = []
+                errors = 0
+                route_start = time.perf_counter()
+                for _ in range(requests_per_route):
+                    if not warm_cache:
+                        server.response_cache.invalidate()
+                    start = time.perf_counter()
+                    response = await http.get(route)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    errors += response.status_code != 200
+                result = {
+                    "scale": scale, "route": f"GET {route}",
+                    **summarize(latencies, time.perf_counter() - route_start),
+                    "errors": errors, "peak_rss_mb": peak_rss_mb()
+                }
+                results.append(result)
+                print(f"   {route:<75} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+                      f"{result['p99_ms']:>9.1f} {result['throughput_rps']:>8.1f} {result['peak_rss_mb']:>8.1f}")
+    return results
+
+
+def compare_results(baseline_path, results, tolerance):
+    """Report routes whose p95 regressed by more than ``tolerance`` against a saved run"""
+    with open(baseline_path) as f:
+        baseline = {(r["scale"], r["route"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["scale"], result["route"]))
+        if previous is None:
+            continue
+        # Ignore sub-millisecond noise on very fast routes
+        if result["p95_ms"] > previous["p95_ms"] * (1 + tolerance) and result["p95_ms"] - previous["p95_ms"] > 1:
+            regressions.append((result, previous))
+
+    print(f"\n📊 Compared with {baseline_path} (tolerance {tolerance:.0%})")
+    for result, previous in regressions:
+        print(f"   ❌ [{result['scale']}] {result['route']}: p95 {previous['p95_ms']} ms -> {result['p95_ms']} ms")
+    if not regressions:
+        print("   ✅ No p95 regressions")
+    return not regressions
+
+
+def main():
+    """Main benchmark execution"""
+    parser = argparse.ArgumentParser(description="Benchmark Workforce Analytics API handlers")
+    parser.add_argument("--mongo-url", help="Benchmark against a real MongoDB instead of mongomock")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed calls per measurement")
+    parser.add_argument("--project-counts", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Project counts for the forecasting benchmark")
+    parser.add_argument("--matching-size", type=int, nargs=2, default=[100_000, 5_000],
+                        metavar=("EMPLOYEES", "PROJECTS"), help="Scale of the skill-matching benchmark")
+    parser.add_argument("--serialization-size", type=int, nargs=2, default=[100_000, 200_000],
+                        metavar=("NODES", "EDGES"), help="Scale of the serialization benchmark")
+    parser.add_argument("--lag-concurrency", type=int, default=8,
+                        help="Concurrent matchings for the event-loop lag benchmark")
+    parser.add_argument("--workers", type=int, default=2, help="Compute pool workers for the lag benchmark")
+    parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES,
+                        help="Route benchmark scales as EMPLOYEES:PROJECTS:COLLABORATIONS")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per route per scale")
+    parser.add_argument("--warm-cache", action="store_true",
+                        help="Keep the response cache between requests instead of measuring cold calls")
+    parser.add_argument("--output", help="Write route results as JSON to this path")
+    parser.add_argument("--compare", help="Previous --output file to check for p95 regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown for --compare")
+    parser.add_argument("--benchmarks", nargs="+", choices=["routes", "forecasting", "matching", "lag", "serialization"],
+                        default=["routes", "forecasting", "matching"], help="Benchmarks to run")
+    args = parser.parse_args()
+
+    async def run():
+        use_database(args.mongo_url)
+        results = []
+        if "routes" in args.benchmarks:
+            results = await benchmark_routes(args.scales, args.requests, args.warm_cache)
+        if "forecasting" in args.benchmarks:
+            await benchmark_project_forecasting(args.project_counts, args.repeat)
+        if "lag" in args.benchmarks:
+            await benchmark_loop_lag(*args.matching_size, args.lag_concurrency, args.workers)
+        return results
+
+    results = asyncio.run(run())
+    if "matching" in args.benchmarks:
+        benchmark_semantic_matching(*args.matching_size, args.repeat)
+    if "serialization" in args.benchmarks:
+        benchmark_serialization(*args.serialization_size, args.repeat)
+
+    if args.output and results:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "database": "mongodb" if args.mongo_url else "mongomock",
+                    "requests_per_route": args.requests,
+                    "warm_cache": args.warm_cache
+                },
+                "results": results
+            }, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+    if args.compare and results:
+        return 0 if compare_results(args.compare, results, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,16 @@
 import requests
 import sys
 import json
+import time
+import random
+import argparse
+import asyncio
+import bisect
 from datetime import datetime
 
+import httpx
+import numpy as np
+
 class WorkforceAnalyticsAPITester:
     def __init__(self, base_url="https://teamiq-analytics.preview.emergentagent.com"):
         self.base_url = base_url
@@ -118,6 +126,27 @@ class WorkforceAnalyticsAPITester:
         
         return success
 
+    def test_composite_dashboard(self):
+        """Test the composite dashboard endpoint returning every panel in one request"""
+        print("\n🧮 Testing Composite Dashboard...")
+        success, response = self.test_api_endpoint('GET', 'dashboard', 200, test_name="Composite Dashboard")
+        
+        if success:
+            expected_panels = ['overview', 'collaboration_network', 'skill_gaps', 'project_forecasting',
+                               'performance_trends', 'semantic_matching']
+            missing = [panel for panel in expected_panels if panel not in response.get('panels', {})]
+            print(f"   🧱 Panels: {len(response.get('panels', {}))}")
+            print(f"   📥 Shared Loads: {len(response.get('loads', []))}")
+            if missing or response.get('errors'):
+                self.log_test("Composite Dashboard Panels", False,
+                              f"Missing: {missing}, errors: {response.get('errors')}")
+            else:
+                self.log_test("Composite Dashboard Panels", True, f"{len(expected_panels)} panels in one round-trip")
+            
+            self.test_api_endpoint('GET', 'dashboard?panels=unknown', 422, test_name="Composite Dashboard Unknown Panel")
+        
+        return success
+
     def test_collaboration_network(self):
         """Test collaboration network endpoint"""
         print("\n🌐 Testing Collaboration Network...")
@@ -216,8 +245,21 @@ class WorkforceAnalyticsAPITester:
                 print(f"   🏆 Top Performers: {top_performers_count}")
                 print(f"   🏢 Departments Analyzed: {departments_count}")
                 print(f"   💡 Performance Insights: {insights_count}")
-                
+                print(f"   📊 Experience Histogram Cells: {len(response['experience_correlation']['cells'])}")
+
                 self.log_test("Performance Structure Validation", True, f"Analysis complete for {departments_count} departments")
+
+                # Filters and the top-K limit are applied server-side
+                filtered_success, filtered = self.test_api_endpoint(
+                    'GET', 'analytics/performance-trends?department=Engineering&min_performance=0.8&limit=3', 200,
+                    test_name="Filtered Performance Trends"
+                )
+                if filtered_success:
+                    valid = (len(filtered['top_performers']) <= 3 and
+                             all(emp['department'] == 'Engineering' and emp['performance_score'] >= 0.8
+                                 for emp in filtered['top_performers']))
+                    self.log_test("Performance Filter Validation", valid,
+                                  f"{filtered['experience_correlation']['employees']} employees matched")
                 return True
             else:
                 self.log_test("Performance Response Validation", False, "Missing response keys")
@@ -248,6 +290,52 @@ class WorkforceAnalyticsAPITester:
         
         return success
 
+    def test_team_assignment(self):
+        """Test global team assignment endpoint"""
+        print("\n👥 Testing Team Assignment...")
+        success, response = self.test_api_endpoint('GET', 'analytics/team-assignment?staff_per_skill=1', 200,
+                                                    test_name="Team Assignment")
+        
+        if success:
+            required_keys = ['teams', 'summary', 'solver']
+            if all(key in response for key in required_keys):
+                members = [member['name'] for team in response['teams'] for member in team['team']]
+                summary = response['summary']
+                
+                print(f"   🧩 Slots Filled: {summary['slots_filled']}/{summary['slots']}")
+                print(f"   ✅ Fully Staffed Projects: {summary['fully_staffed_projects']}/{summary['projects']}")
+                
+                # Each employee joins at most one project
+                self.log_test("Team Assignment Uniqueness", len(members) == len(set(members)),
+                              f"{len(members)} employees assigned")
+                return True
+            else:
+                self.log_test("Team Assignment Response Validation", False, "Missing response keys")
+        
+        return success
+
+    def test_projection_audit(self):
+        """Check that no endpoint fetches fields it never reads (needs PROJECTION_AUDIT=1 on the server)"""
+        print("\n🔎 Testing Query Projections...")
+        success, response = self.test_api_endpoint('GET', 'projections', 200, test_name="Projection Report")
+        
+        if success:
+            if not response.get('audit_enabled'):
+                print("   ⚠️  Projection audit disabled on the server; start it with PROJECTION_AUDIT=1 to check")
+                return True
+            over_fetched = [
+                f"{endpoint}.{collection}: {', '.join(stats['unused'])}"
+                for endpoint, collections in response['endpoints'].items()
+                for collection, stats in collections.items()
+                if stats['unused']
+            ]
+            if over_fetched:
+                self.log_test("No Over-fetching", False, "; ".join(over_fetched))
+            else:
+                self.log_test("No Over-fetching", True, f"{len(response['endpoints'])} endpoints read every projected field")
+        
+        return success
+
     def run_comprehensive_test_suite(self):
         """Run all tests in sequence"""
         print("🚀 Starting Comprehensive Workforce Analytics API Testing")
@@ -258,11 +346,14 @@ class WorkforceAnalyticsAPITester:
             ("Root API", self.test_root_endpoint),
             ("Data Initialization", self.test_initialize_data),
             ("Dashboard Overview", self.test_dashboard_overview),
+            ("Composite Dashboard", self.test_composite_dashboard),
             ("Collaboration Network", self.test_collaboration_network),
             ("Skill Gap Analysis", self.test_skill_gaps),
             ("Project Forecasting", self.test_project_forecasting),
             ("Performance Trends", self.test_performance_trends),
-            ("Semantic Matching", self.test_semantic_matching)
+            ("Semantic Matching", self.test_semantic_matching),
+            ("Team Assignment", self.test_team_assignment),
+            ("Query Projections", self.test_projection_audit)
         ]
         
         for test_name, test_func in test_sequence:
@@ -288,12 +379,127 @@ class WorkforceAnalyticsAPITester:
         
         return self.tests_passed == self.tests_run
 
+# Relative weights of each GET endpoint in the load mix, roughly what one
+# dashboard load issues
+DEFAULT_LOAD_MIX = {
+    "dashboard/overview": 3,
+    "analytics/collaboration-network": 1,
+    "analytics/skill-gaps": 1,
+    "analytics/project-forecasting": 1,
+    "analytics/performance-trends": 1,
+    "analytics/semantic-matching": 1
+}
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+class WorkforceAnalyticsLoadTester:
+    def __init__(self, base_url="http://localhost:8000", concurrency=10, total_requests=500,
+                 mix=None, timeout=30, seed=None):
+        self.base_url = base_url
+        self.api_url = f"{base_url}/api"
+        self.concurrency = concurrency
+        self.total_requests = total_requests
+        self.mix = mix or DEFAULT_LOAD_MIX
+        self.timeout = timeout
+        self.random = random.Random(seed)
+        self.latencies = {endpoint: [] for endpoint in self.mix}
+        self.errors = {endpoint: 0 for endpoint in self.mix}
+
+    def record(self, endpoint, latency_ms, success):
+        """Record one request outcome"""
+        self.latencies[endpoint].append(latency_ms)
+        if not success:
+            self.errors[endpoint] += 1
+
+    def histogram(self, latencies):
+        """Count latencies per LATENCY_BUCKETS_MS bucket"""
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for latency in latencies:
+            counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency)] += 1
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return dict(zip(labels, counts))
+
+    async def worker(self, client, schedule):
+        """Issue requests from the shared schedule until it is exhausted"""
+        while schedule:
+            endpoint = schedule.pop()
+            start = time.perf_counter()
+            try:
+                response = await client.get(f"{self.api_url}/{endpoint}")
+                success = response.status_code == 200
+            except httpx.HTTPError:
+                success = False
+            self.record(endpoint, (time.perf_counter() - start) * 1000, success)
+
+    async def run(self):
+        """Run the load test and return the wall-clock duration in seconds"""
+        endpoints = list(self.mix)
+        schedule = self.random.choices(endpoints, weights=[self.mix[e] for e in endpoints], k=self.total_requests)
+        limits = httpx.Limits(max_connections=self.concurrency)
+        async with httpx.AsyncClient(timeout=self.timeout, limits=limits) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(self.worker(client, schedule) for _ in range(self.concurrency)))
+            return time.perf_counter() - start
+
+    def run_load_test(self):
+        """Run the load test and print per-endpoint latency statistics"""
+        print(f"🔥 Load testing {self.api_url} with {self.concurrency} concurrent clients, "
+              f"{self.total_requests} requests")
+        print("=" * 60)
+        
+        elapsed = asyncio.run(self.run())
+        
+        for endpoint, latencies in self.latencies.items():
+            if not latencies:
+                continue
+            print(f"\n📍 {endpoint}")
+            print(f"   Requests: {len(latencies)}, errors: {self.errors[endpoint]}")
+            print(f"   p50 {np.percentile(latencies, 50):.1f} ms | p95 {np.percentile(latencies, 95):.1f} ms | "
+                  f"p99 {np.percentile(latencies, 99):.1f} ms | max {max(latencies):.1f} ms")
+            for bucket, count in self.histogram(latencies).items():
+                if count:
+                    print(f"   {bucket:>10} {'█' * max(1, round(40 * count / len(latencies)))} {count}")
+        
+        total_errors = sum(self.errors.values())
+        print("\n" + "=" * 60)
+        print("📊 LOAD TEST RESULTS")
+        print("=" * 60)
+        print(f"⏱️ Duration: {elapsed:.2f}s")
+        print(f"🚀 Throughput: {self.total_requests / elapsed:.1f} req/s")
+        print(f"❌ Errors: {total_errors} ({total_errors / self.total_requests * 100:.1f}%)")
+        
+        return total_errors == 0
+
+def parse_mix(entries):
+    """Parse ENDPOINT=WEIGHT pairs into a load mix"""
+    mix = {}
+    for entry in entries:
+        endpoint, _, weight = entry.partition("=")
+        mix[endpoint.strip("/")] = float(weight or 1)
+    return mix
+
 def main():
     """Main test execution"""
-    tester = WorkforceAnalyticsAPITester()
+    parser = argparse.ArgumentParser(description="Workforce Analytics API tests")
+    parser.add_argument("--base-url", default="https://teamiq-analytics.preview.emergentagent.com",
+                        help="Server to test, e.g. http://localhost:8000 for a local uvicorn")
+    parser.add_argument("--load", action="store_true", help="Run the concurrent load test instead of the functional suite")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients for --load")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests for --load")
+    parser.add_argument("--mix", nargs="+", metavar="ENDPOINT=WEIGHT",
+                        help="Request mix for --load, e.g. dashboard/overview=3 analytics/skill-gaps=1")
+    parser.add_argument("--seed", type=int, help="Seed for the request schedule of --load")
+    args = parser.parse_args()
+    
+    if args.load:
+        tester = WorkforceAnalyticsLoadTester(args.base_url, args.concurrency, args.requests,
+                                              parse_mix(args.mix) if args.mix else None, seed=args.seed)
+    else:
+        tester = WorkforceAnalyticsAPITester(args.base_url)
     
     try:
-        success = tester.run_comprehensive_test_suite()
+        success = tester.run_load_test() if args.load else tester.run_comprehensive_test_suite()
         return 0 if success else 1
     except KeyboardInterrupt:
         print("\n⚠️ Testing interrupted by user")
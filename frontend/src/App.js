@@ -640,11 +640,12 @@ const PerformanceTrends = ({ data }) => {
             { range: "8-12 years", min: 8, max: 12 },
             { range: "13+ years", min: 13, max: 20 }
           ].map(({ range, min, max }) => {
-            const groupData = data.experience_correlation.filter(
-              emp => emp.experience >= min && emp.experience <= max
+            const groupCells = data.experience_correlation.cells.filter(
+              cell => cell.experience[0] >= min && cell.experience[0] <= max
             );
-            const avgPerformance = groupData.length > 0 
-              ? groupData.reduce((sum, emp) => sum + emp.performance, 0) / groupData.length
+            const groupCount = groupCells.reduce((sum, cell) => sum + cell.count, 0);
+            const avgPerformance = groupCount > 0
+              ? groupCells.reduce((sum, cell) => sum + cell.avg_performance * cell.count, 0) / groupCount
               : 0;
             
             return (
@@ -658,7 +659,7 @@ const PerformanceTrends = ({ data }) => {
                 </p>
                 <p className="text-sm text-gray-600 mt-2 flex items-center justify-center">
                   <Users className="w-4 h-4 mr-1 text-violet-400" />
-                  {groupData.length} employees
+                  {groupCount} employees
                 </p>
               </div>
             );
@@ -843,22 +844,17 @@ function App() {
       await axios.post(`${API}/initialize-data`);
       setDataInitialized(true);
       
-      // Load all analytics data
-      const [dashboard, collaboration, skillGap, forecasting, performance, semantic] = await Promise.all([
-        axios.get(`${API}/dashboard/overview`),
-        axios.get(`${API}/analytics/collaboration-network`),
-        axios.get(`${API}/analytics/skill-gaps`),
-        axios.get(`${API}/analytics/project-forecasting`),
-        axios.get(`${API}/analytics/performance-trends`),
-        axios.get(`${API}/analytics/semantic-matching`)
-      ]);
+      // Load all analytics panels in one round-trip
+      const response = await axios.get(`${API}/dashboard`);
+      const { panels, errors } = response.data;
+      Object.entries(errors).forEach(([panel, detail]) => console.error(`Error loading ${panel}:`, detail));
 
-      setDashboardData(dashboard.data);
-      setCollaborationData(collaboration.data);
-      setSkillGapData(skillGap.data);
-      setForecastingData(forecasting.data);
-      setPerformanceData(performance.data);
-      setSemanticData(semantic.data);
+      setDashboardData(panels.overview);
+      setCollaborationData(panels.collaboration_network);
+      setSkillGapData(panels.skill_gaps);
+      setForecastingData(panels.project_forecasting);
+      setPerformanceData(panels.performance_trends);
+      setSemanticData(panels.semantic_matching);
     } catch (error) {
       console.error("Error initializing data:", error);
     } finally {
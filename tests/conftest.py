@@ -0,0 +1,47 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    """The server module backed by an in-memory Mongo, with compute in threads
+    and snapshots under a temporary directory"""
+    from mongomock_motor import AsyncMongoMockClient
+
+    import server
+    from columnar_snapshot import SnapshotStore
+    from compute_pool import ComputePool
+    from skill_similarity import SkillSimilarityIndex
+
+    monkeypatch.setattr(server, 'db', AsyncMongoMockClient()['test_database'])
+    monkeypatch.setattr(server, 'compute_pool', ComputePool(max_workers=0))
+    monkeypatch.setattr(server, 'skill_index', SkillSimilarityIndex())
+    monkeypatch.setattr(server, 'snapshot_store', SnapshotStore(str(tmp_path / 'snapshots')))
+    monkeypatch.setattr(server, 'graph_cache', {"fingerprint": None, "graph": None, "results": {}})
+    server.response_cache.invalidate()
+    yield server
+    server.response_cache.invalidate()
+
+
+@pytest.fixture
+async def client(server):
+    """HTTP client for the API, without running the app's startup"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        yield client
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+
+from analytics_views import VIEWS_COLLECTION, META_ID, rebuild_views
+from sample_data import WorkforceGenerator, iter_documents
+
+pytestmark = pytest.mark.anyio
+
+COUNTERS = ("count", "performance_sum", "productivity_sum", "success_sum",
+            "gap_sum", "critical_count", "affected_employees", "gap_percentage")
+
+
+async def view_counters(db):
+    """Counters of every view document, dropping keys whose count fell to zero"""
+    counters = {}
+    async for row in db[VIEWS_COLLECTION].find({"_id": {"$ne": META_ID}}):
+        values = {name: row[name] for name in COUNTERS if name in row}
+        if values.get("count", 1) != 0:
+            counters[row["_id"]] = values
+    return counters
+
+
+async def assert_views_match_rebuild(db):
+    maintained = await view_counters(db)
+    await rebuild_views(db)
+    recomputed = await view_counters(db)
+    assert maintained.keys() == recomputed.keys()
+    for key, values in recomputed.items():
+        # A counter moved back to zero equals one never incremented
+        names = maintained[key].keys() | values.keys()
+        assert {name: maintained[key].get(name, 0) for name in names} == \
+            pytest.approx({name: values.get(name, 0) for name in names}), key
+
+
+def ndjson(documents):
+    return "".join(json.dumps(doc, default=str) + "\n" for doc in documents)
+
+
+def generated(collection, seed, **counts):
+    generator = WorkforceGenerator(seed=seed, **counts)
+    return list(iter_documents(getattr(generator, collection)()))
+
+
+async def ingest(client, collection, documents, chunk_size=7):
+    response = await client.post(f"/api/ingest/{collection}", params={"chunk_size": chunk_size},
+                                 content=ndjson(documents))
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def test_department_and_project_views_follow_inserts(server, client):
+    response = await client.post("/api/initialize-data", params={"employees": 60, "projects": 10, "seed": 8})
+    assert response.status_code == 200
+
+    employees = generated("employees", 9, employees=25, projects=0, collaborations=0)
+    for index, emp in enumerate(employees):
+        emp.pop("employee_key")
+        emp["name"] = f"Hire {index}"
+    await ingest(client, "employees", employees)
+
+    # New projects staff existing employees and the new hires
+    projects = generated("projects", 10, employees=60, projects=12, collaborations=0)
+    for index, project in enumerate(projects):
+        project.pop("team_member_keys")
+        project["name"] = f"Initiative {index}"
+        project["team_members"] = project["team_members"][:2] + [f"Hire {index}", f"Hire {index + 5}"]
+    await ingest(client, "projects", projects)
+
+    overview = (await client.get("/api/dashboard/overview")).json()
+    assert overview["metrics"]["total_employees"] == 85
+    assert overview["metrics"]["total_projects"] == 22
+    await assert_views_match_rebuild(server.db)
+
+
+async def test_skill_gap_rollups_follow_inserts_and_updates(server, client):
+    response = await client.post("/api/initialize-data", params={"employees": 40, "projects": 5, "seed": 12})
+    assert response.status_code == 200
+    gaps = generated("skill_gaps", 13, employees=40, projects=5, collaborations=0)
+    await ingest(client, "skill_gaps", gaps)
+
+    # Move gaps across levels and departments, including into and out of critical
+    stored = await server.db.skill_gaps.find({}, {"_id": 0}).to_list(length=None)
+    levels = ["critical", "moderate", "low"]
+    for index, gap in enumerate(stored[::3]):
+        updated = {**gap, "gap_level": levels[index % 3], "department": "Operations",
+                   "current_proficiency": round(gap["current_proficiency"] / 2, 2)}
+        response = await client.put(f"/api/skill-gaps/{gap['id']}", content=json.dumps(updated, default=str))
+        assert response.status_code == 200, response.text
+    assert (await client.put("/api/skill-gaps/missing", content=json.dumps(updated, default=str))).status_code == 404
+
+    analysis = (await client.get("/api/analytics/skill-gaps")).json()
+    critical = [gap for gap in await server.db.skill_gaps.find().to_list(length=None) if gap["gap_level"] == "critical"]
+    assert analysis["summary"]["total_gaps"] == await server.db.skill_gaps.count_documents({})
+    assert analysis["summary"]["critical_gaps_count"] == len(critical)
+    assert sorted(gap["gap_percentage"] for gap in analysis["critical_gaps"]) == sorted(
+        round((gap["required_proficiency"] - gap["current_proficiency"]) * 100, 1) for gap in critical
+    )
+    await assert_views_match_rebuild(server.db)
+
+
+async def test_projects_ingested_before_their_team_are_attributed(server, client):
+    response = await client.post("/api/initialize-data", params={"employees": 30, "projects": 0, "seed": 3})
+    assert response.status_code == 200
+    [existing] = await server.db.employees.find({"name": "Employee 4"}).to_list(length=None)
+
+    project = generated("projects", 4, employees=30, projects=1, collaborations=0)[0]
+    project.pop("team_member_keys")
+    await ingest(client, "projects", [
+        {**project, "name": "Late team", "team_members": ["Late Hire 0", "Late Hire 1"], "success_probability": 0.5},
+        {**project, "name": "Mixed team", "team_members": ["Late Hire 1", existing["name"]],
+         "success_probability": 0.9},
+    ])
+    assert (await client.get("/api/analytics/project-forecasting")).json()["department_success_rates"] == {
+        existing["department"]: 90.0
+    }
+
+    hires = generated("employees", 5, employees=2, projects=0, collaborations=0)
+    for index, emp in enumerate(hires):
+        emp.pop("employee_key")
+        emp.update(name=f"Late Hire {index}", department="Research")
+    await ingest(client, "employees", hires)
+
+    keys = {emp["name"]: emp["employee_key"] for emp in await server.db.employees.find().to_list(length=None)}
+    projects = await server.db.projects.find().to_list(length=None)
+    teams = {project["name"]: project["team_member_keys"] for project in projects}
+    assert teams == {
+        "Late team": [keys["Late Hire 0"], keys["Late Hire 1"]],
+        "Mixed team": [keys["Late Hire 1"], keys[existing["name"]]],
+    }
+    # The late team now counts for its hires' department; the mixed team
+    # keeps its earliest member's
+    rates = (await client.get("/api/analytics/project-forecasting")).json()["department_success_rates"]
+    assert rates == {existing["department"]: 90.0, "Research": 50.0}
+    await assert_views_match_rebuild(server.db)
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from ingestion import iter_lines
+
+pytestmark = pytest.mark.anyio
+
+ROUTE = "/api/analytics/collaboration-network"
+
+
+async def seeded_network(client):
+    response = await client.post("/api/initialize-data",
+                                 params={"employees": 30, "projects": 0, "collaborations": 45, "seed": 14})
+    assert response.status_code == 200
+    response = await client.get(ROUTE)
+    assert response.status_code == 200
+    network = response.json()
+    assert (len(network["nodes"]), len(network["edges"])) == (30, 45)
+    return network
+
+
+# 30 nodes: pages end mid-nodes, exactly on the last node and mid-edges
+@pytest.mark.parametrize("limit", [1, 7, 10, 30, 100])
+async def test_pages_reassemble_the_network(server, client, limit):
+    network = await seeded_network(client)
+    nodes, edges, cursor = [], [], None
+    for _ in range(200):
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(ROUTE, params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["nodes"]) + len(page["edges"]) <= limit
+        nodes += page["nodes"]
+        edges += page["edges"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert {"nodes": nodes, "edges": edges} == network
+
+
+async def test_invalid_cursor_is_rejected(server, client):
+    response = await client.get(ROUTE, params={"limit": 5, "cursor": "edges:not-an-id"})
+    assert response.status_code == 400
+
+
+async def test_ndjson_stream_matches_the_json_body(server, client):
+    network = await seeded_network(client)
+    async with client.stream("GET", ROUTE, params={"format": "ndjson"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        # Reassemble lines whatever the transport chunking
+        records = [json.loads(line) async for line in iter_lines(response.aiter_raw()) if line]
+    assert [record.pop("type") for record in records] == ["node"] * 30 + ["edge"] * 45
+    assert {"nodes": records[:30], "edges": records[30:]} == network
@@ -0,0 +1,35 @@
+import pytest
+
+from columnar_snapshot import SnapshotStore
+
+from .test_employee_queries import assert_close
+from .test_warehouse import ANALYTICS, analytics
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("file_format", ["arrow", "parquet"])
+async def test_snapshot_round_trip_matches_mongo(server, client, monkeypatch, tmp_path, file_format):
+    response = await client.post("/api/initialize-data", params={"employees": 150, "projects": 30, "seed": 11})
+    assert response.status_code == 200
+    mongo = await analytics(client, server)
+
+    store = SnapshotStore(str(tmp_path / file_format), file_format=file_format)
+    monkeypatch.setattr(server, "snapshot_store", store)
+    manifest = await store.export(server.db)
+    assert manifest["rows"]["employees"] == 150
+    monkeypatch.setattr(server, "ANALYTICS_SOURCE", "snapshot")
+    snapshot = await analytics(client, server)
+    assert (await store.load()).version == manifest["version"]
+
+    for path in ANALYTICS:
+        assert_close(snapshot[path], mongo[path], path)
+
+    # Filters and the top-performer limit run on the Arrow table
+    params = {"department": "Finance", "min_performance": 0.7, "limit": 3}
+    server.response_cache.invalidate()
+    filtered = (await client.get("/api/analytics/performance-trends", params=params)).json()
+    monkeypatch.setattr(server, "ANALYTICS_SOURCE", "mongo")
+    server.response_cache.invalidate()
+    assert_close(filtered, (await client.get("/api/analytics/performance-trends", params=params)).json())
+    assert len(filtered["top_performers"]) == 3
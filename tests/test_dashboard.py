@@ -0,0 +1,41 @@
+from collections import Counter
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+# Each dashboard panel and the endpoint serving it on its own
+PANEL_ENDPOINTS = {
+    "overview": "/api/dashboard/overview",
+    "collaboration_network": "/api/analytics/collaboration-network",
+    "skill_gaps": "/api/analytics/skill-gaps",
+    "project_forecasting": "/api/analytics/project-forecasting",
+    "performance_trends": "/api/analytics/performance-trends",
+    "semantic_matching": "/api/analytics/semantic-matching",
+    "team_assignment": "/api/analytics/team-assignment",
+}
+
+
+def without_timestamp(body):
+    # Bodies stamp the time they were computed
+    return {key: value for key, value in body.items() if key != "timestamp"}
+
+
+async def test_dashboard_panels_match_their_endpoints(server, client):
+    response = await client.post("/api/initialize-data",
+                                 params={"employees": 80, "projects": 12, "collaborations": 150, "seed": 24})
+    assert response.status_code == 200
+    assert set(PANEL_ENDPOINTS) == set(server.DASHBOARD_PANELS)
+
+    response = await client.get("/api/dashboard", params={"panels": ",".join(PANEL_ENDPOINTS)})
+    assert response.status_code == 200
+    dashboard = response.json()
+    assert dashboard["errors"] == {}
+
+    for name, endpoint in PANEL_ENDPOINTS.items():
+        standalone = await client.get(endpoint)
+        assert standalone.status_code == 200
+        assert without_timestamp(dashboard["panels"][name]) == without_timestamp(standalone.json()), name
+
+    scans = Counter(load.split(":", 1)[1] for load in dashboard["loads"] if load.startswith("scan:"))
+    assert scans == {"employees": 1, "projects": 1, "collaboration_networks": 1}
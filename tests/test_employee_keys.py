@@ -0,0 +1,74 @@
+import pytest
+
+from employee_keys import attach_edge_keys, attach_team_member_keys, migrate_employee_keys, resolve_employee_keys
+
+from .test_analytics_views import generated, ingest
+
+pytestmark = pytest.mark.anyio
+
+
+def unkeyed(documents, *fields):
+    for doc in documents:
+        for field in fields:
+            doc.pop(field, None)
+    return documents
+
+
+async def test_edges_ingested_before_their_employees_are_keyed(server, client):
+    employees = unkeyed(generated("employees", 21, employees=20, projects=0, collaborations=0), "employee_key")
+    edges = unkeyed(generated("collaborations", 21, employees=20, projects=0, collaborations=30),
+                    "employee_a_key", "employee_b_key")
+
+    await ingest(client, "collaboration_networks", edges)
+    assert (await client.get("/api/analytics/collaboration-graph")).json()["summary"]["edges"] == 0
+
+    await ingest(client, "employees", employees)
+    keys = {emp["name"]: emp["employee_key"] for emp in await server.db.employees.find().to_list(length=None)}
+    async for edge in server.db.collaboration_networks.find():
+        assert (edge["employee_a_key"], edge["employee_b_key"]) == \
+            (keys[edge["employee_a"]], keys[edge["employee_b"]])
+    summary = (await client.get("/api/analytics/collaboration-graph")).json()["summary"]
+    assert summary["nodes"] == 20
+    # Repeated pairs merge into one undirected edge
+    assert summary["edges"] == len({frozenset((edge["employee_a"], edge["employee_b"])) for edge in edges})
+
+
+async def test_migration_backfills_null_and_missing_edge_keys(server):
+    employees = generated("employees", 22, employees=10, projects=0, collaborations=0)
+    edges = generated("collaborations", 22, employees=10, projects=0, collaborations=12)
+    await server.db.employees.insert_many(employees)
+    for index, edge in enumerate(edges):
+        if index % 2:
+            edge.update(employee_a_key=None, employee_b_key=None)
+        else:
+            unkeyed([edge], "employee_a_key", "employee_b_key")
+    # An edge naming someone who never arrives stays unresolved without
+    # stalling the migration
+    edges.append({**edges[0], "employee_a": "Nobody"})
+    await server.db.collaboration_networks.insert_many(edges)
+
+    counts = await migrate_employee_keys(server.db)
+    assert counts["collaboration_networks"] == len(edges)
+    keys = {emp["name"]: emp["employee_key"] for emp in employees}
+    async for edge in server.db.collaboration_networks.find():
+        assert (edge["employee_a_key"], edge["employee_b_key"]) == \
+            (keys.get(edge["employee_a"]), keys[edge["employee_b"]])
+
+
+async def test_shared_names_resolve_to_the_lowest_key(server):
+    employees = generated("employees", 23, employees=4, projects=0, collaborations=0)
+    # The later namesake is stored, and so scanned, first
+    employees[2]["name"] = employees[0]["name"]
+    await server.db.employees.insert_many(employees[::-1])
+    name = employees[0]["name"]
+
+    assert await resolve_employee_keys(server.db, [name, employees[1]["name"]]) == {
+        name: employees[0]["employee_key"], employees[1]["name"]: employees[1]["employee_key"]
+    }
+    projects = [{"team_members": [employees[3]["name"], name]}]
+    await attach_team_member_keys(server.db, projects)
+    assert projects[0]["team_member_keys"] == [employees[3]["employee_key"], employees[0]["employee_key"]]
+    edges = [{"employee_a": name, "employee_b": employees[1]["name"]}]
+    await attach_edge_keys(server.db, edges)
+    assert (edges[0]["employee_a_key"], edges[0]["employee_b_key"]) == \
+        (employees[0]["employee_key"], employees[1]["employee_key"])
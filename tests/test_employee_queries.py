@@ -0,0 +1,63 @@
+import pytest
+
+from employee_queries import EmployeeFilter
+from warehouse import DuckDBSource
+
+pytestmark = pytest.mark.anyio
+
+FILTERS = [
+    {},
+    {"department": "Engineering"},
+    {"role": "Senior", "min_performance": 0.75},
+    {"min_performance": 0.65, "max_performance": 0.9, "min_experience": 3, "max_experience": 10},
+    {"department": "Sales", "role": "Lead", "max_experience": 6},
+]
+
+
+async def performance_trends(client, server, params):
+    server.response_cache.invalidate()
+    response = await client.get("/api/analytics/performance-trends", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def assert_close(actual, expected, path="trends"):
+    """Equal structure and strings; numbers may differ in their last rounded
+    digit, as each path sums floats in its own order"""
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_close(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected), path
+        for index, (left, right) in enumerate(zip(actual, expected)):
+            assert_close(left, right, f"{path}[{index}]")
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, abs=0.011), path
+    else:
+        assert actual == expected, path
+
+
+@pytest.mark.parametrize("employee_filter", FILTERS)
+async def test_filters_agree_across_sources(server, client, monkeypatch, employee_filter):
+    response = await client.post("/api/initialize-data", params={"employees": 300, "projects": 5, "seed": 17})
+    assert response.status_code == 200
+    params = {**employee_filter, "limit": 7, "experience_bin": 2.5, "performance_bin": 0.1}
+
+    mongo = await performance_trends(client, server, params)
+    assert mongo["top_performers"] and mongo["experience_correlation"]["cells"]
+
+    await server.snapshot_store.export(server.db)
+    monkeypatch.setattr(server, "ANALYTICS_SOURCE", "snapshot")
+    snapshot = await performance_trends(client, server, params)
+
+    monkeypatch.setattr(server, "ANALYTICS_SOURCE", "warehouse")
+    monkeypatch.setattr(server, "warehouse_source", DuckDBSource())
+    await server.snapshot_exported(await server.snapshot_store.export(server.db))
+    warehouse = await performance_trends(client, server, params)
+
+    assert_close(snapshot, mongo)
+    assert_close(warehouse, mongo)
+    # Every employee the filter matches lands in exactly one cell
+    total = await server.db.employees.count_documents(EmployeeFilter(**employee_filter).mongo_match())
+    assert mongo["experience_correlation"]["employees"] == total
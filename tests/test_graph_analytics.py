@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from graph_analytics import CollaborationGraph, analyze_csr_graph, analyze_graph
+
+from .test_analytics_views import generated, ingest
+
+DAMPING = 0.85
+
+
+def graph(n, edges, weights=None):
+    sources, targets = (np.array(side, dtype=np.int64) for side in zip(*edges)) if edges else \
+        (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    weights = np.ones(len(sources)) if weights is None else np.array(weights, dtype=np.float64)
+    return CollaborationGraph([f"Employee {i}" for i in range(n)], sources, targets, weights)
+
+
+def partition(labels):
+    groups = {}
+    for node, label in enumerate(labels):
+        groups.setdefault(int(label), set()).add(node)
+    return sorted(map(frozenset, groups.values()), key=min)
+
+
+def test_path():
+    path = graph(3, [(0, 1), (1, 2)])
+    assert path.edge_count == 2
+    np.testing.assert_allclose(path.weighted_degree(), [1, 2, 1])
+    # By symmetry r0 = r2 and r1 = 1 - 2 r0, which solves to
+    # r0 = (1 + d/2) / (3 (1 + d))
+    end = (1 + DAMPING / 2) / (3 * (1 + DAMPING))
+    np.testing.assert_allclose(path.pagerank(damping=DAMPING), [end, 1 - 2 * end, end], atol=1e-7)
+    # Sampling every node is exact: the middle lies on the only path
+    np.testing.assert_allclose(path.betweenness(samples=3), [0, 1, 0])
+    assert partition(path.connected_components()) == [{0, 1, 2}]
+
+
+def test_star():
+    star = graph(5, [(0, leaf) for leaf in range(1, 5)])
+    n = star.node_count
+    # The hub receives every leaf's full rank: c = (1-d)/n + d (1 - c)
+    hub = ((1 - DAMPING) / n + DAMPING) / (1 + DAMPING)
+    np.testing.assert_allclose(star.pagerank(damping=DAMPING), [hub] + [(1 - hub) / 4] * 4, atol=1e-7)
+    np.testing.assert_allclose(star.betweenness(samples=5), [1, 0, 0, 0, 0])
+    assert partition(star.communities()) == [set(range(5))]
+
+
+def test_two_components_and_an_isolated_node():
+    # A triangle, a pair joined by two parallel edges and node 5 alone
+    split = graph(6, [(0, 1), (1, 2), (2, 0), (3, 4), (4, 3), (5, 5)], [1, 1, 1, 2, 3, 9])
+    assert split.edge_count == 4
+    np.testing.assert_allclose(split.weighted_degree(), [2, 2, 2, 5, 5, 0])
+    assert split.connected_components().tolist() == [0, 0, 0, 3, 3, 5]
+    assert partition(split.communities()) == [{0, 1, 2}, {3, 4}, {5}]
+    rank = split.pagerank()
+    assert rank.sum() == pytest.approx(1)
+    np.testing.assert_allclose(rank[:3], rank[0])
+    # No shortest path runs through any node
+    np.testing.assert_allclose(split.betweenness(samples=6), 0)
+
+    summary = analyze_graph(split)["summary"]
+    assert summary == {"nodes": 6, "edges": 4, "components": 3, "largest_component": 3,
+                       "communities": 3, "betweenness_samples": 6}
+
+
+def test_csr_arrays_reproduce_the_analysis():
+    rng = np.random.default_rng(3)
+    built = graph(40, list(zip(rng.integers(0, 40, 120), rng.integers(0, 40, 120))), rng.random(120))
+    assert analyze_csr_graph(built.names, built.indptr, built.indices, built.weights, 5, 8) == \
+        analyze_graph(built, 5, 8)
+
+
+@pytest.mark.anyio
+async def test_new_edge_invalidates_the_cached_graph(server, client):
+    response = await client.post("/api/initialize-data",
+                                 params={"employees": 30, "projects": 0, "collaborations": 40, "seed": 6})
+    assert response.status_code == 200
+    # Two fresh hires who cannot already be connected
+    hires = generated("employees", 7, employees=2, projects=0, collaborations=0)
+    for hire, name in zip(hires, ("New Hire A", "New Hire B")):
+        hire.pop("employee_key")
+        hire["name"] = name
+    await ingest(client, "employees", hires)
+    before = (await client.get("/api/analytics/collaboration-graph")).json()["summary"]
+    cached = server.graph_cache["graph"]
+
+    edge = await server.db.collaboration_networks.find_one({}, projection={"_id": 0, "id": 0})
+    for key in ("employee_a_key", "employee_b_key"):
+        edge.pop(key)
+    await ingest(client, "collaboration_networks", [{**edge, "employee_a": "New Hire A", "employee_b": "New Hire B"}])
+
+    after = (await client.get("/api/analytics/collaboration-graph")).json()["summary"]
+    assert server.graph_cache["graph"] is not cached
+    assert after["nodes"] == before["nodes"]
+    assert after["edges"] == before["edges"] + 1
+    assert after["components"] == before["components"] - 1
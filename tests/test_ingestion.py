@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from ingestion import iter_lines
+
+from .test_analytics_views import assert_views_match_rebuild, generated, ingest, ndjson
+
+pytestmark = pytest.mark.anyio
+
+CSV_HEADER = ("name,department,role,skills,experience_years,performance_score,"
+              "collaboration_index,productivity_score\n")
+
+
+def csv_row(name, department="Engineering", skills="Python;Agile"):
+    return f"{name},{department},Senior,{skills},4,0.8,0.7,0.9\n"
+
+
+async def pieces(body: bytes, size: int):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def test_lines_split_across_chunks():
+    body = "first line\r\nsecond — café\n\nlast without newline".encode("utf-8")
+    # Every chunk size cuts some line, and size 1 the multi-byte characters
+    for size in (1, 2, 5, 13, len(body)):
+        assert [line async for line in iter_lines(pieces(body, size))] == [
+            "first line", "second — café", "", "last without newline"
+        ]
+
+
+async def test_streamed_body_split_mid_record(server, client):
+    employees = generated("employees", 31, employees=9, projects=0, collaborations=0)
+    for emp in employees:
+        emp.pop("employee_key")
+    # The upload arrives in pieces that cut records and CSV rows apart
+    response = await client.post("/api/ingest/employees", params={"chunk_size": 4},
+                                 content=pieces(ndjson(employees).encode("utf-8"), 37))
+    assert response.status_code == 200, response.text
+    assert response.json()["documents"] == 9
+
+    body = CSV_HEADER + "".join(csv_row(f"Csv Hire {i}") for i in range(5))
+    response = await client.post("/api/ingest/employees", params={"format": "csv", "chunk_size": 2},
+                                 content=pieces(body.encode("utf-8"), 11))
+    assert response.status_code == 200, response.text
+    hires = await server.db.employees.find({"name": {"$regex": "^Csv Hire"}}).to_list(length=None)
+    assert sorted(hire["name"] for hire in hires) == [f"Csv Hire {i}" for i in range(5)]
+    assert all(hire["skills"] == ["Python", "Agile"] for hire in hires)
+    assert await server.db.employees.count_documents({}) == 14
+
+
+@pytest.mark.parametrize("body, format, error", [
+    (b'{"name": "Broken",\n', "ndjson", "line 5: invalid JSON"),
+    (b'[1, 2]\n', "ndjson", "record 5: invalid Employee"),
+    (b'{"name": "No fields"}\n', "ndjson", "record 5: invalid Employee"),
+    (b'{"name": "\xff\xfe"}\n', "ndjson", "line 5: invalid UTF-8"),
+    (b'Short,row\n', "csv", "line 6: expected 8 columns, got 2"),
+    (b'Bad,Sales,Senior,Python,many,0.8,0.7,0.9\n', "csv", "record 5: invalid Employee"),
+])
+async def test_malformed_row_is_rejected(server, client, body, format, error):
+    if format == "csv":
+        valid = (CSV_HEADER + "".join(csv_row(f"Valid {i}") for i in range(4))).encode("utf-8")
+    else:
+        employees = generated("employees", 32, employees=4, projects=0, collaborations=0)
+        valid = ndjson(employees).encode("utf-8")
+    response = await client.post("/api/ingest/employees", params={"format": format, "chunk_size": 2},
+                                 content=valid + body)
+    assert response.status_code == 422, response.text
+    detail = response.json()["detail"]
+    assert detail["error"].startswith(error)
+    # Chunks written before the bad row stay
+    assert detail["ingested"] == 4
+    assert await server.db.employees.count_documents({}) == 4
+
+
+async def test_concurrent_ingest_of_every_collection(server, client):
+    counts = {"employees": 40, "projects": 12, "collaborations": 60}
+    documents = {
+        "employees": generated("employees", 33, **counts),
+        "projects": generated("projects", 33, **counts),
+        "collaboration_networks": generated("collaborations", 33, **counts),
+        "skill_gaps": generated("skill_gaps", 33, **counts),
+    }
+    for collection, fields in [("employees", ["employee_key"]), ("projects", ["team_member_keys"]),
+                               ("collaboration_networks", ["employee_a_key", "employee_b_key"])]:
+        for doc in documents[collection]:
+            for field in fields:
+                doc.pop(field)
+
+    reports = await asyncio.gather(*(ingest(client, collection, docs, chunk_size=5)
+                                     for collection, docs in documents.items()))
+    assert [report["documents"] for report in reports] == [len(docs) for docs in documents.values()]
+    for collection, docs in documents.items():
+        assert await server.db[collection].count_documents({}) == len(docs), collection
+    keys = await server.db.employees.distinct("employee_key")
+    assert sorted(keys) == list(range(len(documents["employees"])))
+
+    overview = (await client.get("/api/dashboard/overview")).json()["metrics"]
+    assert (overview["total_employees"], overview["total_projects"]) == (40, 12)
+    await assert_views_match_rebuild(server.db)
@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from profiling import MetricsRegistry, ProfilingMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_one_profiled_request_at_a_time(tmp_path):
+    app = FastAPI()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        started.set()
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/fast")
+    async def fast():
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, registry=MetricsRegistry(), profile_dir=str(tmp_path))
+    headers = {"X-Profile": "cprofile"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.ensure_future(client.get("/slow", headers=headers))
+        await started.wait()
+        busy = await client.get("/fast", headers=headers)
+        assert busy.status_code == 409
+        assert "x-profile-dump" not in busy.headers
+        # Unprofiled requests are served as usual meanwhile
+        assert (await client.get("/fast")).status_code == 200
+        release.set()
+        response = await first
+        assert response.status_code == 200
+        assert (tmp_path / response.headers["x-profile-dump"]).exists()
+
+        # The profiler is free again once the first request finished
+        response = await client.get("/fast", headers=headers)
+        assert response.status_code == 200
+        assert (tmp_path / response.headers["x-profile-dump"]).exists()
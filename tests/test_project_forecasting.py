@@ -0,0 +1,43 @@
+import pytest
+
+from warehouse import DuckDBSource
+
+pytestmark = pytest.mark.anyio
+
+
+async def reference_department_rates(db):
+    """The original attribution: each project counts for the department of
+    the first employee, in collection order, whose name is on its team"""
+    employees = await db.employees.find().to_list(length=None)
+    totals = {}
+    async for project in db.projects.find():
+        team = set(project['team_members'])
+        lead = next((emp for emp in employees if emp['name'] in team), None)
+        if lead is not None:
+            count, success = totals.get(lead['department'], (0, 0))
+            totals[lead['department']] = (count + 1, success + project['success_probability'])
+    return {department: round(success / count * 100, 1) for department, (count, success) in totals.items()}
+
+
+async def department_rates(client, server):
+    server.response_cache.invalidate()
+    response = await client.get("/api/analytics/project-forecasting")
+    assert response.status_code == 200
+    return response.json()["department_success_rates"]
+
+
+async def test_department_attribution_matches_original(server, client, monkeypatch):
+    response = await client.post("/api/initialize-data", params={"employees": 200, "projects": 60, "seed": 21})
+    assert response.status_code == 200
+    expected = await reference_department_rates(server.db)
+    assert await department_rates(client, server) == expected
+
+    # Snapshot and warehouse paths attribute projects the same way
+    await server.snapshot_store.export(server.db)
+    monkeypatch.setattr(server, "ANALYTICS_SOURCE", "snapshot")
+    assert await department_rates(client, server) == expected
+
+    monkeypatch.setattr(server, "ANALYTICS_SOURCE", "warehouse")
+    monkeypatch.setattr(server, "warehouse_source", DuckDBSource())
+    await server.snapshot_exported(await server.snapshot_store.export(server.db))
+    assert await department_rates(client, server) == expected
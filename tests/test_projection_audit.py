@@ -0,0 +1,59 @@
+import pytest
+
+from query_projections import ENDPOINT_FIELDS, projection_audit
+
+pytestmark = pytest.mark.anyio
+
+# Every route that reads documents through a declared projection
+AUDITED_REQUESTS = [
+    ("/api/dashboard/overview", {}),
+    ("/api/dashboard", {}),
+    ("/api/analytics/collaboration-network", {}),
+    ("/api/analytics/collaboration-network", {"format": "ndjson"}),
+    # A page of nodes only, then one that ends among the edges
+    ("/api/analytics/collaboration-network", {"limit": 50}),
+    ("/api/analytics/collaboration-network", {"limit": 100}),
+    ("/api/analytics/collaboration-graph", {}),
+    ("/api/analytics/skill-gaps", {}),
+    ("/api/analytics/project-forecasting", {}),
+    ("/api/analytics/performance-trends", {}),
+    ("/api/analytics/semantic-matching", {}),
+    ("/api/analytics/team-assignment", {"staff_per_skill": 2}),
+    ("/api/analytics/similar-employees", {"name": "Employee 1"}),
+]
+
+
+@pytest.fixture
+def audit(monkeypatch):
+    monkeypatch.setattr(projection_audit, "enabled", True)
+    projection_audit.documents.clear()
+    projection_audit.accessed.clear()
+    yield projection_audit
+    projection_audit.documents.clear()
+    projection_audit.accessed.clear()
+
+
+async def test_endpoints_read_every_projected_field(client, audit):
+    response = await client.post("/api/initialize-data", params={"employees": 80, "projects": 12, "collaborations": 100, "seed": 5})
+    assert response.status_code == 200
+
+    for path, params in AUDITED_REQUESTS:
+        response = await client.get(path, params=params)
+        assert response.status_code == 200, (path, params, response.text)
+
+    report = (await client.get("/api/projections")).json()
+    assert report["audit_enabled"]
+    audited = {(endpoint, collection)
+               for key, collections in report["endpoints"].items()
+               for endpoint in key.split("+")
+               for collection in collections}
+    declared = {(endpoint, collection) for endpoint, fields in ENDPOINT_FIELDS.items() for collection in fields}
+    assert declared <= audited, sorted(declared - audited)
+
+    over_fetched = {
+        f"{endpoint}.{collection}": stats["unused"]
+        for endpoint, collections in report["endpoints"].items()
+        for collection, stats in collections.items()
+        if stats["unused"]
+    }
+    assert over_fetched == {}
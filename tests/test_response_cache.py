@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+import pytest
+
+from response_cache import ResponseCache
+
+pytestmark = pytest.mark.anyio
+
+
+def employee(name, department="Research"):
+    return {"name": name, "department": department, "role": "Analyst", "skills": ["Python"],
+            "experience_years": 3, "performance_score": 0.9, "collaboration_index": 0.5,
+            "productivity_score": 0.8}
+
+
+async def total_employees(client):
+    response = await client.get("/api/dashboard/overview")
+    assert response.status_code == 200
+    return response.json()["metrics"]["total_employees"]
+
+
+async def test_writes_invalidate_cached_responses(server, client):
+    response = await client.post("/api/initialize-data", params={"employees": 30, "projects": 4, "seed": 1})
+    assert response.status_code == 200
+    assert await total_employees(client) == 30
+    hits = server.response_cache.stats()["hits"]
+    assert await total_employees(client) == 30
+    assert server.response_cache.stats()["hits"] == hits + 1
+
+    # Streaming ingestion
+    response = await client.post("/api/ingest/employees", content=json.dumps(employee("Hire 1")) + "\n")
+    assert response.status_code == 200
+    assert await total_employees(client) == 31
+
+    # A rejected upload still invalidates: records before the bad one were written
+    body = json.dumps(employee("Hire 2")) + "\n" + json.dumps({"name": "Incomplete"}) + "\n"
+    response = await client.post("/api/ingest/employees", params={"chunk_size": 1}, content=body)
+    assert response.status_code == 422
+    assert await total_employees(client) == 32
+
+    # Replacing a skill gap
+    critical_before = (await client.get("/api/analytics/skill-gaps")).json()["summary"]["critical_gaps_count"]
+    gap = await server.db.skill_gaps.find_one({"gap_level": {"$ne": "critical"}}, {"_id": 0})
+    response = await client.put(f"/api/skill-gaps/{gap['id']}",
+                                content=json.dumps({**gap, "gap_level": "critical"}, default=str))
+    assert response.status_code == 200
+    critical_after = (await client.get("/api/analytics/skill-gaps")).json()["summary"]["critical_gaps_count"]
+    assert critical_after == critical_before + 1
+
+    # Re-initializing
+    response = await client.post("/api/initialize-data", params={"employees": 12, "projects": 2, "seed": 1})
+    assert response.status_code == 200
+    assert await total_employees(client) == 12
+
+
+async def test_computation_overlapping_a_write_is_not_cached():
+    cache = ResponseCache()
+    started, release = asyncio.Event(), asyncio.Event()
+    calls = []
+
+    async def compute():
+        calls.append(len(calls))
+        started.set()
+        await release.wait()
+        return len(calls)
+
+    pending = asyncio.ensure_future(cache.get_or_compute("key", compute))
+    await started.wait()
+    cache.invalidate()
+    release.set()
+    assert await pending == 1
+    # The result predates the write, so the next read recomputes
+    assert await cache.get_or_compute("key", compute) == 2
+    assert await cache.get_or_compute("key", compute) == 2
+    assert cache.stats()["hits"] == 1
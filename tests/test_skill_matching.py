@@ -0,0 +1,69 @@
+import pytest
+
+from sample_data import WorkforceGenerator, iter_documents
+from skill_matching import TopMatchReducer, merge_top_matches, prepare_projects
+
+
+def reference_matches(employees, projects, top_k=5):
+    """The original per-pair ranking: match percentage, then performance,
+    ties in collection order"""
+    results = []
+    for project in projects:
+        required_skills = set(project['required_skills'])
+        employee_matches = []
+        for emp in employees:
+            shared = required_skills.intersection(emp['skills'])
+            match_percentage = (len(shared) / len(required_skills)) * 100 if required_skills else 0
+            if match_percentage > 0:
+                employee_matches.append({
+                    "name": emp['name'],
+                    "department": emp['department'],
+                    "matching_skills": sorted(shared),
+                    "match_percentage": round(match_percentage, 1),
+                    "performance_score": emp['performance_score']
+                })
+        employee_matches.sort(key=lambda x: (x['match_percentage'], x['performance_score']), reverse=True)
+        results.append(employee_matches[:top_k])
+    return results
+
+
+def streamed_matches(employees, projects, batch_size, top_k=5):
+    reducer = TopMatchReducer(prepare_projects(projects), top_k)
+    for start in range(0, len(employees), batch_size):
+        reducer.update(merge_top_matches(*reducer.merge_args(employees[start:start + batch_size])))
+    return [
+        [{**match, "matching_skills": sorted(match["matching_skills"])} for match in matches]
+        for matches in reducer.recommendations()
+    ]
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 64, 1000])
+def test_vectorized_matching_equals_reference_ranking(batch_size):
+    # Scores have two decimals, so many employees tie on both keys
+    generator = WorkforceGenerator(employees=400, projects=30, collaborations=0, seed=11)
+    employees = list(iter_documents(generator.employees()))
+    projects = list(iter_documents(generator.projects()))
+    assert streamed_matches(employees, projects, batch_size) == reference_matches(employees, projects)
+
+
+def test_vectorized_matching_with_fewer_employees_than_top_k():
+    generator = WorkforceGenerator(employees=3, projects=4, collaborations=0, seed=2)
+    employees = list(iter_documents(generator.employees()))
+    projects = list(iter_documents(generator.projects()))
+    assert streamed_matches(employees, projects, 2) == reference_matches(employees, projects)
+
+
+@pytest.mark.anyio
+async def test_semantic_matching_endpoint_equals_reference_ranking(server, client):
+    response = await client.post("/api/initialize-data", params={"employees": 120, "projects": 10, "seed": 4})
+    assert response.status_code == 200
+    employees = await server.db.employees.find({}, {"_id": 0}).to_list(length=None)
+    projects = await server.db.projects.find({}, {"_id": 0}).to_list(length=None)
+
+    response = await client.get("/api/analytics/semantic-matching")
+    assert response.status_code == 200
+    recommended = [
+        [{**match, "matching_skills": sorted(match["matching_skills"])} for match in project["recommended_employees"]]
+        for project in response.json()["project_skill_matching"]
+    ]
+    assert recommended == reference_matches(employees, projects)
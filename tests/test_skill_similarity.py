@@ -0,0 +1,46 @@
+import pytest
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from skill_similarity import SkillSimilarityIndex
+
+pytestmark = pytest.mark.anyio
+
+
+def employee(key, skills, _id=None):
+    return {"_id": _id or ObjectId(), "employee_key": key, "name": f"Employee {key}", "skills": skills}
+
+
+async def test_sync_finds_employees_committed_below_the_watermark():
+    db = AsyncMongoMockClient()["skill_index_test"]
+    first, late, last = ObjectId(), ObjectId(), ObjectId()
+    await db.employees.insert_many([employee(0, ["Python", "SQL"], first), employee(2, ["Python", "SQL"], last)])
+    index = SkillSimilarityIndex()
+    assert await index.sync(db) == 2
+
+    # A slower writer commits an older _id after the index moved past it
+    await db.employees.insert_one(employee(1, ["Python", "SQL", "Go"], late))
+    await db.employees.insert_one(employee(3, ["Java"]))
+    assert await index.sync(db) == 2
+    assert sorted(index.member_keys) == [0, 1, 2, 3]
+    assert await index.sync(db) == 0
+
+    names = {match["name"] for match in index.similar_employees(skills=["Python", "SQL", "Go"], threshold=0.3)}
+    assert "Employee 1" in names
+
+
+async def test_save_leaves_no_temporary_files(tmp_path):
+    db = AsyncMongoMockClient()["skill_index_test"]
+    await db.employees.insert_many([employee(key, ["Python", f"Skill {key % 3}"]) for key in range(20)])
+    path = tmp_path / "index" / "skill_index.npz"
+    index = SkillSimilarityIndex(str(path))
+    assert await index.sync(db) == 20
+    index.save()
+    assert [p.name for p in path.parent.iterdir()] == ["skill_index.npz"]
+
+    restored = SkillSimilarityIndex(str(path))
+    assert restored.load()
+    assert restored.member_keys == index.member_keys
+    assert restored.clusters(0.5) == index.clusters(0.5)
+    # Restored membership is by key too, so nothing is added twice
+    assert await restored.sync(db) == 0
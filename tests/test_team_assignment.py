@@ -0,0 +1,97 @@
+import itertools
+
+import numpy as np
+
+from sample_data import WorkforceGenerator
+from team_assignment import (
+    EPSILON_SCHEDULE, OVERLAP_WEIGHT, PERFORMANCE_WEIGHT, AssignmentInput, build_teams, solve_assignment
+)
+
+
+def prepared_workforce(employees, projects, staff_per_skill):
+    generator = WorkforceGenerator(employees=employees, projects=projects, collaborations=0, seed=7)
+    project_docs = [doc for batch in generator.projects() for doc in batch]
+    assignment = AssignmentInput(project_docs, staff_per_skill)
+    for batch in generator.employees():
+        assignment.add(batch)
+    return project_docs, assignment.prepared()
+
+
+def solve(prepared, time_budget=10.0):
+    return solve_assignment(
+        prepared["employee_matrix"], prepared["performance"], prepared["project_matrix"],
+        prepared["class_project"], prepared["class_skill"], prepared["capacity"], time_budget
+    )
+
+
+def assert_feasible(prepared, owner):
+    assigned = owner[owner >= 0]
+    counts = np.bincount(assigned, minlength=len(prepared["capacity"]))
+    assert (counts <= prepared["capacity"]).all()
+    # Every assigned employee has the skill of the slot they fill
+    employees = np.flatnonzero(owner >= 0)
+    assert prepared["employee_matrix"][employees, prepared["class_skill"][assigned]].all()
+
+
+def test_fewer_candidates_than_staff_per_skill():
+    # Slot demand wider than the candidate lists used to index past them
+    for employees, projects, staff_per_skill in [(1, 2, 1), (3, 2, 4), (12, 8, 20)]:
+        project_docs, prepared = prepared_workforce(employees, projects, staff_per_skill)
+        owner, stats = solve(prepared)
+        assert_feasible(prepared, owner)
+        assert not stats["timed_out"]
+        teams = build_teams(project_docs, prepared, owner)
+        assert sum(len(team["team"]) for team in teams) == int((owner >= 0).sum())
+
+
+def test_over_demanded_slots_finish_in_bounded_rounds():
+    # More slots than employees used to settle only by epsilon-sized price
+    # increments, taking thousands of rounds on tiny inputs
+    project_docs, prepared = prepared_workforce(50, 20, 3)
+    assert prepared["capacity"].sum() > len(prepared["performance"])
+    owner, stats = solve(prepared)
+    assert_feasible(prepared, owner)
+    assert not stats["timed_out"]
+    assert stats["rounds"] < 2000
+    assert (owner >= 0).sum() > 0
+
+
+def exhaustive_optimum(employee_matrix, performance, project_matrix, class_project, class_skill, capacity):
+    """Best total value over every assignment of employees to slot classes (-1 leaves one out)"""
+    overlap = (employee_matrix.astype(float) @ project_matrix.T) / np.maximum(project_matrix.sum(axis=1), 1)
+    # Each employee can only fill slots for skills they hold
+    options = [[-1] + np.flatnonzero(skills[class_skill]).tolist() for skills in employee_matrix]
+    best = 0.0
+    for owner in itertools.product(*options):
+        owner = np.array(owner)
+        assigned = np.flatnonzero(owner >= 0)
+        classes = owner[assigned]
+        if (np.bincount(classes, minlength=len(capacity)) > capacity).any():
+            continue
+        best = max(best, float((1 + PERFORMANCE_WEIGHT * performance[assigned]
+                                + OVERLAP_WEIGHT * overlap[assigned, class_project[classes]]).sum()))
+    return best
+
+
+def test_matches_exhaustive_search_on_small_instances():
+    rng = np.random.default_rng(5)
+    for _ in range(4):
+        # 6 employees and 3 projects over 3 skills
+        employee_matrix = rng.random((6, 3)) < 0.6
+        project_matrix = rng.random((3, 3)) < 0.5
+        project_matrix[np.arange(3), rng.integers(0, 3, 3)] = True
+        performance = rng.uniform(1, 5, 6).astype(np.float32)
+        class_project, class_skill = np.nonzero(project_matrix)
+        capacity = np.ones(len(class_project), dtype=np.int64)
+        arrays = (employee_matrix, performance, project_matrix, class_project, class_skill, capacity)
+
+        owner, stats = solve_assignment(*arrays)
+        assert not stats["timed_out"]
+        assert_feasible({"capacity": capacity, "employee_matrix": employee_matrix, "class_skill": class_skill},
+                        owner)
+        # Within slots times the final bid increment of the optimum; the
+        # increment starts from the last of the schedule and escalates
+        # where slots go unfilled
+        assert stats["optimality_gap_bound"] >= float(capacity.sum()) * EPSILON_SCHEDULE[-1]
+        optimum = exhaustive_optimum(*arrays)
+        assert optimum - stats["optimality_gap_bound"] - 1e-3 <= stats["objective"] <= optimum + 1e-3
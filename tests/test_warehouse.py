@@ -0,0 +1,41 @@
+import pytest
+
+from warehouse import DuckDBSource
+
+pytestmark = pytest.mark.anyio
+
+ANALYTICS = ["/api/analytics/skill-gaps", "/api/analytics/project-forecasting", "/api/analytics/performance-trends"]
+
+
+async def analytics(client, server):
+    server.response_cache.invalidate()
+    responses = {path: await client.get(path) for path in ANALYTICS}
+    assert {path: response.status_code for path, response in responses.items()} == dict.fromkeys(ANALYTICS, 200)
+    return {path: response.json() for path, response in responses.items()}
+
+
+def by_skill(analysis):
+    # The warehouse orders gaps by department and skill, snapshots by document
+    return {**analysis, "by_department": {
+        department: sorted(gaps, key=lambda gap: (gap["skill"], gap["current_proficiency"]))
+        for department, gaps in analysis["by_department"].items()
+    }}
+
+
+async def test_duckdb_warehouse_is_loaded_at_startup(server, client, monkeypatch):
+    response = await client.post("/api/initialize-data", params={"employees": 60, "projects": 12, "seed": 3})
+    assert response.status_code == 200
+
+    monkeypatch.setattr(server, "ANALYTICS_SOURCE", "warehouse")
+    monkeypatch.setattr(server, "warehouse_source", DuckDBSource())
+    async with server.lifespan(server.app):
+        warehouse = await analytics(client, server)
+
+        # Same rows as the snapshot the tables were loaded from
+        monkeypatch.setattr(server, "ANALYTICS_SOURCE", "snapshot")
+        monkeypatch.setattr(server, "warehouse_source", None)
+        snapshot = await analytics(client, server)
+    assert server.snapshot_store.status()["current"] is not None
+    skill_gaps = ANALYTICS[0]
+    assert by_skill(warehouse.pop(skill_gaps)) == by_skill(snapshot.pop(skill_gaps))
+    assert warehouse == snapshot